@@ -8,6 +8,7 @@ from typing import Callable, List, Optional
 import wx
 
 from ktane_lib.constants import CONSTANTS
+from ktane_lib.context import BombContext
 
 # Constants:
 PORT = "COM4"
@@ -52,6 +53,22 @@ class PacketType(Enum):
     SOUND_REQUEST = 0x0A
     SET_TIME = 0x0B
     SHOW_TIME = 0x0C
+    SUBSCRIBE = 0x0D
+    GAME_STATUS = 0x0E
+    READ_STATS = 0x0F
+    STATS = 0x8F
+    READ_CONTEXT = 0x10
+    CONTEXT = 0x90
+    READ_CONFIG = 0x11
+    CONFIG = 0x91
+    WRITE_CONFIG = 0x12
+    UPDATE_BEGIN = 0x13
+    UPDATE_CHUNK = 0x14
+    UPDATE_QUERY = 0x15
+    UPDATE_STATUS = 0x95
+    UPDATE_COMMIT = 0x16
+    FRAGMENT = 0x17
+    FRAGMENT_STATUS = 0x97
 
 
 @attr.s(repr=False)
@@ -114,8 +131,8 @@ class TermFrame(wx.Frame):
         button = wx.Button(self, label="REQUEST_ID")
         button.Bind(wx.EVT_BUTTON, self.on_request_id)
         sizer3.Add(button, 0, wx.EXPAND, 0)
-        button = wx.Button(self, label="CONFIGURE1")
-        button.Bind(wx.EVT_BUTTON, self.on_configure1)
+        button = wx.Button(self, label="CONTEXT")
+        button.Bind(wx.EVT_BUTTON, self.on_context)
         sizer3.Add(button, 0, wx.EXPAND | wx.TOP, 10)
         button = wx.Button(self, label="CONFIGURE2")
         button.Bind(wx.EVT_BUTTON, self.on_configure2)
@@ -150,17 +167,19 @@ class TermFrame(wx.Frame):
         app.outgoing.put(packet)
         self.add(packet)
 
-    def on_configure1(self, _event: wx.CommandEvent):
+    def on_context(self, _event: wx.CommandEvent):
         app: TerminalApp = wx.GetApp()
         app.seq_num = (app.seq_num + 1) & 0xFF
-        packet = Packet(PacketType.CONFIGURE, 0x0100, app.seq_num, b"12345")
+        app.context_version = (app.context_version + 1) & 0xFF
+        context = BombContext(app.context_version, b"AB1235", 0, ((b"CAR", True),))
+        packet = Packet(PacketType.CONTEXT, CONSTANTS.MODULES.BROADCAST_ALL, app.seq_num, context.pack())
         app.outgoing.put(packet)
         self.add(packet)
 
     def on_configure2(self, _event: wx.CommandEvent):
         app: TerminalApp = wx.GetApp()
         app.seq_num = (app.seq_num + 1) & 0xFF
-        packet = Packet(PacketType.CONFIGURE, 0x0200, app.seq_num, b"\x03HOLD\x00\x00\x00\x00\x00\x01CAR")
+        packet = Packet(PacketType.CONFIGURE, 0x0200, app.seq_num, b"\x03HOLD\x00\x00\x00\x00")
         app.outgoing.put(packet)
         self.add(packet)
 
@@ -190,9 +209,11 @@ class TermFrame(wx.Frame):
 
 class TerminalApp(wx.App):
     seq_num: int
+    context_version: int
 
     def OnInit(self):
         self.seq_num = 0
+        self.context_version = 0
         self.frame = TermFrame(None, title="KTANE Terminal")
         self.frame.Show()
         self.frame.Bind(wx.EVT_CLOSE, self.on_close)
@@ -82,6 +82,17 @@ class UART:
         pass
 
 
+class _Memory:
+    def __getitem__(self, addr: int) -> int:
+        pass
+
+    def __setitem__(self, addr: int, value: int):
+        pass
+
+
+mem8 = mem16 = mem32 = _Memory()
+
+
 def disable_irq() -> int:
     pass
 
@@ -1,2 +1,14 @@
 def ticks_us() -> int:
     pass
+
+
+def sleep_us(us: int):
+    pass
+
+
+def ticks_add(ticks: int, delta: int) -> int:
+    pass
+
+
+def ticks_diff(ticks1: int, ticks2: int) -> int:
+    pass
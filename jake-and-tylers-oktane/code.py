@@ -4,6 +4,8 @@ import digitalio
 import random
 import time
 
+from ktane_lib.button_rules import compile_rules, required_digit
+from ktane_lib.constants import CONSTANTS
 from src.hardware import KtaneHardware
 
 # CONSTANTST
@@ -12,8 +14,9 @@ IMMEDIATE_RELEASE_TIMEOUT = 0.5  # in seconds
 BUTTON_TEXTS = ["abort", "detonate", "hold", "press"]
 BUTTON_COLORS = ["blue", "white", "black", "red", "yellow"]
 RELEVANT_INDICATORS = ["CAR", "FRK"]
+INDICATOR_LABELS = {"CAR": CONSTANTS.LABELS.CAR, "FRK": CONSTANTS.LABELS.FKR}
 STRIP_COLORS = ["blue", "red", "white", "yellow"]
-ADDRESS = 0x10
+ADDRESS = (CONSTANTS.MODULES.TYPES.BUTTON << 8) | 0x10
 
 BUTTON_PIN = board.D5
 
@@ -31,6 +34,8 @@ class Button(KtaneHardware):
     wasButtonPressed = False
     buttonPressedAt = None  # timestamp
 
+    digit = None  # digit the timer must show on a held release, None for an immediate release
+
     def __init__(self):
         super().__init__(ADDRESS)
 
@@ -38,22 +43,34 @@ class Button(KtaneHardware):
         self.text = random.choice(BUTTON_TEXTS)
         self.buttonColor = random.choice(BUTTON_COLORS)
         self.stripColor = random.choice(STRIP_COLORS)
-        self.batteryCount = fetchBatteryCount()
-        self.litIndicators = fetchLitIndicators(RELEVANT_INDICATORS)
+        self.compileRules()
 
         # hardware setup
         self.buttonPin = digitalio.DigitalInOut(BUTTON_PIN)
         self.buttonPin.direction = digitalio.Direction.INPUT
         self.buttonPin.pull = digitalio.Pull.UP
 
+    def context_changed(self):
+        self.compileRules()
+
+    def compileRules(self):
+        self.batteryCount = fetchBatteryCount(self)
+        self.litIndicators = fetchLitIndicators(self, RELEVANT_INDICATORS)
+
+        # game logic, same tables as the RP2040 module
+        outcome = compile_rules(
+            getattr(CONSTANTS.COLORS, self.buttonColor.upper()),
+            self.text.upper().encode() + bytes(8 - len(self.text)),
+            self.batteryCount,
+            [INDICATOR_LABELS[indicator] for indicator in self.litIndicators],
+        )
+        self.digit = required_digit(outcome, getattr(CONSTANTS.COLORS, self.stripColor.upper()))
+
     def isButtonPressed(self):
         return self.buttonPin.value == False
 
     def loop(self):
-        # read stuff:
-        # handle seq num stuff (super()?)
-        # poll()
-
+        # frames whatever the UART has buffered, ACKs and retries
         self.poll()
 
         isButtonPressed = self.isButtonPressed()
@@ -79,76 +96,26 @@ class Button(KtaneHardware):
             time.monotonic() - self.buttonPressedAt <= IMMEDIATE_RELEASE_TIMEOUT
         )
 
-        if self.buttonColor == "blue" and self.text == "abort":
-            if not isImmediateRelease:
-                return self.isGoodHoldRelease()
-
-        elif self.batteryCount > 1 and self.text == "detonate":
+        if self.digit is None:
             return isImmediateRelease
 
-        elif self.buttonColor == "white" and "CAR" in self.litIndicators:
-            if not isImmediateRelease:
-                return self.isGoodHoldRelease()
-
-        elif self.batteryCount > 2 and "FRK" in self.litIndicators:
-            return isImmediateRelease
-
-        elif self.buttonColor == "yellow":
-            if not isImmediateRelease:
-                return self.isGoodHoldRelease()
-
-        elif self.buttonColor == "red" and self.text == "hold":
-            return isImmediateRelease
-
-        else:
-            if not isImmediateRelease:
-                return self.isGoodHoldRelease()
-
-        return False
-
-    def isGoodHoldRelease(self):
-        # @todo: request timer value, not this module's uptime
-        if self.stripColor == "blue":
-            return self.isDigitInTime(4)
-        if self.stripColor == "yellow":
-            return self.isDigitInTime(5)
-
-        return self.isDigitInTime(1)
-
-    def isDigitInTime(self, digit):
-        # @todo: consider RTT for fetching timer value. may want to
-        #   take timestamp before and after fetch, and subtract
-        time = fetchTime()
-        digitStr = str(digit)
-        return digitStr in time
+        return not isImmediateRelease and self.digit in fetchTime(self)
 
 
-def fetchBatteryCount() -> int:
-    # @todo: send request for battery count to main board
-    return random.randint(0, 3)
+def fetchBatteryCount(node: KtaneHardware) -> int:
+    # from the cached bomb context, 0 until the master's broadcast arrives
+    return node.context.num_batteries
 
 
-def fetchLitIndicators(indicators: list) -> list:
-    # @todo: send request for each indicator to main board
-    #        if main board says it's lit, add it to return array
-    indicatorSetIndex = random.randint(0, 3)
-    if indicatorSetIndex == 0:
-        return []
-    if indicatorSetIndex == 1:
-        return ["CAR"]
-    if indicatorSetIndex == 2:
-        return ["FRK"]
-    if indicatorSetIndex == 3:
-        return ["CAR", "FRK"]
+def fetchLitIndicators(node: KtaneHardware, indicators: list) -> list:
+    # from the cached bomb context, one lookup however many indicators we care about
+    litLabels = node.context.lit_labels()
+    return [indicator for indicator in indicators if INDICATOR_LABELS[indicator] in litLabels]
 
 
-def fetchTime() -> str:
-    # @todo fetch from timer module
-    currentTime = time.monotonic()  # seconds
-    minutes = int(currentTime / 60)
-    seconds = int(currentTime - (60 * minutes))
-    timeStr = str(minutes) + ":" + str(seconds)
-    return timeStr
+def fetchTime(node: KtaneHardware) -> bytes:
+    # local replica of the countdown, kept in sync from SHOW_TIME/SET_TIME/GAME_STATUS
+    return node.clock.time_string()
 
 
 button = Button()
@@ -162,5 +129,5 @@ lastPrintTime = time.monotonic()
 while True:
     button.loop()
     if time.monotonic() - lastPrintTime > timerPrintTimeout:
-        print(fetchTime())
+        print(fetchTime(button).decode())
         lastPrintTime = time.monotonic()
\ No newline at end of file
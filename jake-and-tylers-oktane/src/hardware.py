@@ -1,177 +1,183 @@
-from math import ceil
-from time import sleep
+from random import randrange
+import struct
+import time
 
 import board
-import digitalio
 import busio
+import digitalio
+
+from ktane_lib.constants import CONSTANTS
+from ktane_lib.context import BombContext
+from ktane_lib.game_clock import GameClock
+from ktane_lib.game_status import GameStatus
+from ktane_lib.ktane_base import KtaneBase, QueuedPacket
+from ktane_lib.registry import id_slot
 
 # Constants:
-UART_NUM = 1
-BAUD_RATE = 9600
-TX_PIN = 8
-RX_PIN = 9
-TX_EN_PIN = 15
-ONE_FRAME = 10 / BAUD_RATE * 1000.0
-TWO_FRAMES = int(ceil(10 / BAUD_RATE * 1000.0))
-BACKOFF_TIME = (0.001, 0.005)
-STATUS_RED = 27
-STATUS_GREEN = 28
-TIMER_ADDR = 0x0000
-
-MODE_SLEEP = 0
-MODE_READY = 1
-MODE_ARMED = 2
-MODE_DISARMED = 3
-
-MT_REQUEST_ID = 0
-MT_RESPONSE_ID = 1
-MT_ACK = 2
-MT_STOP = 3
-MT_CONFIGURE = 4
-MT_START = 5
-MT_STRIKE = 6
-MT_ERROR = 7
-MT_DEFUSED = 8
-MT_NEEDY = 9
-MT_READ_STATUS = 10
-MT_STATUS = 11
-MT_SOUND = 12
-
-FLAG_TRIGGER = 0x01
-FLAG_NEEDY = 0x02
-FLAG_EXCLUSIVE = 0x04
-
-SOUND_HALT = 0
-SOUND_SIMON_1 = 1
-SOUND_SIMON_2 = 2
-SOUND_SIMON_3 = 3
-SOUND_SIMON_4 = 4
-SOUND_TIMER_LOW = 5
-SOUND_BUTTON_1 = 6
-SOUND_BUTTON_2 = 7
-SOUND_TUNE_UP = 8
-SOUND_TUNE_DOWN = 9
-SOUND_VENT = 10
-SOUND_START_CAP_1 = 11
-SOUND_START_CAP_2 = 12
-SOUND_START_CAP_3 = 13
-SOUND_START_CAP_4 = 14
-SOUND_MORSE_A = 15
-SOUND_MORSE_Z = 40
-
-
-class KtaneHardware:
+TX_PIN = board.TX
+RX_PIN = board.RX
+TX_EN_PIN = board.D6  # DE and /RE of the RS-485 transceiver
+RX_BUFFER_SIZE = CONSTANTS.PROTOCOL.MAX_PACKET_LEN * 2  # Room for a packet to land while we're busy with another
+
+FIRMWARE_VERSION = 1
+
+
+class LOG:
+    debug = print
+    # debug = lambda *args: None
+    info = print
+    # info = lambda *args: None
+    warning = print
+    # warning = lambda *args: None
+
+
+def ticks_us() -> int:
+    return time.monotonic_ns() // 1000
+
+
+def idle() -> None:
+    # Nothing to sleep on, code.py still has a button to watch
+    pass
+
+
+class BusUART:
+    """busio.UART with the MicroPython calls KtaneBase uses"""
+
+    def __init__(self, uart: busio.UART) -> None:
+        self.uart = uart
+
+    def any(self) -> int:
+        return self.uart.in_waiting
+
+    def read(self, count: int) -> bytes:
+        return self.uart.read(count)
+
+    def write(self, data) -> None:
+        self.uart.write(data)
+
+
+class TxEnable:
+    """Transceiver driver enable, held for the life of the node so switching it is just a register write"""
+
+    def __init__(self, pin) -> None:
+        self.pin = digitalio.DigitalInOut(pin)
+        self.pin.switch_to_output(value=False)
+
+    def on(self) -> None:
+        self.pin.value = True
+
+    def off(self) -> None:
+        self.pin.value = False
+
+
+class KtaneHardware(KtaneBase):
+    """CircuitPython side of a module, the counterpart of raspberry_pi/hardware.py
+
+    One UART is opened at start-up and kept. busio buffers received bytes in the background, so poll() only has to
+    frame what's already arrived, and the framing, ACKs and retries are KtaneBase's, the same as every other node.
+    """
+
+    mode: int
+    flags = CONSTANTS.MODULES.FLAGS.TRIGGER  # Reported in RESPONSE_ID, override in subclasses
+    status_rate = None  # GAME_STATUS broadcasts per second to subscribe to (0 for changes only), None to opt out
+
     def __init__(self, addr: int) -> None:
-        self.handlers = {}
-        self.queued_packet = None
-        self.next_retry = None
-        self.last_seq_seen = None
-
-    # UART MEMBERS
-    #
-    # Packet format (little-endian fields):
-    #
-    # Field      Length     Notes
-    # -------    --------   ----------------------------------------------------
-    # Length     1          Total packet length not including Length or Checksum
-    # Source     2          Packet source address
-    # Dest       2          Packet destination address
-    # Type       1          Message type
-    # SeqNum     1          Sequence number
-    # Payload    variable   Content depends on message type
-    # Checksum   2          Checksum such that when all bytes of the message (including Checksum) are summed, the total
-    #                       will be 0xFFFF
-    def poll(self) -> None:
-        """Poll UART"""
-        with digitalio.DigitalInOut(board.RX) as rx:
-            rx.pull = digitalio.Pull.DOWN
-
-            if rx.value == False:  # there is nothing to read
-                return
-
-            while rx.value == True:
-                pass
-
-            print("Detected pulldown, reading message: ", end="")
-
-        with busio.UART(board.TX, board.RX, baudrate=BAUD_RATE, timeout=1) as uart:
-            length = uart.read(1)[0]  # read length byte
-            print(length)
-            data = uart.read(length + 2)  # read data + checksum
-            if data is not None:
-                # convert bytearray to string
-                data_string = (
-                    ", ".join([str(b) for b in data[:-2]]) + "  cs: " + str(data[-2:])
-                )
-                print(data)
-
-    def send(
-        self, dest: int, packet_type: int, seq_num: int, payload: bytes = b""
-    ) -> None:
-        """Send a packet"""
-        # Is anything inbound?
-        with digitalio.DigitalInOut(board.RX) as rx:
-            rx.pull = digitalio.Pull.UP
-
-            while rx.value == True:
-                self.poll()
-                sleep(randrange(*BACKOFF_TIME))
-
-        # Send packet
-        data = (
-            struct.pack(
-                "<BHHBB",
-                2 + 2 + 1 + 1 + len(payload),
-                self.addr,
-                dest,
-                packet_type,
-                seq_num,
-            )
-            + payload
+        uart = busio.UART(
+            TX_PIN, RX_PIN, baudrate=CONSTANTS.UART.BAUD_RATE, timeout=0, receiver_buffer_size=RX_BUFFER_SIZE
         )
-        data += struct.pack("<H", 0xFFFF - sum(data))
-
-        with digitalio.DigitalInOut(board.TX) as tx:
-            tx.direction = digitalio.Direction.OUTPUT
-            tx.value = True
-            sleep(0.1)  # @todo how often can we poll? how often should we?
-
-        with busio.UART(board.TX, board.RX, baudrate=BAUD_RATE, timeout=1) as uart:
-            uart.write(data)
-
-        with digitalio.DigitalInOut(board.TX) as tx:
-            tx.direction = digitalio.Direction.OUTPUT
-            tx.value = False
-
-    def retry_now(self) -> None:
-        seq_num = (self.last_seq_seen + 1) & 0xFF
-        self.last_seq_seen = self.awaiting_ack_of_seq = seq_num
-        self.send(
-            self.queued_packet.dest,
-            self.queued_packet.packet_type,
-            seq_num,
-            self.queued_packet.payload,
+        KtaneBase.__init__(self, addr, BusUART(uart), TxEnable(TX_EN_PIN), LOG, idle, ticks_us)
+        self.handlers.update(
+            {
+                CONSTANTS.PROTOCOL.PACKET_TYPE.REQUEST_ID: self.request_id,
+                CONSTANTS.PROTOCOL.PACKET_TYPE.GAME_STATUS: self.game_status,
+                CONSTANTS.PROTOCOL.PACKET_TYPE.SHOW_TIME: self.show_time,
+                CONSTANTS.PROTOCOL.PACKET_TYPE.SET_TIME: self.set_time,
+                CONSTANTS.PROTOCOL.PACKET_TYPE.START: self.start,
+                CONSTANTS.PROTOCOL.PACKET_TYPE.CONTEXT: self.bomb_context,
+            }
         )
-        self.next_retry = time() + RETRY_TIME
-
-    def queue_packet(self, packet: QueuedPacket) -> None:
-        self.queued_packet = packet
-        self.retry_now()
-
-    def send_ack(self, dest: int, seq_num: int) -> None:
-        self.send(dest, MT_ACK, seq_num)
+        self.latest_status = GameStatus()
+        self.context = BombContext()
+        self.clock = GameClock(ticks_us)
+        self.id_requester = CONSTANTS.MODULES.MASTER_ADDR
+        self.send_id_at = 0
+        self.set_mode(CONSTANTS.MODES.SLEEP)
+
+    def set_mode(self, mode: int) -> None:
+        self.mode = mode
+        LOG.info("mode=", mode)
+
+    def request_id(self, source: int, dest: int, payload: bytes) -> bool:
+        # Payload is described in raspberry_pi/hardware.py
+        if dest == self.addr:
+            delay = 0
+        else:
+            slot_us = struct.unpack("<H", payload[:2])[0] if len(payload) >= 2 else CONSTANTS.PROTOCOL.TIMING.ID_SLOT_US
+            slot = id_slot(self.addr)
+            if len(payload) > 2:
+                slot += randrange(max(1, payload[2])) * CONSTANTS.PROTOCOL.TIMING.ID_SLOTS
+            delay = slot * slot_us
+        self.id_requester = source
+        self.send_id_at = ticks_us() + delay
+        self.queued |= CONSTANTS.QUEUED_TASKS.SEND_ID
+        return True  # The RESPONSE_ID is our ACK
+
+    def send_id(self) -> None:
+        if self.status_rate is None:
+            payload = struct.pack("BB", self.flags, FIRMWARE_VERSION)
+        else:
+            payload = struct.pack("BBB", self.flags, FIRMWARE_VERSION, self.status_rate)
+        self.send_without_queuing(self.id_requester, CONSTANTS.PROTOCOL.PACKET_TYPE.RESPONSE_ID, payload)
+
+    def game_status(self, _source: int, _dest: int, payload: bytes) -> bool:
+        self.latest_status.update(payload, ticks_us())
+        self.clock.set(self.latest_status.remaining_us, self.latest_status.running)
+        return True  # Broadcast, never ACKed
+
+    def show_time(self, _source: int, _dest: int, payload: bytes) -> bool:
+        # Payload is the game length in us
+        (time_left,) = struct.unpack("<L", payload)
+        self.clock.set(time_left, False)
+        return False
+
+    def set_time(self, _source: int, _dest: int, payload: bytes) -> bool:
+        # Payload is the time remaining in us
+        (time_left,) = struct.unpack("<L", payload)
+        self.clock.set(time_left, True)
+        return False
+
+    def start(self, _source: int, _dest: int, _payload: bytes) -> bool:
+        self.clock.start()
+        self.set_mode(CONSTANTS.MODES.ARMED)
+        return False
+
+    def bomb_context(self, _source: int, _dest: int, payload: bytes) -> bool:
+        # Payload is described in BombContext
+        if self.context.update(payload):
+            LOG.info("context version", self.context.version)
+            self.context_changed()
+        return True  # Broadcast or a reply, never ACKed
+
+    def context_changed(self) -> None:
+        pass
+
+    def check_queued_tasks(self, was_idle):
+        if self.queued & CONSTANTS.QUEUED_TASKS.SEND_ID:
+            if ticks_us() >= self.send_id_at:
+                self.queued &= ~CONSTANTS.QUEUED_TASKS.SEND_ID
+                self.send_id()
 
     def unable_to_arm(self) -> None:
-        self.queue_packet(QueuedPacket(TIMER_ADDR, MT_ERROR))
+        self.queue_packet(QueuedPacket.acquire(CONSTANTS.MODULES.MASTER_ADDR, CONSTANTS.PROTOCOL.PACKET_TYPE.ERROR))
 
     def disarmed(self):
-        self.queue_packet(QueuedPacket(TIMER_ADDR, MT_DEFUSED))
-        self.set_mode(MODE_DISARMED)
+        self.queue_packet(QueuedPacket.acquire(CONSTANTS.MODULES.MASTER_ADDR, CONSTANTS.PROTOCOL.PACKET_TYPE.DISARMED))
+        self.set_mode(CONSTANTS.MODES.DISARMED)
 
     def strike(self):
-        self.queue_packet(QueuedPacket(TIMER_ADDR, MT_STRIKE))
-
+        self.queue_packet(QueuedPacket.acquire(CONSTANTS.MODULES.MASTER_ADDR, CONSTANTS.PROTOCOL.PACKET_TYPE.STRIKE))
 
-class QueuedPacket:
-    def __init__(self, dest: int, packet_type: int, payload: bytes = b"") -> None:
-        self.dest, self.packet_type, self.payload = dest, packet_type, payload
\ No newline at end of file
+    def stop(self, _source: int, _dest: int, _payload: bytes) -> bool:
+        self.clock.stop()
+        self.set_mode(CONSTANTS.MODES.SLEEP)
+        return False
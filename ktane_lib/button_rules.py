@@ -0,0 +1,55 @@
+from ktane_lib.constants import CONSTANTS
+
+# Constants:
+RELEASE = 0  # Push and release straight away
+HOLD = 1  # Hold, then release when the timer shows the strip's digit
+
+ANY = None
+
+# The manual's rules, first match wins. min_batteries of 0 and ANY always match, a lit_indicator must be lit.
+#
+# color                      text                         min_batteries  lit_indicator           outcome
+RULES = (
+    (CONSTANTS.COLORS.BLUE, CONSTANTS.LABELS.ABORT, 0, ANY, HOLD),
+    (ANY, CONSTANTS.LABELS.DETONATE, 2, ANY, RELEASE),
+    (CONSTANTS.COLORS.WHITE, ANY, 0, CONSTANTS.LABELS.CAR, HOLD),
+    (ANY, ANY, 3, CONSTANTS.LABELS.FKR, RELEASE),
+    (CONSTANTS.COLORS.YELLOW, ANY, 0, ANY, HOLD),
+    (CONSTANTS.COLORS.RED, CONSTANTS.LABELS.HOLD, 0, ANY, RELEASE),
+)
+DEFAULT = HOLD
+
+# Digit the timer must show when a held button is released, by strip color
+STRIP_DIGITS = {
+    CONSTANTS.COLORS.BLUE: b"4",
+    CONSTANTS.COLORS.WHITE: b"1",
+    CONSTANTS.COLORS.YELLOW: b"5",
+}
+DEFAULT_DIGIT = b"1"
+
+
+def compile_rules(color: int, text: bytes, num_batteries: int, lit_indicators) -> int:
+    """Run the rules once for a configured button
+
+    :param lit_indicators: Labels of the lit indicators
+    :return: RELEASE or HOLD
+    """
+    for rule_color, rule_text, min_batteries, lit_indicator, outcome in RULES:
+        if (
+            ((rule_color is ANY) or (rule_color == color))
+            and ((rule_text is ANY) or (rule_text == text))
+            and (num_batteries >= min_batteries)
+            and ((lit_indicator is ANY) or (lit_indicator in lit_indicators))
+        ):
+            return outcome
+    return DEFAULT
+
+
+def required_digit(outcome: int, strip_color: int):
+    """What a release needs to see in the time string
+
+    :return: The digit as a one-byte string, or None if the button should be released straight away
+    """
+    if outcome == RELEASE:
+        return None
+    return STRIP_DIGITS.get(strip_color, DEFAULT_DIGIT)
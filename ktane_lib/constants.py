@@ -10,6 +10,15 @@ class CONSTANTS:
         YELLOW = 4
         GREEN = 5
 
+    class EVENTS:
+        BUTTON_PUSHED = 1
+        BUTTON_RELEASED = 2
+        POST_CUT = 3
+        ROTARY = 4
+        MORSE_RX = 5
+        MORSE_TX = 6
+        POSTS_CHANGED = 7
+
     class FSM_REASON:
         POWER_UP = 0
         TIMER = 1
@@ -57,6 +66,7 @@ class CONSTANTS:
 
     class PROTOCOL:
         MIN_PACKET_LEN = 9
+        MAX_PACKET_LEN = 1 + 255 + 2  # Length, packet, checksum
 
         class PACKET_TYPE:
             RESPONSE_MASK = 0x80
@@ -75,13 +85,38 @@ class CONSTANTS:
             SOUND = 0x0A
             SET_TIME = 0x0B
             SHOW_TIME = 0x0C
+            SUBSCRIBE = 0x0D
+            GAME_STATUS = 0x0E
+            READ_STATS = 0x0F
+            STATS = 0x8F
+            READ_CONTEXT = 0x10
+            CONTEXT = 0x90
+            READ_CONFIG = 0x11
+            CONFIG = 0x91
+            WRITE_CONFIG = 0x12
+            UPDATE_BEGIN = 0x13
+            UPDATE_CHUNK = 0x14
+            UPDATE_QUERY = 0x15
+            UPDATE_STATUS = 0x95
+            UPDATE_COMMIT = 0x16
+            FRAGMENT = 0x17
+            FRAGMENT_STATUS = 0x97
 
         class TIMING:
             BACKOFF_TIME = (1, 5000)
-            BCAST_REPLY_BACKOFF = (1, 50000)
             INITIAL_RETRY_US = 2000000  # 2s
             RETRY_US = 1000000  # 1s
-            ID_SPREAD_MS = (1, 1000)
+            REPLY_TIMEOUT_US = 3000000  # 3s, give up on a request that expects a reply
+            ID_SLOT_US = 1500  # 1.5ms, one RESPONSE_ID frame (11 bytes) plus turnaround guard
+            ID_SLOTS = 256  # Slots in one round, see ktane_lib.registry.id_slot()
+            ID_TYPE_LANES = 10  # Slots per unique byte, module types must all differ in type % ID_TYPE_LANES
+            BCAST_REPLY_BACKOFF = (1, ID_SLOT_US // 4)  # A RESPONSE_ID that finds the bus busy stays in its slot
+            ID_PROBE_US = 20000  # 20ms, wait for a directed REQUEST_ID to be answered
+            ID_RETRIES = 3  # REQUEST_ID broadcasts repeated when RESPONSE_IDs came back garbled
+            ID_JITTER_LAPS = 4  # A repeat spreads answers over this many rounds of ID_SLOTS
+            CHUNK_GAP_US = 5000  # 5ms between UPDATE_CHUNKs for the receivers to write them to flash
+            UPDATE_SLOT_US = 5000  # 5ms, one UPDATE_STATUS frame (44 bytes) plus turnaround guard
+            FRAGMENT_TIMEOUT_US = 500000  # 500ms, throw away a half reassembled message that's gone quiet
 
     class QUEUED_TASKS:
         NOTHING = 0x00
@@ -90,6 +125,9 @@ class CONSTANTS:
         READ_STATUS = 0x04
         SEND_ID = 0x08
         SEND_TIME = 0x10
+        SEND_STATUS = 0x20
+        SEND_CONTEXT = 0x40
+        SEND_UPDATE_STATUS = 0x80
 
     class SEVEN_SEGMENT:
         BLANK = 10
@@ -155,6 +193,20 @@ class CONSTANTS:
     class STATES:
         START = 0
         WAITING_IDS = 1
+        VERIFYING_IDS = 2
+        PROBING_IDS = 3
+        IDLE = 4
+
+    class STATS:
+        # READ_STATS selectors
+        MEMORY = 0x00
+        LOOP = 0x01
+        DISPATCH = 0x02
+        ISR = 0x03
+        CRITICAL = 0x04
+        TIMER_LATE = 0x05
+        BOOT = 0x06
+        GC_OFF = 0x07
 
     class UART:
         BAUD_RATE = 115200
@@ -0,0 +1,65 @@
+import struct
+
+# Constants:
+HEADER_FORMAT = "<B6sBB"
+HEADER_LEN = 1 + 6 + 1 + 1
+INDICATOR_FORMAT = "<3s?"
+INDICATOR_LEN = 3 + 1
+
+
+class BombContext:
+    """Edgework every module can see, broadcast once per game by the master in a CONTEXT packet
+
+    Modules keep the latest one. The version changes whenever the master makes a new one, so repeats are ignored.
+    """
+
+    def __init__(self, version=None, serial_number: bytes = b"", num_batteries: int = 0, indicators=()) -> None:
+        self.version = version  # None until the first CONTEXT is heard
+        self.serial_number = serial_number
+        self.num_batteries = num_batteries
+        self.indicators = tuple(indicators)  # (label, lit) pairs
+
+    # Payload:
+    #
+    # Field            Length   Notes
+    # --------------   ------   ----------------------------------------------
+    # version          1        Bumped by the master for every new context
+    # serial_number    6        Serial number, ASCII
+    # num_batteries    1        Number of batteries visible
+    # num_indicators   1        Number of indicator records that follow
+    #
+    # Followed by num_indicators records of:
+    #
+    # Field            Length   Notes
+    # --------------   ------   ----------------------------------------------
+    # label            3        Indicator label, like b"CAR"
+    # lit              1        True if the indicator is lit
+    def pack(self) -> bytes:
+        data = struct.pack(
+            HEADER_FORMAT, self.version & 0xFF, self.serial_number, self.num_batteries, len(self.indicators)
+        )
+        for label, lit in self.indicators:
+            data += struct.pack(INDICATOR_FORMAT, label, lit)
+        return data
+
+    def update(self, payload: bytes) -> bool:
+        """Take a CONTEXT payload
+
+        :return: True if it was a new version
+        """
+        version, serial_number, num_batteries, num_indicators = struct.unpack(HEADER_FORMAT, payload[:HEADER_LEN])
+        if version == self.version:
+            return False
+        self.indicators = tuple(
+            struct.unpack(INDICATOR_FORMAT, payload[offset : offset + INDICATOR_LEN])
+            for offset in range(HEADER_LEN, HEADER_LEN + (num_indicators * INDICATOR_LEN), INDICATOR_LEN)
+        )
+        self.version, self.serial_number, self.num_batteries = version, serial_number, num_batteries
+        return True
+
+    @property
+    def last_serial_digit_odd(self) -> bool:
+        return self.serial_number[-1:] in (b"1", b"3", b"5", b"7", b"9")
+
+    def lit_labels(self) -> tuple:
+        return tuple(label for label, lit in self.indicators if lit)
@@ -0,0 +1,88 @@
+import struct
+
+# Constants:
+CHUNK_SIZE = 240  # Plus the 2 byte index, fits one packet
+BEGIN_FORMAT = "<BLHL"
+WINDOW_BYTES = 32  # Chunks reported per UPDATE_STATUS, 256 of them
+COMPLETE = 0xFFFF  # first_missing when the image is all there and its CRC checks out
+RECORD_FORMAT = "<BL"  # Bundle record header, name length and data length
+
+
+# UPDATE_BEGIN payload:
+#
+# Field        Length   Notes
+# ----------   ------   -----------------------------------------------
+# version      1        Firmware version of the image
+# image_len    4        Bytes in the image
+# num_chunks   2        Chunks of CHUNK_SIZE, the last may be shorter
+# crc          4        CRC-32 of the whole image
+def pack_begin(version: int, image: bytes, crc: int) -> bytes:
+    return struct.pack(BEGIN_FORMAT, version, len(image), num_chunks(len(image)), crc)
+
+
+def unpack_begin(payload: bytes) -> tuple:
+    return struct.unpack(BEGIN_FORMAT, payload)
+
+
+def num_chunks(image_len: int) -> int:
+    return (image_len + CHUNK_SIZE - 1) // CHUNK_SIZE
+
+
+# UPDATE_CHUNK payload:
+#
+# Field   Length   Notes
+# -----   ------   ------------------------------------------
+# index   2        Chunk number
+# data    n        CHUNK_SIZE bytes, fewer for the last chunk
+def pack_chunk(image: bytes, index: int) -> bytes:
+    return struct.pack("<H", index) + image[index * CHUNK_SIZE : (index + 1) * CHUNK_SIZE]
+
+
+# UPDATE_STATUS payload:
+#
+# Field           Length   Notes
+# -------------   ------   ------------------------------------------------------------
+# version         1        Version being received
+# first_missing   2        Lowest chunk still missing, COMPLETE if the image is verified
+# bitmap          n        Up to WINDOW_BYTES, bit per chunk from first_missing, 1 if missing
+def missing_chunks(payload: bytes) -> list:
+    """Chunk numbers an UPDATE_STATUS asks for, [] if complete"""
+    _version, first_missing = struct.unpack("<BH", payload[:3])
+    if first_missing == COMPLETE:
+        return []
+    return [
+        first_missing + (offset * 8) + bit
+        for offset, byte in enumerate(payload[3:])
+        for bit in range(8)
+        if byte & (1 << bit)
+    ]
+
+
+# An image is a bundle of files, each record:
+#
+# Field      Length   Notes
+# --------   ------   ---------------------------------------------
+# name_len   1        Length of name
+# data_len   4        Length of data
+# name       n        Path relative to the image directory, ASCII
+# data       n        File contents
+def pack_bundle(files: dict) -> bytes:
+    data = b""
+    for name in sorted(files):
+        encoded = name.encode()
+        data += struct.pack(RECORD_FORMAT, len(encoded), len(files[name])) + encoded + files[name]
+    return data
+
+
+def unpack_bundle(read):
+    """Walk a bundle with read(count) -> bytes
+
+    :return: Generator of (name, data_len, read), read the data before asking for the next record
+    """
+    header_len = struct.calcsize(RECORD_FORMAT)
+    while True:
+        header = read(header_len)
+        if len(header) < header_len:
+            return
+        name_len, data_len = struct.unpack(RECORD_FORMAT, header)
+        yield read(name_len).decode(), data_len, read
@@ -0,0 +1,149 @@
+import struct
+
+from ktane_lib.constants import CONSTANTS
+
+# Constants:
+MAX_PAYLOAD = CONSTANTS.PROTOCOL.MAX_PACKET_LEN - (1 + 2 + 2 + 1 + 1) - 2  # Less header and checksum
+HEADER_FORMAT = "<BBBBB"
+HEADER_LEN = 5
+FRAGMENT_LEN = MAX_PAYLOAD - HEADER_LEN
+MAX_FRAGMENTS = 255
+BITMAP_LEN = (MAX_FRAGMENTS + 7) // 8
+STATUS_WANTED = 0x01  # flags, answer with a FRAGMENT_STATUS
+STATUS_TRIES = 6  # Status requests in a row, unanswered or without progress, before giving up on a transfer
+
+# FRAGMENT_STATUS results
+IN_PROGRESS = 0
+COMPLETE = 1
+TOO_BIG = 2
+
+
+# FRAGMENT payload:
+#
+# Field         Length   Notes
+# -----------   ------   ----------------------------------------------------------
+# transfer_id   1        Picked by the sender, new for every message
+# packet_type   1        Type of the reassembled message, dispatched to its handler
+# index         1        Fragment number
+# count         1        Fragments in the message
+# flags         1        STATUS_WANTED
+# data          n        FRAGMENT_LEN bytes, fewer for the last fragment
+#
+# FRAGMENT_STATUS payload:
+#
+# Field         Length   Notes
+# -----------   ------   ----------------------------------------------------------
+# transfer_id   1        From the FRAGMENT
+# result        1        IN_PROGRESS, COMPLETE or TOO_BIG
+# bitmap        n        Bit per fragment, 1 if missing, only with IN_PROGRESS
+class Transfer:
+    """A message too big for one packet, on its way out
+
+    Fragments go out back to back without waiting for ACKs. The last fragment of each burst asks for a
+    FRAGMENT_STATUS, and the next burst is just the fragments it says are missing.
+    """
+
+    def __init__(self, dest: int, packet_type: int, payload: bytes, transfer_id: int, callback=None) -> None:
+        self.dest, self.packet_type, self.payload, self.transfer_id = dest, packet_type, payload, transfer_id
+        self.count = (len(payload) + FRAGMENT_LEN - 1) // FRAGMENT_LEN
+        if self.count > MAX_FRAGMENTS:
+            raise ValueError("payload too big")
+        self.to_send = list(range(self.count))
+        self.callback = callback  # callback(ok), from the poll loop
+        self.asking = None  # Fragment sent with STATUS_WANTED, while we wait for the answer
+        self.tries = 0
+        self.outstanding = self.count  # Fragments the receiver was missing at the last FRAGMENT_STATUS
+
+    def fragment(self, index: int, flags: int = 0) -> bytes:
+        return (
+            struct.pack(HEADER_FORMAT, self.transfer_id, self.packet_type, index, self.count, flags)
+            + self.payload[index * FRAGMENT_LEN : (index + 1) * FRAGMENT_LEN]
+        )
+
+    def missing(self, status: bytes):
+        """Fragments a FRAGMENT_STATUS asks for
+
+        :return: List of fragment numbers, [] if it's complete, None if the receiver can't take it or the status is too
+            short to make sense of
+        """
+        if len(status) < 2:
+            return None
+        _transfer_id, result = status[0], status[1]
+        if result == TOO_BIG:
+            return None
+        if result == COMPLETE:
+            return []
+        if len(status) < 2 + ((self.count + 7) // 8):
+            return None
+        return [index for index in range(self.count) if status[2 + (index >> 3)] & (1 << (index & 7))]
+
+
+class Reassembly:
+    """Collects the fragments of one incoming message in a preallocated buffer
+
+    One message at a time. A fragment of a different transfer starts over, and a transfer that goes quiet for
+    timeout_us is thrown away when the next fragment arrives. Once delivered, a message is remembered long enough to
+    answer the sender's last status requests COMPLETE, then forgotten too, so a sender that rebooted and reuses the
+    transfer ID isn't mistaken for a repeat.
+    """
+
+    def __init__(self, max_len: int, timeout_us: int) -> None:
+        self.buffer = bytearray(max_len)
+        self.received = bytearray(BITMAP_LEN)
+        self.timeout_us = timeout_us
+        self.source = self.transfer_id = None
+        self.packet_type = self.count = self.remaining = self.length = 0
+        self.expires = 0
+        self.delivered = False
+
+    def expire(self, now: int) -> None:
+        if (self.source is not None) and (now >= self.expires):
+            self.source = self.transfer_id = None
+
+    def add(self, source: int, payload: bytes, now: int) -> int:
+        """Take a FRAGMENT
+
+        :return: IN_PROGRESS, COMPLETE or TOO_BIG
+        """
+        transfer_id, packet_type, index, count, _flags = struct.unpack(HEADER_FORMAT, payload[:HEADER_LEN])
+        if (count * FRAGMENT_LEN) > (len(self.buffer) + FRAGMENT_LEN - 1) or (index >= count):
+            return TOO_BIG
+        self.expire(now)
+        if (
+            (source != self.source)
+            or (transfer_id != self.transfer_id)
+            or (packet_type != self.packet_type)
+            or (count != self.count)
+        ):
+            self.source, self.transfer_id, self.packet_type, self.count = source, transfer_id, packet_type, count
+            self.remaining = count
+            self.delivered = False
+            for offset in range(BITMAP_LEN):
+                self.received[offset] = 0
+        if not self.delivered:
+            self.expires = now + self.timeout_us
+
+        if not (self.received[index >> 3] & (1 << (index & 7))):
+            self.received[index >> 3] |= 1 << (index & 7)
+            self.remaining -= 1
+            data = payload[HEADER_LEN:]
+            start = index * FRAGMENT_LEN
+            self.buffer[start : start + len(data)] = data
+            if index == count - 1:
+                self.length = start + len(data)
+        return IN_PROGRESS if self.remaining else COMPLETE
+
+    def status(self, transfer_id: int, result: int) -> bytes:
+        if result != IN_PROGRESS:
+            return bytes((transfer_id, result))
+        missing = bytearray((self.count + 7) // 8)
+        for index in range(self.count):
+            if not (self.received[index >> 3] & (1 << (index & 7))):
+                missing[index >> 3] |= 1 << (index & 7)
+        return bytes((transfer_id, IN_PROGRESS)) + missing
+
+    def deliver(self, now: int) -> bytes:
+        """The complete message, once. Kept as delivered until the sender is done asking about it."""
+        self.delivered = True
+        self.expires = now + (2 * self.timeout_us)
+        return bytes(self.buffer[: self.length])
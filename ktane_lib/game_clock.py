@@ -0,0 +1,51 @@
+from ktane_lib.game_status import format_time
+
+# Constants:
+DRIFT_PPM = 200  # Worst case of two crystals at +/-100ppm
+SYNC_ERROR_US = 2000  # Worst case latency of the packet we synced to, one frame plus poll jitter
+
+
+class GameClock:
+    """Local replica of the bomb's countdown
+
+    Seeded from SHOW_TIME/SET_TIME/GAME_STATUS packets and advanced from ticks_us, so the displayed time can be checked
+    without asking the master. The error against the master's clock is bounded by error_bound_us().
+    """
+
+    def __init__(self, ticks_us) -> None:
+        self.ticks_us = ticks_us
+        self.remaining_us = 0
+        self.synced_at = None
+        self.running = False
+
+    def set(self, remaining_us: int, running=None) -> None:
+        """Resync to the master's idea of the time remaining"""
+        self.remaining_us = remaining_us
+        self.synced_at = self.ticks_us()
+        if running is not None:
+            self.running = running
+
+    def start(self) -> None:
+        if not self.running:
+            self.set(self.remaining_us, True)
+
+    def stop(self) -> None:
+        if self.running:
+            self.set(self.remaining(), False)
+
+    def remaining(self) -> int:
+        if self.running:
+            return max(self.remaining_us - (self.ticks_us() - self.synced_at), 0)
+        else:
+            return self.remaining_us
+
+    def time_string(self) -> bytes:
+        return format_time(self.remaining())
+
+    def error_bound_us(self) -> int:
+        if self.synced_at is None:
+            return self.remaining_us
+        elif self.running:
+            return SYNC_ERROR_US + (((self.ticks_us() - self.synced_at) * DRIFT_PPM) // 1000000)
+        else:
+            return SYNC_ERROR_US
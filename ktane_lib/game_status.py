@@ -0,0 +1,42 @@
+import struct
+
+# Constants:
+STATUS_FORMAT = "<?BL"
+SWITCH_TO_HUNDREDTHS_US = 60000000  # 60s
+
+
+def format_time(remaining_us: int) -> bytes:
+    """Format a time like the timer shows it, e.g. b" 1:12" or b"16.92\""""
+    if remaining_us < 0:
+        remaining_us = 0
+    if remaining_us >= SWITCH_TO_HUNDREDTHS_US:
+        seconds = remaining_us // 1000000
+        return b"%2d:%02d" % (seconds // 60, seconds % 60)
+    else:
+        hundredths = remaining_us // 10000
+        return b"%2d.%02d" % (hundredths // 100, hundredths % 100)
+
+
+class GameStatus:
+    """Latest GAME_STATUS broadcast from the master"""
+
+    def __init__(self) -> None:
+        self.running = False
+        self.strikes = 0
+        self.remaining_us = 0
+        self.received_at = None
+
+    # Payload:
+    #
+    # Field       Length   Notes
+    # ---------   ------   -----------------------------------------------
+    # running     1        1 if the game is in play, 0 otherwise
+    # strikes     1        Number of strikes
+    # remaining   4        Time remaining in us when the packet was sent
+    @staticmethod
+    def pack(running: bool, strikes: int, remaining_us: int) -> bytes:
+        return struct.pack(STATUS_FORMAT, running, strikes, max(remaining_us, 0))
+
+    def update(self, payload: bytes, now: int) -> None:
+        self.running, self.strikes, self.remaining_us = struct.unpack(STATUS_FORMAT, payload)
+        self.received_at = now
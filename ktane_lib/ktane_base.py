@@ -2,33 +2,139 @@ from random import randrange
 import struct
 
 from ktane_lib.constants import CONSTANTS
+from ktane_lib.fragments import COMPLETE, FRAGMENT_LEN, MAX_PAYLOAD, STATUS_TRIES, STATUS_WANTED, Reassembly, Transfer
+
+# Constants:
+HEADER_LEN = 1 + 2 + 2 + 1 + 1  # Length, source, dest, type, seq_num
+POOL_SIZE = 8
 
 
 class QueuedPacket:
+    __slots__ = ("dest", "packet_type", "payload")
+    pool = []  # Released packets, reused by acquire()
+
     def __init__(self, dest: int, packet_type: int, payload: bytes = b"") -> None:
         self.dest, self.packet_type, self.payload = dest, packet_type, payload
 
+    @classmethod
+    def acquire(cls, dest: int, packet_type: int, payload: bytes = b"") -> "QueuedPacket":
+        """A packet from the pool, or a new one if the pool is empty
+
+        KtaneBase releases it back to the pool once its request is complete.
+        """
+        if cls.pool:
+            packet = cls.pool.pop()
+            packet.dest, packet.packet_type, packet.payload = dest, packet_type, payload
+            return packet
+        return cls(dest, packet_type, payload)
+
+    def release(self) -> None:
+        self.payload = b""
+        if len(QueuedPacket.pool) < POOL_SIZE:
+            QueuedPacket.pool.append(self)
+
+
+class PendingRequest:
+    """Handle for a packet sent with KtaneBase.request()
+
+    packet goes back to the QueuedPacket pool once the callback has run, and is None from then on.
+    """
+
+    def __init__(self, packet: QueuedPacket, callback=None, deadline=None) -> None:
+        self.packet, self.callback, self.deadline = packet, callback, deadline
+        self.seq_num = self.next_retry = self.reply = None
+        self.timed_out = False
+
+    def done(self) -> bool:
+        return self.timed_out or (self.reply is not None)
+
+    def result(self):
+        """The response payload, or None if there isn't one (yet)"""
+        return self.reply
+
 
 class KtaneBase:
-    reply_storage: bytes
+    reassembly_len = 16 * FRAGMENT_LEN  # Largest message we can receive in fragments
+    reassembly_slots = 1  # Senders whose messages can be reassembled at once, only the first is preallocated
 
     def __init__(self, addr: int, uart, tx_en, LOG, idle, ticks_us) -> None:
         self.current_packet = b""
         self.rx_timeout = None
+        self.rx_busy = False  # Were bytes arriving on the last read_frame()?
+        self.bad_frames = 0  # Packets read_frame() threw away, runts, aborted or bad checksums
         self.addr, self.uart, self.tx_en, self.LOG = addr, uart, tx_en, LOG
         self.idle, self.ticks_us = idle, ticks_us
-        self.handlers = {CONSTANTS.PROTOCOL.PACKET_TYPE.STOP: self.stop}
+        self.handlers = {
+            CONSTANTS.PROTOCOL.PACKET_TYPE.STOP: self.stop,
+            CONSTANTS.PROTOCOL.PACKET_TYPE.FRAGMENT: self.fragment,
+        }
         self.queued = CONSTANTS.QUEUED_TASKS.NOTHING
         self.last_seq_seen = 0
-        self.next_retry = None
-        self.awaiting_ack_of_seq = self.queued_packet = None
+        self.pending = {}  # (dest, seq_num) -> PendingRequest
+        self.completed = []
+        self.tx_buffer = bytearray(CONSTANTS.PROTOCOL.MAX_PACKET_LEN)
+        self.tx_view = memoryview(self.tx_buffer)
+        self.transfers = []  # Outgoing Transfers, sent one at a time
+        self.next_transfer_id = randrange(0x100)  # Not the same IDs after every reboot
+        self.fragment_status_callback = self.on_fragment_status  # Bound once, not for every burst
+        self.reassemblies = [Reassembly(self.reassembly_len, CONSTANTS.PROTOCOL.TIMING.FRAGMENT_TIMEOUT_US)]
 
     def stop(self, _source: int, _dest: int, _payload: bytes):
         pass
 
     def queue_packet(self, packet: QueuedPacket) -> None:
-        self.queued_packet = packet
-        self.retry_now(CONSTANTS.PROTOCOL.TIMING.INITIAL_RETRY_US)
+        self.request(packet, retry_time=CONSTANTS.PROTOCOL.TIMING.INITIAL_RETRY_US)
+
+    def request(
+        self, packet: QueuedPacket, callback=None, timeout_us=None, retry_time=CONSTANTS.PROTOCOL.TIMING.RETRY_US
+    ) -> PendingRequest:
+        """Send a packet and retry it until it is answered, without blocking
+
+        Any number of requests may be outstanding. Replies are matched by source and sequence number. callback, if
+        given, is called with the PendingRequest from the poll loop once it is answered or timeout_us has passed.
+        Broadcasts are never answered, so they are done as soon as they are sent.
+        """
+        deadline = None if timeout_us is None else (self.ticks_us() + timeout_us)
+        request = PendingRequest(packet, callback, deadline)
+        self.transmit(request, retry_time)
+        return request
+
+    def transmit(self, request: PendingRequest, retry_time: int = CONSTANTS.PROTOCOL.TIMING.RETRY_US) -> None:
+        packet = request.packet
+        seq_num = (self.last_seq_seen + 1) & 0xFF
+        self.last_seq_seen = seq_num
+        self.send(packet.dest, packet.packet_type, seq_num, packet.payload)
+        if (packet.dest & CONSTANTS.MODULES.BROADCAST_MASK) == CONSTANTS.MODULES.BROADCAST_MASK:
+            request.reply = b""
+            self.completed.append(request)
+        else:
+            request.seq_num = seq_num
+            request.next_retry = self.ticks_us() + retry_time
+            self.pending[(packet.dest, seq_num)] = request
+
+    def check_pending(self) -> None:
+        now = self.ticks_us()
+        for key, request in list(self.pending.items()):
+            if (request.deadline is not None) and (now >= request.deadline):
+                # A retry can poll() while it waits for the bus, and that can answer or retry a request under our feet
+                if self.pending.pop(key, None) is None:
+                    continue
+                self.LOG.debug("request timed out")
+                request.timed_out = True
+                self.completed.append(request)
+            elif now >= request.next_retry:
+                if self.pending.pop(key, None) is None:
+                    continue
+                # Retries go out with a new sequence number
+                self.transmit(request)
+
+    def deliver_completed(self) -> None:
+        while self.completed:
+            request = self.completed.pop(0)
+            if request.callback:
+                request.callback(request)
+            request.packet.release()
+            request.packet = None
 
     def send_ack(self, dest: int, seq_num: int) -> None:
         self.send(dest, CONSTANTS.PROTOCOL.PACKET_TYPE.ACK, seq_num)
@@ -41,21 +147,112 @@ class KtaneBase:
         self.last_seq_seen = seq_num
         self.send(dest, packet_type, seq_num, payload)
 
-    def retry_now(self, retry_time: int = CONSTANTS.PROTOCOL.TIMING.RETRY_US) -> None:
-        seq_num = (self.last_seq_seen + 1) & 0xFF
-        self.last_seq_seen = self.awaiting_ack_of_seq = seq_num
-        self.send(self.queued_packet.dest, self.queued_packet.packet_type, seq_num, self.queued_packet.payload)
-        if self.queued_packet.dest & CONSTANTS.MODULES.BROADCAST_MASK:
-            self.queued_packet = self.next_retry = None
+    def send_large(self, dest: int, packet_type: int, payload: bytes, callback=None) -> None:
+        """Send a message that may not fit in one packet, without blocking
+
+        One that fits is just a request. Anything bigger is split into FRAGMENTs that the poll loop sends back to back,
+        and the receiver hands the reassembled message to its packet_type handler. The last fragment of each burst asks
+        which ones are missing and only those are sent again. callback, if given, is called with True once it's all
+        there, or False if the receiver can't take it or stops answering.
+        """
+        if len(payload) <= MAX_PAYLOAD:
+            on_reply = None if callback is None else (lambda request: callback(not request.timed_out))
+            packet = QueuedPacket.acquire(dest, packet_type, payload)
+            self.request(packet, on_reply, CONSTANTS.PROTOCOL.TIMING.REPLY_TIMEOUT_US)
+            return
+        if (dest & CONSTANTS.MODULES.BROADCAST_MASK) == CONSTANTS.MODULES.BROADCAST_MASK:
+            raise ValueError("fragments can't be broadcast")
+        self.next_transfer_id = (self.next_transfer_id + 1) & 0xFF
+        self.transfers.append(Transfer(dest, packet_type, payload, self.next_transfer_id, callback))
+
+    def send_fragment(self) -> None:
+        """Send the next fragment of the oldest transfer, unless it's waiting to hear what's missing"""
+        transfer = self.transfers[0]
+        if transfer.asking is not None:
+            return
+        index = transfer.to_send.pop(0)
+        if transfer.to_send:
+            self.send_without_queuing(transfer.dest, CONSTANTS.PROTOCOL.PACKET_TYPE.FRAGMENT, transfer.fragment(index))
+        else:
+            # Last of the burst, ask for a FRAGMENT_STATUS. Every try fits in the time the receiver waits before giving
+            # up on the message.
+            transfer.asking = index
+            packet = QueuedPacket.acquire(
+                transfer.dest, CONSTANTS.PROTOCOL.PACKET_TYPE.FRAGMENT, transfer.fragment(index, STATUS_WANTED)
+            )
+            self.request(
+                packet,
+                self.fragment_status_callback,
+                CONSTANTS.PROTOCOL.TIMING.FRAGMENT_TIMEOUT_US // STATUS_TRIES,
+                CONSTANTS.PROTOCOL.TIMING.FRAGMENT_TIMEOUT_US,
+            )
+
+    def on_fragment_status(self, request: PendingRequest) -> None:
+        transfer = self.transfers[0]  # Only the oldest is ever waiting for a FRAGMENT_STATUS
+        if request.timed_out:
+            transfer.tries += 1
+            missing = [transfer.asking]
         else:
-            self.next_retry = self.ticks_us() + retry_time
+            # Only answers that show progress start the count over, a receiver losing the message to another sender
+            # over and over would keep us going forever
+            missing = transfer.missing(request.result())
+            if (missing is not None) and (len(missing) < transfer.outstanding):
+                transfer.tries = 0
+            else:
+                transfer.tries += 1
+            if missing is not None:
+                transfer.outstanding = len(missing)
+        if transfer.tries >= STATUS_TRIES:
+            missing = None
+        transfer.asking = None
+        if missing:
+            transfer.to_send = missing
+            return
+        self.transfers.remove(transfer)
+        if missing is None:
+            self.LOG.warning("transfer to %x failed" % transfer.dest)
+        if transfer.callback:
+            transfer.callback(missing is not None)
+
+    # Payload:
+    #
+    # Described in ktane_lib/fragments.py
+    def fragment(self, source: int, dest: int, payload: bytes) -> bool:
+        now = self.ticks_us()
+        reassembly = self.reassembly_for(source, now)
+        result = reassembly.add(source, payload, now)
+        if payload[4] & STATUS_WANTED:
+            self.send_without_queuing(
+                source, CONSTANTS.PROTOCOL.PACKET_TYPE.FRAGMENT_STATUS, reassembly.status(payload[0], result)
+            )
+        if (result == COMPLETE) and not reassembly.delivered:
+            message = reassembly.deliver(now)
+            handler = self.handlers.get(reassembly.packet_type)
+            if handler:
+                handler(source, dest, message)
+
+        # Fragments aren't ACKed, the last of each burst is answered with a FRAGMENT_STATUS instead
+        return True
+
+    def reassembly_for(self, source: int, now: int) -> Reassembly:
+        """The Reassembly holding source's message, or one to start it in
 
-    def send_block_return_response(self, packet: QueuedPacket):
-        self.queued_packet = packet
-        self.retry_now()
-        while self.queued_packet:
-            KtaneBase.poll(self)  # Just this poll, not subclassed
-        return self.reply_storage
+        With every slot taken, the one that's been quiet longest starts over.
+        """
+        spare = None
+        for reassembly in self.reassemblies:
+            if reassembly.source == source:
+                return reassembly
+            reassembly.expire(now)
+            if (spare is None) and (reassembly.source is None):
+                spare = reassembly
+        if spare:
+            return spare
+        if len(self.reassemblies) < self.reassembly_slots:
+            spare = Reassembly(self.reassembly_len, CONSTANTS.PROTOCOL.TIMING.FRAGMENT_TIMEOUT_US)
+            self.reassemblies.append(spare)
+            return spare
+        return min(self.reassemblies, key=lambda reassembly: reassembly.expires)
 
     # UART MEMBERS
     #
@@ -75,11 +272,34 @@ class KtaneBase:
         """Poll UART"""
         was_idle = True
 
+        # Any complete packets?
+        frame = self.read_frame()
+        if self.rx_busy or frame:
+            was_idle = False
+        if frame:
+            self.dispatch_frame(frame)
+
+        # Need to retry?
+        if self.pending:
+            self.check_pending()
+        self.deliver_completed()
+
+        # Stream out messages too big for one packet
+        if self.transfers:
+            self.send_fragment()
+
+        self.check_queued_tasks(was_idle)
+
+    def read_frame(self):
+        """Collect bytes from the UART
+
+        :return: A complete packet with a good checksum, or None
+        """
         # Any UART data waiting?
         available = self.uart.any()
         buffered = len(self.current_packet)
+        self.rx_busy = bool(available)
         if available:
-            was_idle = False
             if buffered == 0:
                 self.current_packet = self.uart.read(1)
                 print(repr(self.current_packet))
@@ -89,6 +309,7 @@ class KtaneBase:
         elif self.rx_timeout and (self.ticks_us() > self.rx_timeout):
             # Aborted or scrambled packet
             self.LOG.warning("packet aborted")
+            self.bad_frames += 1
             self.current_packet = b""
             self.rx_timeout = None
 
@@ -97,6 +318,7 @@ class KtaneBase:
             if length < CONSTANTS.PROTOCOL.MIN_PACKET_LEN:
                 # Too short to be a real packet. Discard it.
                 self.LOG.debug("discarding %r", self.current_packet)
+                self.bad_frames += 1
                 self.current_packet = b""
             else:
                 if (buffered + available) < length:
@@ -111,51 +333,44 @@ class KtaneBase:
                     self.rx_timeout = None
 
                     # Is the checksum okay?
-                    (checksum,) = struct.unpack("<H", self.current_packet[-2:])
-                    checksum += sum(self.current_packet[:-2])
+                    frame, self.current_packet = self.current_packet, b""
+                    (checksum,) = struct.unpack("<H", frame[-2:])
+                    checksum += sum(frame[:-2])
                     if checksum == 0xFFFF:
-                        # Checksum is okay. Save the sequence number.
-                        source, dest, packet_type, seq_num = struct.unpack("<HHBB", self.current_packet[1:7])
-                        payload = self.current_packet[7:-2]
-                        self.current_packet = b""
-                        if (packet_type & CONSTANTS.PROTOCOL.PACKET_TYPE.RESPONSE_MASK) == 0:
-                            self.last_seq_seen = seq_num
-
-                        # Is it for us?
-                        if (
-                            (dest == self.addr)
-                            or (dest == CONSTANTS.MODULES.BROADCAST_ALL)
-                            or (dest == (self.addr | CONSTANTS.MODULES.BROADCAST_MASK))
-                        ):
-                            # Yes, for us. Was it a response?
-                            if (
-                                self.queued_packet
-                                and (packet_type & CONSTANTS.PROTOCOL.PACKET_TYPE.RESPONSE_MASK)
-                                and (source == self.queued_packet.dest)
-                                and (seq_num == self.awaiting_ack_of_seq)
-                            ):
-                                self.queued_packet = self.awaiting_ack_of_seq = self.next_retry = None
-                                self.LOG.debug("reply %r", payload)
-                                self.reply_storage = payload
-
-                            # Do we have a handler?
-                            handler = self.handlers.get(packet_type)
-                            if handler:
-                                # We have a handler. Hand off the packet. It will return a True if it took care of
-                                # ACKing.
-                                if not handler(source, dest, payload) and (
-                                    (dest & CONSTANTS.MODULES.BROADCAST_MASK) != CONSTANTS.MODULES.BROADCAST_MASK
-                                ):
-                                    self.send_ack(source, seq_num)
-
-                    else:
-                        self.current_packet = b""
+                        return frame
+                    self.bad_frames += 1
+        return None
 
-        # Need to retry?
-        if (self.next_retry is not None) and (self.ticks_us() >= self.next_retry):
-            self.retry_now()
+    def dispatch_frame(self, frame: bytes) -> None:
+        """Hand a packet from read_frame() to its handler"""
+        # Save the sequence number
+        source, dest, packet_type, seq_num = struct.unpack("<HHBB", frame[1:7])
+        payload = frame[7:-2]
+        if (packet_type & CONSTANTS.PROTOCOL.PACKET_TYPE.RESPONSE_MASK) == 0:
+            self.last_seq_seen = seq_num
 
-        self.check_queued_tasks(was_idle)
+        # Is it for us?
+        if (
+            (dest == self.addr)
+            or (dest == CONSTANTS.MODULES.BROADCAST_ALL)
+            or (dest == (self.addr | CONSTANTS.MODULES.BROADCAST_MASK))
+        ):
+            # Yes, for us. Was it a response to one of our requests?
+            if packet_type & CONSTANTS.PROTOCOL.PACKET_TYPE.RESPONSE_MASK:
+                request = self.pending.pop((source, seq_num), None)
+                if request:
+                    self.LOG.debug("reply %r", payload)
+                    request.reply = payload
+                    self.completed.append(request)
+
+            # Do we have a handler?
+            handler = self.handlers.get(packet_type)
+            if handler:
+                # We have a handler. Hand off the packet. It will return a True if it took care of ACKing.
+                if not handler(source, dest, payload) and (
+                    (dest & CONSTANTS.MODULES.BROADCAST_MASK) != CONSTANTS.MODULES.BROADCAST_MASK
+                ):
+                    self.send_ack(source, seq_num)
 
     def check_queued_tasks(self, was_idle):
         pass
@@ -166,21 +381,47 @@ class KtaneBase:
 
     def send(self, dest: int, packet_type: int, seq_num: int, payload: bytes = b"") -> None:
         """Send a packet"""
+        # Wait for a quiet bus first, poll() might send an ACK from tx_buffer while we wait
+        self.back_off(packet_type)
+        self.write_frame(self.build_frame(dest, packet_type, seq_num, payload))
+
+    def build_frame(self, dest: int, packet_type: int, seq_num: int, payload: bytes = b""):
+        """Fill tx_buffer without allocating
+
+        :return: A memoryview of the finished frame
+        """
+        buffer = self.tx_buffer
+        length = HEADER_LEN + len(payload)
+        struct.pack_into("<BHHBB", buffer, 0, length - 1, self.addr, dest, packet_type, seq_num)
+        checksum = 0
+        for index in range(HEADER_LEN):
+            checksum += buffer[index]
+        for index in range(len(payload)):
+            byte = payload[index]
+            buffer[HEADER_LEN + index] = byte
+            checksum += byte
+        struct.pack_into("<H", buffer, length, 0xFFFF - checksum)
+        return self.tx_view[: length + 2]
+
+    @staticmethod
+    def back_off_us(packet_type: int) -> int:
+        """How long to wait for a busy bus before trying to send"""
+        return (
+            randrange(*CONSTANTS.PROTOCOL.TIMING.BCAST_REPLY_BACKOFF)
+            if packet_type == CONSTANTS.PROTOCOL.PACKET_TYPE.RESPONSE_ID
+            else randrange(*CONSTANTS.PROTOCOL.TIMING.BACKOFF_TIME)
+        )
+
+    def back_off(self, packet_type: int) -> None:
         # Is anything inbound?
         while self.uart.any():
             # Yes, give it a chance to arrive instead of clobbering it
-
-            back_off = self.ticks_us() + (
-                randrange(*CONSTANTS.PROTOCOL.TIMING.BCAST_REPLY_BACKOFF)
-                if packet_type == CONSTANTS.PROTOCOL.PACKET_TYPE.RESPONSE_ID
-                else randrange(*CONSTANTS.PROTOCOL.TIMING.BACKOFF_TIME)
-            )
+            back_off = self.ticks_us() + self.back_off_us(packet_type)
             while self.ticks_us() < back_off:
                 self.poll()
 
-        # Send packet
-        data = struct.pack("<BHHBB", 2 + 2 + 1 + 1 + len(payload), self.addr, dest, packet_type, seq_num) + payload
-        data += struct.pack("<H", 0xFFFF - sum(data))
+    def write_frame(self, data) -> None:
+        """Put a complete packet on the wire, the bus must be quiet"""
         done = self.ticks_us() + (len(data) * CONSTANTS.UART.ONE_FRAME_US)
         self.tx_en.on()
         self.uart.write(data)
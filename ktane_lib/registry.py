@@ -0,0 +1,116 @@
+import struct
+
+from ktane_lib.constants import CONSTANTS
+
+# Constants:
+CACHE_VERSION = 1
+
+
+def id_slot(addr: int) -> int:
+    """Slot a module answers a broadcast REQUEST_ID in
+
+    Each unique byte gets ID_TYPE_LANES slots in a row, one for each module type, so modules of different types with
+    the same unique byte answer in different slots. Unique bytes from ID_SLOTS // ID_TYPE_LANES up wrap around and may
+    share a slot with another module.
+    """
+    lanes = CONSTANTS.PROTOCOL.TIMING.ID_TYPE_LANES
+    return ((addr & 0xFF) * lanes + ((addr >> 8) % lanes)) % CONSTANTS.PROTOCOL.TIMING.ID_SLOTS
+
+
+class ModuleInfo:
+    def __init__(self, addr: int, flags: int, version: int = 0) -> None:
+        self.addr, self.flags, self.version = addr, flags, version
+
+    @property
+    def module_type(self) -> int:
+        return self.addr >> 8
+
+    @property
+    def unique(self) -> int:
+        return self.addr & 0xFF
+
+    def __repr__(self) -> str:
+        return "<ModuleInfo addr=0x%04x flags=0x%02x version=%d>" % (self.addr, self.flags, self.version)
+
+
+class ModuleRegistry:
+    """Addresses and capabilities of every module found on the bus
+
+    Modules are told apart by address alone, so the unique byte must differ between modules of the same type. Two
+    modules with the same address, like unconfigured nodes of one type that all have unique byte 0, answer REQUEST_ID
+    in the same slot of every round and are registered as one. Modules whose slots only wrap around onto each other,
+    see id_slot(), collide in the first round and are sorted out by the repeats in SoundModule.
+    """
+
+    def __init__(self) -> None:
+        self.modules = {}
+
+    def __len__(self) -> int:
+        return len(self.modules)
+
+    def __iter__(self):
+        return iter(self.modules.values())
+
+    def __contains__(self, addr: int) -> bool:
+        return addr in self.modules
+
+    def get(self, addr: int):
+        return self.modules.get(addr)
+
+    def add(self, addr: int, flags: int, version: int = 0) -> bool:
+        """Add or update a module
+
+        :return: True if the registry changed
+        """
+        info = self.modules.get(addr)
+        if info and (info.flags == flags) and (info.version == version):
+            return False
+        self.modules[addr] = ModuleInfo(addr, flags, version)
+        return True
+
+    def remove(self, addr: int) -> None:
+        self.modules.pop(addr, None)
+
+    def clear(self) -> None:
+        self.modules = {}
+
+    def addresses_with(self, flag: int) -> set:
+        return set(addr for addr, info in self.modules.items() if info.flags & flag)
+
+    def triggers(self) -> set:
+        """Modules that must be disarmed to win"""
+        return self.addresses_with(CONSTANTS.MODULES.FLAGS.TRIGGER)
+
+    def highest_slot(self) -> int:
+        """Last REQUEST_ID slot any of these modules answers in, -1 if there are none"""
+        return max([-1] + [id_slot(addr) for addr in self.modules])
+
+    def to_bytes(self) -> bytes:
+        # Format:
+        #
+        # Field     Length   Notes
+        # -------   ------   ----------------------------------------------
+        # version   1        CACHE_VERSION
+        # count     2        Number of records that follow
+        #
+        # Followed by count records of:
+        #
+        # Field     Length   Notes
+        # -------   ------   ----------------------------------------------
+        # addr      2        Module address
+        # flags     1        From CONSTANTS.MODULES.FLAGS
+        # version   1        Firmware version reported in RESPONSE_ID
+        data = struct.pack("<BH", CACHE_VERSION, len(self.modules))
+        for info in self.modules.values():
+            data += struct.pack("<HBB", info.addr, info.flags, info.version)
+        return data
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "ModuleRegistry":
+        version, count = struct.unpack("<BH", data[:3])
+        if (version != CACHE_VERSION) or (len(data) != (3 + (count * 4))):
+            raise ValueError("bad topology cache")
+        registry = cls()
+        for offset in range(3, len(data), 4):
+            registry.add(*struct.unpack("<HBB", data[offset : offset + 4]))
+        return registry
@@ -0,0 +1,95 @@
+from ktane_lib.constants import CONSTANTS
+
+# Constants:
+MIN_WIRES = 3
+MAX_WIRES = 6
+NUM_COLORS = CONSTANTS.COLORS.YELLOW + 1  # Wires come in BLACK through YELLOW, which are also their digits in the key
+NO_ANSWER = 0x0F
+
+# Where each wire count starts in the table, the layouts of n wires take NUM_COLORS ** n entries
+OFFSETS = {}
+_offset = 0
+for _num_wires in range(MIN_WIRES, MAX_WIRES + 1):
+    OFFSETS[_num_wires] = _offset
+    _offset += NUM_COLORS**_num_wires
+TABLE_LEN = _offset
+
+
+def layout_key(colors: list) -> int:
+    """Table index of a list of wire colors, in post order
+
+    :return: The index, or None if there can't be an answer for that many wires
+    """
+    offset = OFFSETS.get(len(colors))
+    if offset is None:
+        return None
+    key = 0
+    for color in colors:
+        key = (key * NUM_COLORS) + color
+    return offset + key
+
+
+def nth(colors: list, number: int, color=None):
+    """Position in colors of the number'th wire (1 is first, -1 is last), optionally only counting one color"""
+    positions = [index for index, wire in enumerate(colors) if (color is None) or (wire == color)]
+    return positions[number - 1] if number > 0 else positions[number]
+
+
+def wire_to_cut(colors: list, last_serial_digit_odd: bool):
+    """The manual's rules
+
+    This is the reference version, tools/gen_wire_table.py runs it for every layout to build the table the modules use.
+
+    :return: Position in colors of the wire to cut, or None if the rules don't cover it
+    """
+    num_wires = len(colors)
+    red = colors.count(CONSTANTS.COLORS.RED)
+    blue = colors.count(CONSTANTS.COLORS.BLUE)
+    yellow = colors.count(CONSTANTS.COLORS.YELLOW)
+    white = colors.count(CONSTANTS.COLORS.WHITE)
+    black = colors.count(CONSTANTS.COLORS.BLACK)
+    if num_wires == 3:
+        if red == 0:  # No red
+            return nth(colors, 2)  # Cut second
+        elif colors[-1] == CONSTANTS.COLORS.WHITE:  # Last is white
+            return nth(colors, -1)  # Cut last
+        elif blue > 1:  # More than one blue
+            return nth(colors, -1, CONSTANTS.COLORS.BLUE)  # Cut last blue
+        else:
+            return nth(colors, -1)  # Cut last
+    elif num_wires == 4:
+        # More than one red and last digit of serial number is odd
+        if (red > 1) and last_serial_digit_odd:
+            return nth(colors, -1, CONSTANTS.COLORS.RED)  # Cut last red
+        # Last is yellow and no reds
+        elif (colors[-1] == CONSTANTS.COLORS.YELLOW) and (red == 0):
+            return nth(colors, 1)  # Cut first
+        elif blue == 1:  # Exactly one blue
+            return nth(colors, 1)  # Cut first
+        elif yellow > 1:  # More than one yellow
+            return nth(colors, -1)  # Cut last
+        else:
+            return nth(colors, 2)  # Cut second
+    elif num_wires == 5:
+        # Last is black and last digit of serial number is odd
+        if (colors[-1] == CONSTANTS.COLORS.BLACK) and last_serial_digit_odd:
+            return nth(colors, 4)  # Cut fourth
+        # Exactly one red and more than one yellow
+        elif (red == 1) and (yellow > 1):
+            return nth(colors, 1)  # Cut first
+        elif black == 0:  # No black
+            return nth(colors, 2)  # Cut second
+        else:
+            return nth(colors, 1)  # Cut first
+    elif num_wires == 6:
+        # No yellow and last digit of serial number is odd
+        if (yellow == 0) and last_serial_digit_odd:
+            return nth(colors, 3)  # Cut third
+        # Exactly one yellow and more than one white
+        elif (yellow == 1) and (white > 1):
+            return nth(colors, 4)  # Cut fourth
+        elif red == 0:  # No red
+            return nth(colors, -1)  # Cut last
+        else:
+            return nth(colors, 4)  # Cut fourth
+    return None
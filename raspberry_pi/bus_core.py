@@ -0,0 +1,120 @@
+import _thread
+from array import array
+from utime import ticks_us
+
+from ktane_lib.constants import CONSTANTS
+from ktane_lib.ktane_base import KtaneBase
+
+# Constants:
+QUEUE_DEPTH = 8  # Frames each way, a few more than a burst of replies
+
+
+class FrameQueue:
+    """Bounded queue of packets passed between the cores
+
+    Each slot is a preallocated bytearray big enough for any packet. The lock is only held to copy a frame in or out, so
+    neither core waits on the other for long. put() never blocks, it reports a full queue so the caller can decide what
+    to drop.
+    """
+
+    def __init__(self, depth: int = QUEUE_DEPTH) -> None:
+        self.slots = [bytearray(CONSTANTS.PROTOCOL.MAX_PACKET_LEN) for _ in range(depth)]
+        self.lengths = array("H", [0] * depth)
+        self.head = self.tail = self.count = 0
+        self.dropped = 0
+        self.lock = _thread.allocate_lock()
+
+    def full(self) -> bool:
+        return self.count == len(self.slots)
+
+    def put(self, frame) -> bool:
+        with self.lock:
+            if self.count == len(self.slots):
+                self.dropped += 1
+                return False
+            length = len(frame)
+            self.slots[self.head][:length] = frame
+            self.lengths[self.head] = length
+            self.head = (self.head + 1) % len(self.slots)
+            self.count += 1
+        return True
+
+    def get_into(self, buffer) -> int:
+        """Copy the oldest frame into buffer without allocating
+
+        :return: Its length, or 0 if the queue is empty
+        """
+        with self.lock:
+            if not self.count:
+                return 0
+            length = self.lengths[self.tail]
+            slot = self.slots[self.tail]
+            for index in range(length):
+                buffer[index] = slot[index]
+            self.tail = (self.tail + 1) % len(self.slots)
+            self.count -= 1
+        return length
+
+    def get(self):
+        """Oldest frame as bytes, or None if the queue is empty"""
+        with self.lock:
+            if not self.count:
+                return None
+            frame = bytes(self.slots[self.tail][: self.lengths[self.tail]])
+            self.tail = (self.tail + 1) % len(self.slots)
+            self.count -= 1
+        return frame
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class BusCore:
+    """Runs the UART side of a KtaneBase on the second core
+
+    Core 1 owns the UART and tx_en. It assembles and checksums incoming packets and puts them on rx, and takes outgoing
+    packets off tx and sends them once the bus is quiet. Core 0 parses and handles packets, so all protocol state
+    (sequence numbers, pending requests, handlers) stays on one core and needs no locking.
+    """
+
+    def __init__(self, node: KtaneBase) -> None:
+        self.node = node
+        self.rx = FrameQueue()
+        self.tx = FrameQueue()
+        self.running = False
+        self.outbound = bytearray(CONSTANTS.PROTOCOL.MAX_PACKET_LEN)
+        self.outbound_view = memoryview(self.outbound)
+        self.outbound_len = 0
+        self.send_at = 0
+
+    def start(self) -> None:
+        self.running = True
+        _thread.start_new_thread(self.run, ())
+
+    def run(self) -> None:
+        node = self.node
+        while self.running:
+            frame = KtaneBase.read_frame(node)
+            if frame:
+                self.rx.put(frame)
+
+            if not self.outbound_len:
+                self.outbound_len = self.tx.get_into(self.outbound)
+            if self.outbound_len:
+                if node.uart.any():
+                    # Someone else is talking, back off once they stop
+                    self.send_at = ticks_us() + node.back_off_us(self.outbound[5])
+                elif ticks_us() >= self.send_at:
+                    self.write_frame(self.outbound_view[: self.outbound_len])
+                    self.outbound_len = 0
+            # No idle() here, nothing would wake this core up again
+
+    def write_frame(self, data) -> None:
+        """KtaneBase.write_frame() without the idle(), spin until the last byte is out"""
+        node = self.node
+        done = ticks_us() + (len(data) * CONSTANTS.UART.ONE_FRAME_US)
+        node.tx_en.on()
+        node.uart.write(data)
+        while ticks_us() < done:
+            pass
+        node.tx_en.off()
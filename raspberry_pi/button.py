@@ -1,9 +1,10 @@
-from machine import Pin, Signal, Timer, disable_irq, enable_irq
-from random import choice, randrange
+from machine import Pin, Signal
+from random import choice
 import struct
 
+from ktane_lib.button_rules import compile_rules, required_digit
 from ktane_lib.constants import CONSTANTS
-from ktane_lib.ktane_base import QueuedPacket
+from ktane_lib.ktane_base import PendingRequest, QueuedPacket
 from hardware import KtaneHardware
 from log import LOG
 
@@ -32,11 +33,13 @@ BUTTON = Signal(BUTTON_PIN, invert=True)
 
 
 class ButtonModule(KtaneHardware):
+    status_rate = 1  # Time is tracked locally between broadcasts, this just corrects drift
+    needs_context = True  # For the batteries and indicators
+
     def __init__(self) -> None:
-        KtaneHardware.__init__(self, self.read_config())
+        KtaneHardware.__init__(self, CONSTANTS.MODULES.TYPES.BUTTON)
         self.handlers.update(
             {
-                CONSTANTS.PROTOCOL.PACKET_TYPE.REQUEST_ID: self.request_id,
                 CONSTANTS.PROTOCOL.PACKET_TYPE.CONFIGURE: self.configure,
                 CONSTANTS.PROTOCOL.PACKET_TYPE.START: self.start,
                 CONSTANTS.PROTOCOL.PACKET_TYPE.STOP: self.stop,
@@ -45,46 +48,22 @@ class ButtonModule(KtaneHardware):
             }
         )
         self.debouncing = False
+        self.debounce_timer = self.timers.allocate(self.on_debounce)
         self.button_color = None
         self.button_text = b""
-        self.num_batteries = 0
-        self.indicator_lit = False
-        self.indicator_label = b""
         self.strip_color = None
+        self.outcome = None
+        self.digit = None
         self.button_pushed = False
+        self.event_handlers.update(
+            {
+                CONSTANTS.EVENTS.BUTTON_PUSHED: self.pushed,
+                CONSTANTS.EVENTS.BUTTON_RELEASED: self.released,
+            }
+        )
         BUTTON_PIN.irq(self.on_button)
         self.set_strip(LED_MAP[CONSTANTS.COLORS.BLACK])
 
-    @staticmethod
-    def read_config() -> int:
-        # Format:
-        #
-        # Field    Length   Notes
-        # ------   ------   ---------------------------------------------
-        # unique   1        Unique portion of ID, assigned at manufacture
-        unique = b""
-        try:
-            file_obj = open(CONSTANTS.MODULES.CONFIG_FILENAME, "rb")
-            unique = file_obj.read(1)
-            file_obj.close()
-        except OSError:
-            pass
-
-        return (CONSTANTS.MODULES.TYPES.BUTTON << 8) | (ord(unique) if unique else 0x00)
-
-    def request_id(self, source: int, _dest: int, _payload: bytes) -> bool:
-        LOG.debug("request_id")
-        Timer(
-            mode=Timer.ONE_SHOT,
-            period=randrange(*CONSTANTS.PROTOCOL.TIMING.ID_SPREAD_MS),
-            callback=lambda timer: self.send_without_queuing(
-                source,
-                CONSTANTS.PROTOCOL.PACKET_TYPE.RESPONSE_ID,
-                struct.pack("BB", CONSTANTS.MODULES.FLAGS.TRIGGER, 0),
-            ),
-        )
-        return True
-
     def configure(self, _source: int, _dest: int, payload: bytes) -> bool:
         # Payload:
         #
@@ -92,33 +71,39 @@ class ButtonModule(KtaneHardware):
         # --------------   ------   -----------------------------------------
         # color            1        From CONSTANTS.COLORS
         # button_text      8        Text right-padded with \x00's
-        # num_batteries    1        Number of batteries visible
-        # indicator_lit    1        True if indicator is lit, False otherwise
-        # indicator_label  3        Label text
-        (
-            self.button_color,
-            self.button_text,
-            self.num_batteries,
-            indicator_lit,
-            self.indicator_label,
-        ) = struct.unpack("<B8sBB3s", payload)
-        self.indicator_lit = bool(indicator_lit)
+        #
+        # Batteries and indicators come from the bomb context
+        self.button_color, self.button_text = struct.unpack("<B8s", payload)
         LOG.debug("configure", payload)
         return False
 
-    def start(self, _source: int, _dest: int, _payload: bytes) -> bool:
+    def start(self, source: int, dest: int, payload: bytes) -> bool:
         # Payload is the difficulty but we're not adjustable so we ignore it
         LOG.debug("start")
-        if self.button_color is not None:
-            self.strip_color = choice(STRIP_COLORS)
-            self.set_mode(CONSTANTS.MODES.ARMED)
-        else:
+        KtaneHardware.start(self, source, dest, payload)
+        if self.button_color is None:
             self.unable_to_arm()
             self.set_mode(CONSTANTS.MODES.SLEEP)
+        elif self.context.version is None:
+            self.set_mode(CONSTANTS.MODES.READY)  # Armed by context_changed()
+        else:
+            self.arm()
         return False
 
+    def context_changed(self):
+        if self.mode == CONSTANTS.MODES.READY:
+            self.arm()
+
+    def arm(self):
+        self.outcome = compile_rules(
+            self.button_color, self.button_text, self.context.num_batteries, self.context.lit_labels()
+        )
+        self.strip_color = choice(STRIP_COLORS)
+        self.digit = required_digit(self.outcome, self.strip_color)
+        self.set_mode(CONSTANTS.MODES.ARMED)
+
     # Called during an interrupt! Don't allocate memory or waste time!
-    def on_debounce(self, _timer):
+    def on_debounce(self, _slot):
         self.debouncing = False
 
         # Just in case they've released it already...
@@ -130,44 +115,38 @@ class ButtonModule(KtaneHardware):
             button = BUTTON.value()
             if self.button_pushed != button:
                 self.debouncing = True
-                Timer(period=DEBOUNCE_MS, mode=Timer.ONE_SHOT, callback=self.on_debounce)
+                self.timers.start(self.debounce_timer, DEBOUNCE_MS)
                 self.button_pushed = button
-                if button:
-                    self.pushed()
-                else:
-                    self.released()
+                self.events.post(CONSTANTS.EVENTS.BUTTON_PUSHED if button else CONSTANTS.EVENTS.BUTTON_RELEASED)
 
-    # Called during an interrupt! Don't allocate memory or waste time!
     def set_strip(self, rgb: int):
         for index in range(4):
             RED_LEDS[index].value(rgb & 0x4)
             GREEN_LEDS[index].value(rgb & 0x2)
             BLUE_LEDS[index].value(rgb & 0x1)
 
-    # Called during an interrupt! Don't allocate memory or waste time!
-    def pushed(self):
+    def pushed(self, _arg: int, _stamp: int):
         LOG.info("pushed")
         self.set_strip(LED_MAP[self.strip_color])
 
-    # Called during an interrupt! Don't allocate memory or waste time!
-    def released(self):
+    def released(self, _arg: int, _stamp: int):
         LOG.info("released")
         self.set_strip(LED_MAP[CONSTANTS.COLORS.BLACK])
-        self.queued |= CONSTANTS.QUEUED_TASKS.READ_STATUS
-
-    def check_queued_tasks(self, was_idle):
-        if self.queued & CONSTANTS.QUEUED_TASKS.READ_STATUS:
-            self.LOG.debug("read status")
-            was_idle = False
-            state = disable_irq()
-            self.queued &= ~CONSTANTS.QUEUED_TASKS.READ_STATUS
-            enable_irq(state)
-            payload = self.send_block_return_response(
-                QueuedPacket(CONSTANTS.MODULES.MASTER_ADDR, CONSTANTS.PROTOCOL.PACKET_TYPE.READ_STATUS)
+        if self.clock.synced_at is None:
+            # Never heard the time, so ask
+            self.request(
+                QueuedPacket.acquire(CONSTANTS.MODULES.MASTER_ADDR, CONSTANTS.PROTOCOL.PACKET_TYPE.READ_STATUS),
+                self.on_status,
+                CONSTANTS.PROTOCOL.TIMING.REPLY_TIMEOUT_US,
             )
-            self.status(payload)
+        else:
+            self.evaluate(self.clock.time_string())
 
-        KtaneHardware.check_queued_tasks(self, was_idle)
+    def on_status(self, request: PendingRequest):
+        if request.timed_out:
+            LOG.warning("no status")
+        else:
+            self.status(request.result())
 
     def status(self, payload: bytes = b""):
     # def status(self, _source: int, _dest: int, payload: bytes = b"") -> bool:
@@ -180,42 +159,15 @@ class ButtonModule(KtaneHardware):
         # time      5        Time as a string, like " 1:12" or "16.92"
         LOG.debug("status", payload)
         _running, _strikes, time = struct.unpack("BB5s", payload)
-
-        # Game logic
-        if (self.button_color == CONSTANTS.COLORS.BLUE) and (self.button_text == CONSTANTS.LABELS.ABORT):
-            self.check_time(time)
-        elif (self.num_batteries > 1) and (self.button_text == CONSTANTS.LABELS.DETONATE):
-            self.disarmed()
-        elif (
-            (self.button_color == CONSTANTS.COLORS.WHITE)
-            and self.indicator_lit
-            and (self.indicator_label == CONSTANTS.LABELS.CAR)
-        ):
-            self.check_time(time)
-        elif (self.num_batteries > 2) and self.indicator_lit and (self.indicator_label == CONSTANTS.LABELS.FKR):
-            self.disarmed()
-        elif self.button_color == CONSTANTS.COLORS.YELLOW:
-            self.check_time(time)
-        elif (self.button_color == CONSTANTS.COLORS.RED) and (self.button_text == CONSTANTS.LABELS.HOLD):
-            self.disarmed()
-        else:
-            self.check_time(time)
+        self.evaluate(time)
 
         # return True  # The status message is essentially an ACK, so no additional ACK is required
 
-    def check_time(self, time: bytes):
-        if self.strip_color == CONSTANTS.COLORS.BLUE:
-            match = b"4" in time
-        elif self.strip_color == CONSTANTS.COLORS.WHITE:
-            match = b"1" in time
-        elif self.strip_color == CONSTANTS.COLORS.YELLOW:
-            match = b"5" in time
-        else:
-            match = b"1" in time
-
-        state = disable_irq()
-        if match:
-            self.queued |= CONSTANTS.QUEUED_TASKS.DISARMED
+    def evaluate(self, time: bytes):
+        # Game logic, compiled by arm(), see ktane_lib/button_rules.py
+        if self.mode != CONSTANTS.MODES.ARMED:
+            return
+        if (self.digit is None) or (self.digit in time):
+            self.disarmed()
         else:
-            self.queued |= CONSTANTS.QUEUED_TASKS.STRIKE
-        enable_irq(state)
+            self.strike()
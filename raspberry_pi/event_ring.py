@@ -0,0 +1,52 @@
+from array import array
+
+# Constants:
+CAPACITY = 32  # Must be a power of 2
+
+
+class EventRing:
+    """Events posted by interrupt handlers, drained by the poll loop
+
+    Each event is a code, a small argument and the ticks_us it happened at, stored in preallocated arrays. Only the
+    producer writes head and only the consumer writes tail, so no critical section is needed as long as producers don't
+    preempt each other. Pin and Timer callbacks are soft interrupts, which are serialized, so they count as one
+    producer. One slot is kept empty to tell full from empty. If the ring fills, new events are counted in dropped.
+    """
+
+    def __init__(self, ticks_us, capacity: int = CAPACITY) -> None:
+        self.ticks_us = ticks_us
+        self.mask = capacity - 1
+        self.codes = bytearray(capacity)
+        self.args = array("i", [0] * capacity)
+        self.stamps = array("L", [0] * capacity)
+        self.head = self.tail = 0
+        self.dropped = 0
+
+    # Called during an interrupt! Don't allocate memory or waste time!
+    def post(self, code: int, arg: int = 0) -> None:
+        head = self.head
+        following = (head + 1) & self.mask
+        if following == self.tail:
+            self.dropped += 1
+        else:
+            self.codes[head] = code
+            self.args[head] = arg
+            self.stamps[head] = self.ticks_us()
+            self.head = following  # Publish only once the record is complete
+
+    def pending(self) -> bool:
+        return self.head != self.tail
+
+    def dispatch(self, handlers: dict) -> bool:
+        """Hand every pending event to handlers[code](arg, stamp)
+
+        :return: True if there were any
+        """
+        if self.head == self.tail:
+            return False
+        while self.head != self.tail:
+            tail = self.tail
+            code, arg, stamp = self.codes[tail], self.args[tail], self.stamps[tail]
+            self.tail = (tail + 1) & self.mask
+            handlers[code](arg, stamp)
+        return True
@@ -1,9 +1,19 @@
 from ktane_lib.constants import CONSTANTS
-from machine import Pin, UART, Signal, disable_irq, enable_irq, idle
+from machine import Pin, UART, Signal, idle
+from random import randrange
+import struct
 from utime import ticks_us
 
+from event_ring import EventRing
 from log import LOG
-from ktane_lib.ktane_base import KtaneBase, QueuedPacket
+from memory import MemoryManager
+from node_config import NodeConfig
+from soft_timer import TimerService
+from ktane_lib.context import BombContext
+from ktane_lib.game_clock import GameClock
+from ktane_lib.game_status import GameStatus
+from ktane_lib.ktane_base import KtaneBase, PendingRequest, QueuedPacket
+from ktane_lib.registry import id_slot
 
 # Constants:
 UART_NUM = 1
@@ -14,14 +24,55 @@ TX_EN_PIN = 15
 STATUS_RED = 28
 STATUS_GREEN = 27
 
+FIRMWARE_VERSION = 1
+
 
 class KtaneHardware(KtaneBase):
     mode: int
+    flags = CONSTANTS.MODULES.FLAGS.TRIGGER  # Reported in RESPONSE_ID, override in subclasses
+    status_rate = None  # GAME_STATUS broadcasts per second to subscribe to (0 for changes only), None to opt out
+    dual_core = False  # Run the UART on the second core, see bus_core.py
+    probes_enabled = False  # Collect latency histograms for READ_STATS, see probes.py
+    needs_context = False  # Ask the master for the bomb context at START if we never heard it
 
-    def __init__(self, addr: int) -> None:
+    def __init__(self, module_type: int) -> None:
+        self.config = NodeConfig.shared()
         uart = UART(UART_NUM, CONSTANTS.UART.BAUD_RATE, tx=Pin(TX_PIN), rx=Pin(RX_PIN))
         tx_en = Pin(TX_EN_PIN, Pin.OUT)
-        KtaneBase.__init__(self, addr, uart, tx_en, LOG, idle, ticks_us)
+        KtaneBase.__init__(self, (module_type << 8) | self.config.unique, uart, tx_en, LOG, idle, ticks_us)
+        self.bus_core = None
+        self.boot_us = 0  # From power on to ready for REQUEST_ID, set by main.py
+        self.memory = MemoryManager()
+        self.receiving = False
+        self.probes = None
+        self.timers = TimerService()
+        self.events = EventRing(ticks_us)
+        self.event_handlers = {}  # Event code -> handler(arg, stamp), called from the poll loop
+        self.handlers.update(
+            {
+                CONSTANTS.PROTOCOL.PACKET_TYPE.REQUEST_ID: self.request_id,
+                CONSTANTS.PROTOCOL.PACKET_TYPE.GAME_STATUS: self.game_status,
+                CONSTANTS.PROTOCOL.PACKET_TYPE.SHOW_TIME: self.show_time,
+                CONSTANTS.PROTOCOL.PACKET_TYPE.SET_TIME: self.set_time,
+                CONSTANTS.PROTOCOL.PACKET_TYPE.START: self.start,
+                CONSTANTS.PROTOCOL.PACKET_TYPE.READ_STATS: self.read_stats,
+                CONSTANTS.PROTOCOL.PACKET_TYPE.CONTEXT: self.bomb_context,
+                CONSTANTS.PROTOCOL.PACKET_TYPE.READ_CONFIG: self.read_config,
+                CONSTANTS.PROTOCOL.PACKET_TYPE.WRITE_CONFIG: self.write_config,
+                CONSTANTS.PROTOCOL.PACKET_TYPE.UPDATE_BEGIN: self.update_begin,
+                CONSTANTS.PROTOCOL.PACKET_TYPE.UPDATE_CHUNK: self.update_chunk,
+                CONSTANTS.PROTOCOL.PACKET_TYPE.UPDATE_QUERY: self.update_query,
+                CONSTANTS.PROTOCOL.PACKET_TYPE.UPDATE_COMMIT: self.update_commit,
+            }
+        )
+        self.latest_status = GameStatus()
+        self.context = BombContext()
+        self.clock = GameClock(ticks_us)
+        self.id_requester = CONSTANTS.MODULES.MASTER_ADDR
+        self.send_id_at = 0
+        self.updater = None  # Created by the first UPDATE_BEGIN, see updater.py
+        self.update_requester = CONSTANTS.MODULES.MASTER_ADDR
+        self.send_update_status_at = 0
         self.status_red = Signal(Pin(STATUS_RED, Pin.OUT), invert=True)
         self.status_green = Signal(Pin(STATUS_GREEN, Pin.OUT), invert=True)
         self.set_mode(CONSTANTS.MODES.SLEEP)
@@ -41,38 +92,260 @@ class KtaneHardware(KtaneBase):
             self.status_green.on()
             self.status_red.off()
 
+    def request_id(self, source: int, dest: int, payload: bytes) -> bool:
+        # Payload (optional):
+        #
+        # Field     Length   Notes
+        # -------   ------   ------------------------------------------------------
+        # slot_us   2        Width of a response slot, defaults to the config's id_slot_us
+        # laps      1        Optional, answer in a random one of this many rounds of ID_SLOTS slots
+        #
+        # Broadcast requests are answered in the slot given by our address, see id_slot(), so that every module gets
+        # the bus to itself. Slots that wrap around can still collide, so the master asks again with laps to spread
+        # them out. Requests addressed to us directly are answered right away.
+        LOG.debug("request_id")
+        if dest == self.addr:
+            delay = 0
+        else:
+            slot_us = struct.unpack("<H", payload[:2])[0] if len(payload) >= 2 else self.config.id_slot_us
+            slot = id_slot(self.addr)
+            if len(payload) > 2:
+                slot += randrange(max(1, payload[2])) * CONSTANTS.PROTOCOL.TIMING.ID_SLOTS
+            delay = slot * slot_us
+        self.id_requester = source
+        self.send_id_at = ticks_us() + delay
+        self.queued |= CONSTANTS.QUEUED_TASKS.SEND_ID
+        return True  # The RESPONSE_ID is our ACK
+
+    def send_id(self) -> None:
+        # Payload:
+        #
+        # Field     Length   Notes
+        # -------   ------   -----------------------------------------
+        # flags     1        From CONSTANTS.MODULES.FLAGS
+        # version   1        Firmware version from the node config, FIRMWARE_VERSION if never updated
+        # rate      1        Only if status_rate isn't None, subscribes us to GAME_STATUS
+        version = self.config.firmware or FIRMWARE_VERSION
+        if self.status_rate is None:
+            payload = struct.pack("BB", self.flags, version)
+        else:
+            payload = struct.pack("BBB", self.flags, version, self.status_rate)
+        self.send_without_queuing(self.id_requester, CONSTANTS.PROTOCOL.PACKET_TYPE.RESPONSE_ID, payload)
+
+    def game_status(self, _source: int, _dest: int, payload: bytes) -> bool:
+        self.latest_status.update(payload, ticks_us())
+        self.clock.set(self.latest_status.remaining_us, self.latest_status.running)
+        return True  # Broadcast, never ACKed
+
+    def show_time(self, _source: int, _dest: int, payload: bytes) -> bool:
+        # Payload is the game length in us
+        (time_left,) = struct.unpack("<L", payload)
+        self.clock.set(time_left, False)
+        return False
+
+    def set_time(self, _source: int, _dest: int, payload: bytes) -> bool:
+        # Payload is the time remaining in us
+        (time_left,) = struct.unpack("<L", payload)
+        self.clock.set(time_left, True)
+        return False
+
+    def start(self, _source: int, _dest: int, _payload: bytes) -> bool:
+        self.clock.start()
+        if self.needs_context and (self.context.version is None):
+            # Missed the broadcast, ask for it. Subclasses wait in READY until context_changed().
+            self.request(
+                QueuedPacket.acquire(CONSTANTS.MODULES.MASTER_ADDR, CONSTANTS.PROTOCOL.PACKET_TYPE.READ_CONTEXT),
+                self.on_context,
+                CONSTANTS.PROTOCOL.TIMING.REPLY_TIMEOUT_US,
+            )
+        return False
+
+    def bomb_context(self, _source: int, _dest: int, payload: bytes) -> bool:
+        # Payload is described in BombContext. Broadcast by the master once per game, or the reply to READ_CONTEXT.
+        if self.context.update(payload):
+            LOG.info("context version", self.context.version)
+            self.context_changed()
+        return True  # Broadcast or a reply, never ACKed
+
+    def on_context(self, request: PendingRequest) -> None:
+        # bomb_context() has already taken the reply
+        if request.timed_out:
+            LOG.warning("no context")
+            if self.mode == CONSTANTS.MODES.READY:
+                self.unable_to_arm()
+                self.set_mode(CONSTANTS.MODES.SLEEP)
+
+    def context_changed(self) -> None:
+        pass
+
+    def poll_forever(self):
+        # Imported here so nodes that don't use them don't pay for them at boot
+        if self.probes_enabled:
+            from probes import Probes
+
+            self.probes = Probes()
+            self.probes.install(self)
+        if self.dual_core:
+            from bus_core import BusCore
+
+            self.bus_core = BusCore(self)
+            self.bus_core.start()
+        KtaneBase.poll_forever(self)
+
+    def read_frame(self):
+        if self.bus_core:
+            return self.bus_core.rx.get()
+        frame = KtaneBase.read_frame(self)
+
+        # A collection in the middle of a packet could overrun the UART FIFO, so receiving is a critical window
+        receiving = bool(self.current_packet)
+        if receiving != self.receiving:
+            self.receiving = receiving
+            if receiving:
+                self.memory.begin()
+            else:
+                self.memory.end()
+        return frame
+
+    def back_off_us(self, packet_type: int) -> int:
+        # Tuned range from the config, except for RESPONSE_IDs which have to stay in their slot
+        if packet_type == CONSTANTS.PROTOCOL.PACKET_TYPE.RESPONSE_ID:
+            return KtaneBase.back_off_us(packet_type)
+        return randrange(*self.config.back_off_range())
+
+    def back_off(self, packet_type: int) -> None:
+        if not self.bus_core:
+            # Core 1 does the back-off when it has the UART
+            KtaneBase.back_off(self, packet_type)
+
+    def write_frame(self, data) -> None:
+        if self.bus_core:
+            # If core 1 is this far behind, wait for it
+            while self.bus_core.tx.full():
+                pass
+            self.bus_core.tx.put(data)
+        else:
+            KtaneBase.write_frame(self, data)
+
     def check_queued_tasks(self, was_idle):
-        if self.queued & CONSTANTS.QUEUED_TASKS.STRIKE:
+        # Anything from the interrupt handlers?
+        if self.events.dispatch(self.event_handlers):
+            was_idle = False
+
+        if self.queued & CONSTANTS.QUEUED_TASKS.SEND_ID:
+            # Don't idle while waiting for our slot, we might oversleep it
             was_idle = False
-            self.strike()
-            state = disable_irq()
-            self.queued &= ~CONSTANTS.QUEUED_TASKS.STRIKE
-            enable_irq(state)
+            if ticks_us() >= self.send_id_at:
+                self.queued &= ~CONSTANTS.QUEUED_TASKS.SEND_ID
+                self.send_id()
 
-        if self.queued & CONSTANTS.QUEUED_TASKS.DISARMED:
+        if self.queued & CONSTANTS.QUEUED_TASKS.SEND_UPDATE_STATUS:
             was_idle = False
-            self.disarmed()
-            state = disable_irq()
-            self.queued &= ~CONSTANTS.QUEUED_TASKS.DISARMED
-            enable_irq(state)
+            if ticks_us() >= self.send_update_status_at:
+                self.queued &= ~CONSTANTS.QUEUED_TASKS.SEND_UPDATE_STATUS
+                self.send_without_queuing(
+                    self.update_requester, CONSTANTS.PROTOCOL.PACKET_TYPE.UPDATE_STATUS, self.updater.status()
+                )
 
-        if was_idle:
+        # Spend idle gaps collecting garbage when it's due, otherwise sleep
+        if was_idle and not self.memory.idle():
             self.idle()
 
+    def read_stats(self, source: int, _dest: int, payload: bytes) -> bool:
+        # Payload:
+        #
+        # Field      Length   Notes
+        # --------   ------   ----------------------------------------
+        # selector   1        From CONSTANTS.STATS, defaults to MEMORY
+        #
+        # Response payload is the selector followed by that report
+        selector = payload[0] if payload else CONSTANTS.STATS.MEMORY
+        if selector == CONSTANTS.STATS.MEMORY:
+            report = self.memory.stats()
+        elif selector == CONSTANTS.STATS.BOOT:
+            report = struct.pack("<L", self.boot_us)
+        elif self.probes:
+            report = self.probes.report(selector)
+        else:
+            report = b""
+        self.send_without_queuing(source, CONSTANTS.PROTOCOL.PACKET_TYPE.STATS, bytes((selector,)) + report)
+        return True  # The STATS is our ACK
+
+    def read_config(self, source: int, _dest: int, _payload: bytes) -> bool:
+        # Response payload is the whole record, see NodeConfig.pack()
+        self.send_without_queuing(source, CONSTANTS.PROTOCOL.PACKET_TYPE.CONFIG, self.config.pack())
+        return True  # The CONFIG is our ACK
+
+    def write_config(self, _source: int, _dest: int, payload: bytes) -> bool:
+        # Payload:
+        #
+        # Field    Length   Notes
+        # ------   ------   ---------------------------------------------------------
+        # offset   1        Where in the record to write, past the protected header
+        # data     n        Bytes to write there
+        #
+        # Saved to flash if anything changed. Takes effect right away, except the address.
+        if not (payload and self.config.patch(payload[0], payload[1:])):
+            LOG.warning("bad config write")
+        return False
+
+    def update_begin(self, _source: int, _dest: int, payload: bytes) -> bool:
+        # Payload is described in ktane_lib/firmware.py. Updates are only taken between games.
+        if self.mode != CONSTANTS.MODES.ARMED:
+            if not self.updater:
+                from updater import Updater
+
+                self.updater = Updater(self)
+            self.updater.begin(payload)
+        return True  # Broadcast, never ACKed
+
+    def update_chunk(self, _source: int, _dest: int, payload: bytes) -> bool:
+        # No flash writes mid-game, the chunk is asked for again later
+        if self.updater and (self.mode != CONSTANTS.MODES.ARMED):
+            self.updater.chunk(payload)
+        return True  # Broadcast, never ACKed
+
+    def update_query(self, source: int, dest: int, payload: bytes) -> bool:
+        # Payload (optional):
+        #
+        # Field     Length   Notes
+        # -------   ------   ---------------------------------------------------------
+        # slot_us   2        Width of a response slot, defaults to UPDATE_SLOT_US
+        #
+        # Answered with an UPDATE_STATUS in our slot, like REQUEST_ID
+        if self.updater:
+            if dest == self.addr:
+                delay = 0
+            else:
+                slot_us = CONSTANTS.PROTOCOL.TIMING.UPDATE_SLOT_US
+                if len(payload) == 2:
+                    (slot_us,) = struct.unpack("<H", payload)
+                delay = (self.addr & 0xFF) * slot_us
+            self.update_requester = source
+            self.send_update_status_at = ticks_us() + delay
+            self.queued |= CONSTANTS.QUEUED_TASKS.SEND_UPDATE_STATUS
+        return True  # The UPDATE_STATUS is our ACK
+
+    def update_commit(self, _source: int, _dest: int, _payload: bytes) -> bool:
+        if self.updater and (self.mode != CONSTANTS.MODES.ARMED):
+            self.updater.commit()  # Resets if there's a new image ready
+        return True  # Broadcast, never ACKed
+
     def unable_to_arm(self) -> None:
         LOG.info("error")
-        self.queue_packet(QueuedPacket(CONSTANTS.MODULES.MASTER_ADDR, CONSTANTS.PROTOCOL.PACKET_TYPE.ERROR))
+        self.queue_packet(QueuedPacket.acquire(CONSTANTS.MODULES.MASTER_ADDR, CONSTANTS.PROTOCOL.PACKET_TYPE.ERROR))
 
     def disarmed(self):
         LOG.info("disarmed")
-        self.queue_packet(QueuedPacket(CONSTANTS.MODULES.MASTER_ADDR, CONSTANTS.PROTOCOL.PACKET_TYPE.DISARMED))
+        self.queue_packet(QueuedPacket.acquire(CONSTANTS.MODULES.MASTER_ADDR, CONSTANTS.PROTOCOL.PACKET_TYPE.DISARMED))
         self.set_mode(CONSTANTS.MODES.DISARMED)
 
     def strike(self):
         LOG.info("strike")
-        self.queue_packet(QueuedPacket(CONSTANTS.MODULES.MASTER_ADDR, CONSTANTS.PROTOCOL.PACKET_TYPE.STRIKE))
+        self.queue_packet(QueuedPacket.acquire(CONSTANTS.MODULES.MASTER_ADDR, CONSTANTS.PROTOCOL.PACKET_TYPE.STRIKE))
 
     def stop(self, _source: int, _dest: int, _payload: bytes) -> bool:
         LOG.info("stop")
+        self.clock.stop()
         self.set_mode(CONSTANTS.MODES.SLEEP)
         return False
@@ -1,17 +1,49 @@
-try:
-    from timer import TimerModule
-    TimerModule().poll_forever()
-except ImportError:
-    pass
+import os
+import sys
+from utime import ticks_us
+
+STARTED = ticks_us()
+
+from ktane_lib.constants import CONSTANTS  # noqa: E402
+from log import LOG  # noqa: E402
+from node_config import NodeConfig  # noqa: E402
+
+# Module type -> (module, class). Only the one named in the node config is imported, so a node never compiles or runs
+# the module-level code (pin tables and the like) of the others.
+MODULES = {
+    CONSTANTS.MODULES.TYPES.TIMER: ("timer", "TimerModule"),
+    CONSTANTS.MODULES.TYPES.WIRES: ("wires", "WireModule"),
+    CONSTANTS.MODULES.TYPES.BUTTON: ("button", "ButtonModule"),
+    CONSTANTS.MODULES.TYPES.MORSE: ("morse", "MorseModule"),
+}
 
-try:
-    from wires import WireModule
-    WireModule().poll_forever()
-except ImportError:
-    pass
 
+def load(module_type):
+    if module_type in MODULES:
+        module_name, class_name = MODULES[module_type]
+        return getattr(__import__(module_name), class_name)
+
+    # No type configured, use whichever module this image has, like we used to
+    for module_name, class_name in MODULES.values():
+        try:
+            return getattr(__import__(module_name), class_name)
+        except ImportError:
+            pass
+    raise ImportError("no module")
+
+
+config = NodeConfig.shared()
 try:
-    from button import ButtonModule
-    ButtonModule().poll_forever()
-except ImportError:
-    pass
+    os.stat(config.image_dir())
+except OSError:
+    pass  # Never updated over the bus, run what's on the filesystem
+else:
+    sys.path.insert(0, "/" + config.image_dir())
+
+    # Start over with the image's own copies of what we've imported so far
+    for name in list(sys.modules):
+        del sys.modules[name]
+node = load(config.module_type)()
+node.boot_us = ticks_us() - STARTED
+LOG.info("boot_us=", node.boot_us)
+node.poll_forever()
@@ -0,0 +1,84 @@
+import gc
+import struct
+from utime import ticks_add, ticks_diff, ticks_us
+
+# Constants:
+CHECK_INTERVAL_US = 50000  # gc.mem_free() walks the whole allocation table, so don't call it every idle loop
+
+
+class MemoryManager:
+    """Keeps garbage collection out of timing-critical code
+
+    Automatic collection stays on as a safety net but is switched off inside critical windows, which may nest. The poll
+    loop calls idle() when it has nothing to do, and that collects once free memory drops below collect_below, long
+    before the allocator would be forced to. The low-water mark and collection times are kept for READ_STATS.
+    """
+
+    def __init__(self, collect_below: int = None) -> None:
+        gc.collect()
+        free = gc.mem_free()
+        self.collect_below = ((free + gc.mem_alloc()) // 2) if collect_below is None else collect_below
+        self.low_water = free
+        self.depth = 0
+        self.check_at = ticks_us()
+        self.collections = 0
+        self.last_us = self.max_us = self.total_us = 0
+
+    # Use the manager itself as the context manager, so "with memory:" doesn't allocate
+    def __enter__(self):
+        self.begin()
+        return self
+
+    def __exit__(self, *_args):
+        self.end()
+
+    def begin(self) -> None:
+        """Start of a critical window, no automatic collections until the matching end()"""
+        if not self.depth:
+            gc.disable()
+        self.depth += 1
+
+    def end(self) -> None:
+        self.depth -= 1
+        if not self.depth:
+            gc.enable()
+
+    def idle(self) -> bool:
+        """Collect if it's due and we aren't in a critical window
+
+        :return: True if it collected
+        """
+        now = ticks_us()
+        if ticks_diff(now, self.check_at) < 0:
+            return False
+        self.check_at = ticks_add(now, CHECK_INTERVAL_US)
+        free = gc.mem_free()
+        if free < self.low_water:
+            self.low_water = free
+        if self.depth or (free >= self.collect_below):
+            return False
+        self.collect()
+        return True
+
+    def collect(self) -> None:
+        start = ticks_us()
+        gc.collect()
+        self.last_us = ticks_diff(ticks_us(), start)
+        self.max_us = max(self.max_us, self.last_us)
+        self.total_us += self.last_us
+        self.collections += 1
+
+    def stats(self) -> bytes:
+        # Payload:
+        #
+        # Field         Length   Notes
+        # -----------   ------   ------------------------------------------
+        # free          4        gc.mem_free() now
+        # low_water     4        Lowest gc.mem_free() seen
+        # collections   4        Explicit collections so far
+        # last_us       4        Duration of the latest collection
+        # max_us        4        Longest collection
+        # total_us      4        Time spent collecting, divide by collections for the mean
+        return struct.pack(
+            "<LLLLLL", gc.mem_free(), self.low_water, self.collections, self.last_us, self.max_us, self.total_us
+        )
@@ -1,11 +1,56 @@
+from array import array
 from machine import Pin, Signal
 
-from constants import CONSTANTS
+from ktane_lib.constants import CONSTANTS
+from log import LOG
 from hardware import KtaneHardware
 from seven_seg import SevenSegment
 
 # Constants:
-GRAY_DECODE = [2, 1, 3, 0]
+# Quarter steps for each (previous << 2 | current) pair of encoder pin readings (ROTARY1 << 1 | ROTARY2). No change and
+# impossible jumps of two quarters (a missed edge) count as 0.
+TRANSITIONS = array("b", [0, -1, 1, 0, 1, 0, 0, -1, -1, 0, 0, 1, 0, 1, -1, 0])
+QUARTERS_PER_DETENT = 4
+
+# Turning faster than this many microseconds per detent multiplies each detent
+ACCELERATION = ((30000, 4), (80000, 2))
+
+MORSE_CODE = {
+    "A": ".-",
+    "B": "-...",
+    "C": "-.-.",
+    "D": "-..",
+    "E": ".",
+    "F": "..-.",
+    "G": "--.",
+    "H": "....",
+    "I": "..",
+    "J": ".---",
+    "K": "-.-",
+    "L": ".-..",
+    "M": "--",
+    "N": "-.",
+    "O": "---",
+    "P": ".--.",
+    "Q": "--.-",
+    "R": ".-.",
+    "S": "...",
+    "T": "-",
+    "U": "..-",
+    "V": "...-",
+    "W": ".--",
+    "X": "-..-",
+    "Y": "-.--",
+    "Z": "--..",
+}
+
+# Durations in dot lengths
+UNIT_MS = 250
+DOT = 1
+DASH = 3
+SYMBOL_GAP = 1
+LETTER_GAP = 3
+WORD_GAP = 7
 
 FREQUENCIES = [
     3500,
@@ -43,6 +88,7 @@ BUTTON_RX_PIN = Pin(3, Pin.IN, Pin.PULL_UP)
 BUTTON_RX = Signal(BUTTON_RX_PIN, invert=True)
 BUTTON_TX_PIN = Pin(5, Pin.IN, Pin.PULL_UP)
 BUTTON_TX = Signal(BUTTON_TX_PIN, invert=True)
+LIGHT = Signal(Pin(26, Pin.OUT), invert=True)
 
 ARRAY_R = [
     CONSTANTS.SEVEN_SEGMENT.LETTER_R,
@@ -60,71 +106,172 @@ ARRAY_T = [
 
 class MorseModule(KtaneHardware):
     def __init__(self) -> None:
-        KtaneHardware.__init__(self, self.read_config())
-        self.seven_seg = SevenSegment()
-        self.curr_phase = self.phase()
+        KtaneHardware.__init__(self, CONSTANTS.MODULES.TYPES.MORSE)
+        self.handlers.update(
+            {
+                CONSTANTS.PROTOCOL.PACKET_TYPE.CONFIGURE: self.configure,
+                CONSTANTS.PROTOCOL.PACKET_TYPE.START: self.start,
+                CONSTANTS.PROTOCOL.PACKET_TYPE.STOP: self.stop,
+            }
+        )
+        self.seven_seg = SevenSegment(self.timers)
+        self.word = b""
+        self.target = 0
+        self.schedule = array("H")
+        self.step = 0
+        self.blink_timer = self.timers.allocate(self.on_blink)
+        LIGHT.off()
         self.value = 0
-        self.offset = 0
+        self.encoder_state = self.encoder_pins()  # Previous reading in bits 3-2, current in bits 1-0
+        self.quarters = 0  # Written only by on_rotary
+        self.quarters_used = 0  # Written only by rotated
+        self.rotary_posted = False
+        self.last_detent_at = 0
+        self.event_handlers.update(
+            {
+                CONSTANTS.EVENTS.MORSE_RX: self.rx_changed,
+                CONSTANTS.EVENTS.MORSE_TX: self.tx_changed,
+                CONSTANTS.EVENTS.ROTARY: self.rotated,
+            }
+        )
         BUTTON_RX_PIN.irq(self.on_rx)
         BUTTON_TX_PIN.irq(self.on_tx)
         ROTARY1.irq(self.on_rotary)
         ROTARY2.irq(self.on_rotary)
         self.display_freq()
 
-    @staticmethod
-    def read_config() -> int:
-        # Format:
+    def configure(self, _source: int, _dest: int, payload: bytes) -> bool:
+        # Payload:
         #
         # Field    Length   Notes
-        # ------   ------   ---------------------------------------------
-        # unique   1        Unique portion of ID, assigned at manufacture
-        unique = b""
-        try:
-            file_obj = open(CONSTANTS.MODULES.CONFIG_FILENAME, "rb")
-            unique = file_obj.read(1)
-            file_obj.close()
-        except OSError:
-            pass
-
-        return (CONSTANTS.MODULES.TYPES.MORSE << 8) | (ord(unique) if unique else 0x00)
+        # ------   ------   ----------------------------------------
+        # target   1        Index into FREQUENCIES of the right answer
+        # word     n        Letters to blink, A-Z, may be padded with \x00's
+        LOG.debug("configure", payload)
+        word = payload[1:].rstrip(b"\x00")
+        for letter in word:
+            if not (0x41 <= (letter & 0xDF) <= 0x5A):
+                # Nothing to blink it with. Not ACKed, the sender finds out it was refused.
+                LOG.warning("bad word", word)
+                self.word = b""
+                self.unable_to_arm()
+                return True
+        self.target = payload[0]
+        self.word = word
+        return False
+
+    def start(self, source: int, dest: int, payload: bytes) -> bool:
+        # Payload is the difficulty but we're not adjustable so we ignore it
+        LOG.debug("start")
+        KtaneHardware.start(self, source, dest, payload)
+        if self.word and (self.target <= LAST_FREQ):
+            self.schedule = self.compile_schedule(self.word)
+            self.step = 0
+            LIGHT.on()
+            self.timers.arm(self.blink_timer, self.schedule[0])
+            self.set_mode(CONSTANTS.MODES.ARMED)
+        else:
+            self.unable_to_arm()
+            self.set_mode(CONSTANTS.MODES.SLEEP)
+        return False
+
+    def stop(self, source: int, dest: int, payload: bytes) -> bool:
+        self.stop_blinking()
+        return KtaneHardware.stop(self, source, dest, payload)
+
+    def compile_schedule(self, word: bytes) -> array:
+        """Turn the word into timer ticks to wait at each light change
+
+        Even steps are light on, odd steps are light off. The last gap is a word gap and then it repeats.
+        """
+        units = []
+        for letter in word.decode().upper():
+            for symbol in MORSE_CODE[letter]:
+                units.append(DASH if symbol == "-" else DOT)
+                units.append(SYMBOL_GAP)
+            units[-1] = LETTER_GAP
+        units[-1] = WORD_GAP
+        return array("H", [self.timers.ticks_for(count * UNIT_MS) for count in units])
+
+    def stop_blinking(self):
+        self.timers.cancel(self.blink_timer)
+        LIGHT.off()
+
+    # Called during an interrupt! Don't allocate memory or waste time!
+    def on_blink(self, slot: int):
+        step = self.step + 1
+        if step == len(self.schedule):
+            step = 0
+        self.step = step
+        LIGHT.value(not (step & 1))
+        self.timers.arm(slot, self.schedule[step])
 
     # Called during an interrupt! Don't allocate memory or waste time!
     def on_rx(self, _pin):
-        if BUTTON_RX.value():
+        self.events.post(CONSTANTS.EVENTS.MORSE_RX, BUTTON_RX.value())
+
+    # Called during an interrupt! Don't allocate memory or waste time!
+    def on_tx(self, _pin):
+        self.events.post(CONSTANTS.EVENTS.MORSE_TX, BUTTON_TX.value())
+
+    # Called during an interrupt! Don't allocate memory or waste time!
+    def on_rotary(self, _pin):
+        state = ((self.encoder_state << 2) | self.encoder_pins()) & 0x0F
+        self.encoder_state = state
+        self.quarters += TRANSITIONS[state]
+
+        # One event until the loop catches up, so a fast spin can't fill the ring
+        if not self.rotary_posted:
+            self.rotary_posted = True
+            self.events.post(CONSTANTS.EVENTS.ROTARY)
+
+    def rx_changed(self, pushed: int, _stamp: int):
+        if pushed:
             self.seven_seg.display(ARRAY_R)
         else:
             self.display_freq()
 
-    # Called during an interrupt! Don't allocate memory or waste time!
-    def on_tx(self, _pin):
-        if BUTTON_TX.value():
+    def tx_changed(self, pushed: int, _stamp: int):
+        if pushed:
             self.seven_seg.display(ARRAY_T)
         else:
             self.display_freq()
+            if self.mode == CONSTANTS.MODES.ARMED:
+                # Transmitted on the right frequency?
+                if self.value == self.target:
+                    self.stop_blinking()
+                    self.disarmed()
+                else:
+                    self.strike()
 
-    # Called during an interrupt! Don't allocate memory or waste time!
     def display_freq(self):
         self.seven_seg.display(FREQUENCIES[self.value], 3)
 
     # Called during an interrupt! Don't allocate memory or waste time!
     @staticmethod
-    def phase() -> int:
-        return GRAY_DECODE[(2 if ROTARY1.value() else 0) | (1 if ROTARY2.value() else 0)]
+    def encoder_pins() -> int:
+        return (ROTARY1.value() << 1) | ROTARY2.value()
 
-    # Called during an interrupt! Don't allocate memory or waste time!
-    def on_rotary(self, _pin):
-        phase = self.phase()
-        direction = (phase - self.curr_phase) & 3
-        self.curr_phase = phase
-        if direction == 1:
-            self.offset += 1
-        elif direction == 3:
-            self.offset -= 1
-        if phase == 0:
-            if (self.offset > 0) and (self.value < LAST_FREQ):
-                self.value += 1
-                self.display_freq()
-            elif (self.offset < 0) and (self.value > 0):
-                self.value -= 1
-                self.display_freq()
-            self.offset = 0
+    def rotated(self, _arg: int, stamp: int):
+        self.rotary_posted = False
+        pending = self.quarters - self.quarters_used
+        if pending >= 0:
+            detents = pending // QUARTERS_PER_DETENT
+        else:
+            detents = -(-pending // QUARTERS_PER_DETENT)
+        if not detents:
+            return
+        self.quarters_used += detents * QUARTERS_PER_DETENT
+
+        # Spin faster, move further
+        interval = (stamp - self.last_detent_at) // abs(detents)
+        self.last_detent_at = stamp
+        for threshold, multiplier in ACCELERATION:
+            if interval < threshold:
+                detents *= multiplier
+                break
+
+        value = min(max(self.value + detents, 0), LAST_FREQ)
+        if value != self.value:
+            self.value = value
+            self.display_freq()
@@ -0,0 +1,192 @@
+import struct
+
+from ktane_lib.constants import CONSTANTS
+
+# Constants:
+CONFIG_VERSION = 1
+SLOT_FILENAMES = ("config.a", "config.b")  # Written alternately, so a power cut mid-write leaves the other intact
+FORMAT = "<BBBBBBHHH8s"
+RECORD_LEN = struct.calcsize(FORMAT) + 2  # Plus checksum
+PROTECTED_LEN = 4  # unique, type, version, generation can't be written over the bus
+CALIBRATION_LEN = 8
+IMAGE_DIRS = ("image_a", "image_b")  # Firmware images from updater.py
+IMAGE_B = 0x01  # flags bit, image_b is the one to run
+
+
+class NodeConfig:
+    """Everything a node remembers across reboots, read once at boot
+
+    Kept as a fixed-layout binary record with a checksum in two files. Each save goes to the file that doesn't hold the
+    current record with the generation bumped, and load() takes the newest record that checks out. Saves that wouldn't
+    change anything are skipped, so tuning over the bus doesn't wear the flash. A node with only the old config.txt
+    keeps its unique byte (and type) from there.
+
+    The bomb context isn't kept here. It changes every game, so caching it would cost a flash write per game, and a
+    module that reboots mid-game gets the current one from the master with READ_CONTEXT anyway.
+    """
+
+    __slots__ = (
+        "unique",
+        "module_type",
+        "generation",
+        "firmware",
+        "flags",
+        "backoff_min_us",
+        "backoff_max_us",
+        "id_slot_us",
+        "calibration",
+        "slot",
+    )
+    loaded = None  # The shared instance, see shared()
+
+    def __init__(self) -> None:
+        self.unique = 0x00
+        self.module_type = None  # From CONSTANTS.MODULES.TYPES, None if not configured
+        self.generation = 0
+        self.firmware = 0  # Firmware version last installed
+        self.flags = 0  # IMAGE_B, the rest are reserved
+        self.backoff_min_us, self.backoff_max_us = CONSTANTS.PROTOCOL.TIMING.BACKOFF_TIME
+        self.id_slot_us = CONSTANTS.PROTOCOL.TIMING.ID_SLOT_US
+        self.calibration = bytes(CALIBRATION_LEN)  # Module specific
+        self.slot = None  # Index into SLOT_FILENAMES of the current record
+
+    @classmethod
+    def shared(cls) -> "NodeConfig":
+        """The node's config, loaded from flash the first time"""
+        if cls.loaded is None:
+            cls.loaded = cls.load()
+        return cls.loaded
+
+    # Format:
+    #
+    # Field            Length   Notes
+    # --------------   ------   -----------------------------------------------------
+    # unique           1        Unique portion of ID, assigned at manufacture
+    # type             1        From CONSTANTS.MODULES.TYPES, 0xFF if not configured
+    # version          1        CONFIG_VERSION
+    # generation       1        Bumped on every save, the newest valid record wins
+    # firmware         1        Firmware version last installed
+    # flags            1        IMAGE_B, other bits reserved
+    # backoff_min_us   2        Back-off range for a busy bus, defaults to BACKOFF_TIME
+    # backoff_max_us   2
+    # id_slot_us       2        RESPONSE_ID slot if REQUEST_ID doesn't give one
+    # calibration      8        Module specific
+    # checksum         2        All bytes, including checksum, sum to 0xFFFF
+    def pack(self) -> bytes:
+        data = struct.pack(
+            FORMAT,
+            self.unique,
+            0xFF if self.module_type is None else self.module_type,
+            CONFIG_VERSION,
+            self.generation,
+            self.firmware,
+            self.flags,
+            self.backoff_min_us,
+            self.backoff_max_us,
+            self.id_slot_us,
+            self.calibration,
+        )
+        return data + struct.pack("<H", 0xFFFF - sum(data))
+
+    def unpack(self, data: bytes) -> bool:
+        """Take a packed record
+
+        :return: False, and nothing changed, if it's the wrong size, version or checksum
+        """
+        if (len(data) != RECORD_LEN) or (sum(data[:-2]) + struct.unpack("<H", data[-2:])[0] != 0xFFFF):
+            return False
+        fields = struct.unpack(FORMAT, data[:-2])
+        if fields[2] != CONFIG_VERSION:
+            return False
+        (
+            self.unique,
+            module_type,
+            _version,
+            self.generation,
+            self.firmware,
+            self.flags,
+            self.backoff_min_us,
+            self.backoff_max_us,
+            self.id_slot_us,
+            self.calibration,
+        ) = fields
+        self.module_type = None if module_type == 0xFF else module_type
+        return True
+
+    @classmethod
+    def load(cls) -> "NodeConfig":
+        best = None
+        for slot, filename in enumerate(SLOT_FILENAMES):
+            candidate = cls()
+            if (
+                candidate.unpack(read_file(filename))
+                and candidate.valid()
+                and ((best is None) or (((candidate.generation - best.generation) & 0xFF) < 0x80))
+            ):
+                best = candidate
+                best.slot = slot
+        if best:
+            return best
+
+        # Old style, just the unique byte and maybe the type
+        config = cls()
+        legacy = read_file(CONSTANTS.MODULES.CONFIG_FILENAME)
+        if legacy:
+            config.unique = legacy[0]
+        if len(legacy) > 1:
+            config.module_type = legacy[1]
+        return config
+
+    def save(self) -> bool:
+        """Write the record if it changed
+
+        :return: True if it was written
+        """
+        if (self.slot is not None) and (read_file(SLOT_FILENAMES[self.slot]) == self.pack()):
+            return False
+        self.generation = (self.generation + 1) & 0xFF
+        slot = 0 if self.slot is None else (1 - self.slot)
+        file_obj = open(SLOT_FILENAMES[slot], "wb")
+        file_obj.write(self.pack())
+        file_obj.close()
+        self.slot = slot
+        return True
+
+    def patch(self, offset: int, data: bytes) -> bool:
+        """Overwrite part of the record, as WRITE_CONFIG does, and save it
+
+        :return: False, and nothing changed, if it would touch the protected header, run off the end or leave settings
+            the node can't run with
+        """
+        if (offset < PROTECTED_LEN) or ((offset + len(data)) > (RECORD_LEN - 2)):
+            return False
+        record = bytearray(self.pack())
+        record[offset : offset + len(data)] = data
+        struct.pack_into("<H", record, RECORD_LEN - 2, 0xFFFF - sum(record[:-2]))
+        candidate = NodeConfig()
+        if not (candidate.unpack(bytes(record)) and candidate.valid()):
+            return False
+        self.unpack(bytes(record))
+        self.save()
+        return True
+
+    def valid(self) -> bool:
+        """Could the node talk on the bus with these settings?"""
+        return (self.backoff_min_us < self.backoff_max_us) and (self.id_slot_us > 0)
+
+    def back_off_range(self) -> tuple:
+        return self.backoff_min_us, self.backoff_max_us
+
+    def image_dir(self) -> str:
+        """Where the firmware to run was unpacked, if it was updated over the bus"""
+        return IMAGE_DIRS[1 if (self.flags & IMAGE_B) else 0]
+
+
+def read_file(filename: str) -> bytes:
+    try:
+        file_obj = open(filename, "rb")
+        data = file_obj.read()
+        file_obj.close()
+    except OSError:
+        return b""
+    return data
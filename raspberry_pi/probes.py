@@ -0,0 +1,171 @@
+from array import array
+import struct
+from machine import Timer
+from utime import ticks_add, ticks_diff, ticks_us
+
+import soft_timer
+from ktane_lib.constants import CONSTANTS
+
+# Constants:
+NUM_BUCKETS = 24  # Bucket n holds durations that need n bits, so the last one starts at 2**22us, about 4s
+LOG2 = bytes(len(bin(value)) - 2 if value else 0 for value in range(256))  # Bits needed for a byte
+NUM_PROBES = 8  # Indexed by CONSTANTS.STATS selector, 0 (MEMORY) and 6 (BOOT) are unused here
+
+
+class Histogram:
+    """Log-scaled histogram of durations in microseconds, in fixed memory"""
+
+    def __init__(self) -> None:
+        self.buckets = array("L", [0] * NUM_BUCKETS)
+        self.count = self.high = 0
+        self.low = 0xFFFFFFFF
+
+    def clear(self) -> None:
+        for index in range(NUM_BUCKETS):
+            self.buckets[index] = 0
+        self.count = self.high = 0
+        self.low = 0xFFFFFFFF
+
+    # Called during an interrupt! Don't allocate memory or waste time!
+    def record(self, us: int) -> None:
+        if us < 256:
+            bucket = LOG2[us] if us > 0 else 0
+        elif us < 65536:
+            bucket = 8 + LOG2[us >> 8]
+        elif us < (1 << (NUM_BUCKETS - 1)):
+            bucket = 16 + LOG2[us >> 16]
+        else:
+            bucket = NUM_BUCKETS - 1
+        self.buckets[bucket] += 1
+        self.count += 1
+        if us < self.low:
+            self.low = us
+        if us > self.high:
+            self.high = us
+
+    def percentile(self, percent: int) -> int:
+        """Upper bound of the bucket holding the percent'th percentile, clamped to what was seen"""
+        if not self.count:
+            return 0
+        rank = max(1, (self.count * percent + 99) // 100)
+        seen = 0
+        for bucket in range(NUM_BUCKETS):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return max(self.low, min(self.high, (1 << bucket) - 1))
+        return self.high
+
+    def report(self) -> bytes:
+        # Payload:
+        #
+        # Field   Length   Notes
+        # -----   ------   -------------------------------------------------
+        # count   4        Samples recorded
+        # min     4        Shortest, in microseconds
+        # p50     4        Median, rounded up to a power of 2 (minus 1)
+        # p99     4        99th percentile, rounded up to a power of 2 (minus 1)
+        # max     4        Longest, in microseconds
+        if not self.count:
+            return struct.pack("<LLLLL", 0, 0, 0, 0, 0)
+        return struct.pack("<LLLLL", self.count, self.low, self.percentile(50), self.percentile(99), self.high)
+
+
+class Probes:
+    """Latency and jitter probes for a KtaneHardware
+
+    Nothing here runs unless install() is called, which wraps the methods being measured. A module that never installs
+    probes pays nothing. Each probe costs two ticks_us() calls and a histogram update, a few microseconds.
+
+    LOOP         One poll() iteration
+    DISPATCH     Handling one packet
+    ISR          The timer tick interrupt, which runs every soft timer and display refresh
+    CRITICAL     Sections with interrupts off, in TimerService
+    TIMER_LATE   How far each tick landed from where it was due
+    GC_OFF       Windows with automatic garbage collection off, see MemoryManager
+    """
+
+    def __init__(self) -> None:
+        self.histograms = [Histogram() for _ in range(NUM_PROBES)]
+        self.critical_start = self.gc_off_start = 0
+        self.tick_due = 0
+        self.tick_us = 0
+
+    def report(self, selector: int) -> bytes:
+        if 0 < selector < NUM_PROBES:
+            return self.histograms[selector].report()
+        return b""
+
+    def install(self, node) -> None:
+        self.wrap_poll(node)
+        self.wrap_dispatch(node)
+        self.wrap_memory(node.memory)
+        self.wrap_irq_off()
+        self.wrap_tick(node.timers)
+
+    def wrap_poll(self, node) -> None:
+        poll, histogram = node.poll, self.histograms[CONSTANTS.STATS.LOOP]
+
+        def timed_poll():
+            start = ticks_us()
+            poll()
+            histogram.record(ticks_diff(ticks_us(), start))
+
+        node.poll = timed_poll
+
+    def wrap_dispatch(self, node) -> None:
+        dispatch_frame, histogram = node.dispatch_frame, self.histograms[CONSTANTS.STATS.DISPATCH]
+
+        def timed_dispatch(frame):
+            start = ticks_us()
+            dispatch_frame(frame)
+            histogram.record(ticks_diff(ticks_us(), start))
+
+        node.dispatch_frame = timed_dispatch
+
+    def wrap_memory(self, memory) -> None:
+        begin, end, histogram = memory.begin, memory.end, self.histograms[CONSTANTS.STATS.GC_OFF]
+
+        def timed_begin():
+            if not memory.depth:
+                self.gc_off_start = ticks_us()
+            begin()
+
+        def timed_end():
+            end()
+            if not memory.depth:
+                histogram.record(ticks_diff(ticks_us(), self.gc_off_start))
+
+        memory.begin, memory.end = timed_begin, timed_end
+
+    def wrap_irq_off(self) -> None:
+        # TimerService looks disable_irq and enable_irq up in its module each call, so swap them there
+        disable_irq, enable_irq = soft_timer.disable_irq, soft_timer.enable_irq
+        histogram = self.histograms[CONSTANTS.STATS.CRITICAL]
+
+        # Called during an interrupt! Don't allocate memory or waste time!
+        def timed_disable_irq():
+            state = disable_irq()
+            self.critical_start = ticks_us()
+            return state
+
+        # Called during an interrupt! Don't allocate memory or waste time!
+        def timed_enable_irq(state):
+            histogram.record(ticks_diff(ticks_us(), self.critical_start))
+            enable_irq(state)
+
+        soft_timer.disable_irq, soft_timer.enable_irq = timed_disable_irq, timed_enable_irq
+
+    def wrap_tick(self, timers) -> None:
+        tick, isr, late = timers.tick, self.histograms[CONSTANTS.STATS.ISR], self.histograms[CONSTANTS.STATS.TIMER_LATE]
+        self.tick_us = 1000000 // timers.tick_hz
+
+        # Called during an interrupt! Don't allocate memory or waste time!
+        def timed_tick(timer=None):
+            start = ticks_us()
+            if self.tick_due:
+                late.record(abs(ticks_diff(start, self.tick_due)))
+            self.tick_due = ticks_add(start, self.tick_us)
+            tick(timer)
+            isr.record(ticks_diff(ticks_us(), start))
+
+        timers.hw_timer.init(freq=timers.tick_hz, mode=Timer.PERIODIC, callback=timed_tick)
@@ -1,46 +1,84 @@
-from machine import Pin, Timer, Signal
+from array import array
+from machine import Pin, Signal, mem32
 
 from ktane_lib.constants import CONSTANTS
 
 # Constants:
 DEFAULT_FREQ = 200
-SEGMENTS = [Signal(Pin(pin, Pin.OUT), invert=True) for pin in [13, 19, 11, 10, 20, 12, 14]]
-DIGITS = [Signal(Pin(pin, Pin.OUT), invert=True) for pin in [18, 16, 22, 17]]
+SIO_BASE = 0xD0000000
+GPIO_OUT_SET = SIO_BASE + 0x014
+GPIO_OUT_CLR = SIO_BASE + 0x018
+
+SEGMENT_PINS = [13, 19, 11, 10, 20, 12, 14]
+DIGIT_PINS = [18, 16, 22, 17]
+DP_PIN = 4
+COLON_PIN = 6
+
+SEGMENTS = [Signal(Pin(pin, Pin.OUT), invert=True) for pin in SEGMENT_PINS]
+DIGITS = [Signal(Pin(pin, Pin.OUT), invert=True) for pin in DIGIT_PINS]
 for digit in DIGITS:
     digit.off()
-DP = Signal(Pin(4, Pin.OUT), invert=True)
-COLON = Signal(Pin(6, Pin.OUT), invert=True)
+DP = Signal(Pin(DP_PIN, Pin.OUT), invert=True)
+COLON = Signal(Pin(COLON_PIN, Pin.OUT), invert=True)
 COLON.off()
 L3 = Signal(Pin(21, Pin.OUT), invert=True)
 L3.off()
 
+# Everything is active low, so a lit segment or an enabled digit is a bit to clear. These are the GPIO masks for each
+# entry of MASK_BY_DIGIT and each digit position.
+SEGMENT_MASKS = [
+    sum(1 << pin for segment, pin in enumerate(SEGMENT_PINS) if mask & (1 << segment))
+    for mask in CONSTANTS.SEVEN_SEGMENT.MASK_BY_DIGIT
+]
+DIGIT_MASKS = [1 << pin for pin in DIGIT_PINS]
+DP_MASK = 1 << DP_PIN
+COLON_MASK = 1 << COLON_PIN
+ALL_MASK = sum(1 << pin for pin in SEGMENT_PINS + DIGIT_PINS + [DP_PIN, COLON_PIN])
 
-class SevenSegment:
-    workspace = [10, 10, 10, 10]
+# Digits of 0-99, so a number can be split without a % 10 and // 10 per digit
+TENS = bytes(number // 10 for number in range(100))
+ONES = bytes(number % 10 for number in range(100))
 
-    def __init__(self, frequency=DEFAULT_FREQ):
-        self.timer = None
+SHOWN_NUMBER = 0
+SHOWN_MMSS = 1
+SHOWN_HUNDREDTHS = 2
+
+
+class SevenSegment:
+    def __init__(self, timers, frequency=DEFAULT_FREQ):
+        self.timers = timers
+        self.slot = timers.allocate(self.update)
+        self.running = False
         self.digit = 0
+        self.workspace = [CONSTANTS.SEVEN_SEGMENT.BLANK] * 4
         self.value = self.workspace
         self.decimal_pos = None
         self.colon = False
+
+        # What the workspace currently holds, so unchanged values aren't rendered again
+        self.shown_kind = self.shown_value = None
+
+        # Framebuffer, the GPIOs to set and clear for each digit
+        self.frame_set = array("L", [ALL_MASK] * 4)
+        self.frame_clr = array("L", [0] * 4)
+
         self.start(frequency)
 
     def start(self, frequency=DEFAULT_FREQ):
-        if self.timer is None:
+        if not self.running:
             # Enable timer
-            self.timer = Timer(freq=frequency, mode=Timer.PERIODIC, callback=self.update)
+            self.running = True
+            self.timers.start_hz(self.slot, frequency)
 
     def stop(self):
-        if self.timer:
+        if self.running:
+            # Disable timer
+            self.running = False
+            self.timers.cancel(self.slot)
+
             # Clear all 4 segments
             self.display([CONSTANTS.SEVEN_SEGMENT.BLANK] * 4)
-            for _ in range(4):
-                self.update()
-
-            # Disable timer
-            self.timer.deinit()
-            self.timer = None
+            mem32[GPIO_OUT_SET] = ALL_MASK
 
     # Called during an interrupt! Don't allocate memory or waste time!
     def display(self, value, decimal_pos=None, minimum_digits=1, colon=False):
@@ -51,35 +89,83 @@ class SevenSegment:
         :param int minimum_digits: How many digits to show when displaying a number
         """
         if isinstance(value, list):
+            self.shown_kind = None
             self.value = value
         else:
-            self.value = self.workspace
-            for index in range(4):
-                digit = value % 10
-                if (value == 0) and (minimum_digits <= index):
-                    digit = CONSTANTS.SEVEN_SEGMENT.BLANK
-                value = value // 10
-                self.value[3 - index] = digit
+            if (
+                (self.shown_kind == SHOWN_NUMBER)
+                and (self.shown_value == value)
+                and (self.decimal_pos == decimal_pos)
+                and (self.colon == colon)
+            ):
+                return
+            self.shown_kind, self.shown_value = SHOWN_NUMBER, value
+            self.set_number(value, minimum_digits)
 
         self.decimal_pos = decimal_pos
         self.colon = colon
+        self.render()
 
     # Called during an interrupt! Don't allocate memory or waste time!
-    def update(self, _timer=None):
-        """Update the LEDs"""
-        # Turn off previous digit
-        DIGITS[self.digit].off()
+    def display_mmss(self, seconds: int):
+        """Show a time as M:SS or MM:SS"""
+        if (self.shown_kind == SHOWN_MMSS) and (self.shown_value == seconds):
+            return
+        self.shown_kind, self.shown_value = SHOWN_MMSS, seconds
+        minutes = seconds // 60
+        self.set_pairs(min(minutes, 99), seconds - (minutes * 60), 3)
+        self.decimal_pos = None
+        self.colon = True
+        self.render()
+
+    # Called during an interrupt! Don't allocate memory or waste time!
+    def display_hundredths(self, hundredths: int):
+        """Show a time as S.hh or SS.hh"""
+        if (self.shown_kind == SHOWN_HUNDREDTHS) and (self.shown_value == hundredths):
+            return
+        self.shown_kind, self.shown_value = SHOWN_HUNDREDTHS, hundredths
+        seconds = hundredths // 100
+        self.set_pairs(min(seconds, 99), hundredths - (seconds * 100), 3)
+        self.decimal_pos = 2
+        self.colon = False
+        self.render()
 
-        # Advance to next digit
-        self.digit = (self.digit + 1) % 4
+    # Called during an interrupt! Don't allocate memory or waste time!
+    def set_number(self, value: int, minimum_digits: int):
+        high = value // 100
+        self.set_pairs(high % 100, value - (high * 100), minimum_digits)
+
+    # Called during an interrupt! Don't allocate memory or waste time!
+    def set_pairs(self, high: int, low: int, minimum_digits: int):
+        """Fill the workspace with two 2-digit numbers, blanking leading zeros"""
+        workspace = self.workspace
+        workspace[0] = TENS[high]
+        workspace[1] = ONES[high]
+        workspace[2] = TENS[low]
+        workspace[3] = ONES[low]
+        for index in range(4 - minimum_digits):
+            if workspace[index]:
+                break
+            workspace[index] = CONSTANTS.SEVEN_SEGMENT.BLANK
+        self.value = workspace
 
-        # Enable segments
-        segments = CONSTANTS.SEVEN_SEGMENT.MASK_BY_DIGIT[self.value[self.digit]]
-        for segment in range(7):
-            SEGMENTS[segment].value(segments & (1 << segment))
-        DP.value((self.digit + 1) == self.decimal_pos)
+    # Called during an interrupt! Don't allocate memory or waste time!
+    def render(self):
+        """Precompute the GPIO masks for each digit"""
+        for index in range(4):
+            lit = SEGMENT_MASKS[self.value[index]] | DIGIT_MASKS[index]
+            if (index + 1) == self.decimal_pos:
+                lit |= DP_MASK
+            if self.colon and (index % 2):
+                lit |= COLON_MASK
+            self.frame_set[index] = ALL_MASK & ~lit
+            self.frame_clr[index] = lit
 
-        COLON.value(self.colon and (self.digit % 2))
+    # Called during an interrupt! Don't allocate memory or waste time!
+    def update(self, _slot=None):
+        """Update the LEDs"""
+        self.digit = digit = (self.digit + 1) & 3
 
-        # Enable current digit
-        DIGITS[self.digit].on()
+        # Turn off the previous digit and unlit segments, then turn on the lit segments and the current digit
+        mem32[GPIO_OUT_SET] = self.frame_set[digit]
+        mem32[GPIO_OUT_CLR] = self.frame_clr[digit]
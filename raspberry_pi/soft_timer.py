@@ -0,0 +1,139 @@
+from array import array
+from machine import disable_irq, enable_irq, Timer
+
+# Constants:
+TICK_HZ = 1000  # 1ms resolution
+NUM_SLOTS = 16
+WHEEL_SIZE = 64  # Must be a power of 2
+WHEEL_MASK = WHEEL_SIZE - 1
+TICK_MASK = 0x3FFFFFFF  # Keep tick counts small ints
+NONE = 0xFF  # End of a list
+IDLE = 0xFF  # Slot isn't in the wheel
+FIRING = 0xFE  # Slot expired this tick and its callback is due
+
+
+class TimerService:
+    """Software timers multiplexed onto one periodic hardware Timer
+
+    Slots are allocated up front with a callback, then started, cancelled and rescheduled in O(1). Armed slots hang off
+    a timing wheel of WHEEL_SIZE buckets in doubly-linked lists made of preallocated arrays, so nothing is allocated
+    after start-up. Callbacks run from the tick interrupt and are passed the slot number, like a Timer callback is
+    passed the Timer. arm() and cancel() hold off interrupts while they relink a bucket, so the main loop can use
+    them without tick() walking a half edited list.
+    """
+
+    def __init__(self, num_slots: int = NUM_SLOTS, tick_hz: int = TICK_HZ) -> None:
+        self.tick_hz = tick_hz
+        self.now = 0
+        self.allocated = 0
+        self.callbacks = [None] * num_slots
+        self.expires = array("L", [0] * num_slots)
+        self.periods = array("L", [0] * num_slots)  # 0 for one-shot
+        self.next = bytearray([NONE] * num_slots)
+        self.prev = bytearray([NONE] * num_slots)
+        self.fire_next = bytearray([NONE] * num_slots)
+        self.bucket_of = bytearray([IDLE] * num_slots)
+        self.buckets = bytearray([NONE] * WHEEL_SIZE)
+        self.hw_timer = Timer(freq=tick_hz, mode=Timer.PERIODIC, callback=self.tick)
+
+    def allocate(self, callback) -> int:
+        """Reserve a slot, do this at start-up and keep it"""
+        if self.allocated >= len(self.callbacks):
+            raise RuntimeError("out of timer slots")
+        slot = self.allocated
+        self.allocated += 1
+        self.callbacks[slot] = callback
+        return slot
+
+    def ticks_for(self, period_ms: int) -> int:
+        return max(1, (period_ms * self.tick_hz) // 1000)
+
+    # Called during an interrupt! Don't allocate memory or waste time!
+    def start(self, slot: int, period_ms: int, periodic: bool = False) -> None:
+        """Arm (or re-arm) a slot to fire in period_ms"""
+        ticks = self.ticks_for(period_ms)
+        self.periods[slot] = ticks if periodic else 0
+        self.arm(slot, ticks)
+
+    # Called during an interrupt! Don't allocate memory or waste time!
+    def start_hz(self, slot: int, freq: int) -> None:
+        """Arm (or re-arm) a slot to fire periodically at freq"""
+        ticks = max(1, self.tick_hz // freq)
+        self.periods[slot] = ticks
+        self.arm(slot, ticks)
+
+    # Called during an interrupt! Don't allocate memory or waste time!
+    def cancel(self, slot: int) -> None:
+        state = disable_irq()
+        self.unlink(slot)
+        self.bucket_of[slot] = IDLE
+        enable_irq(state)
+
+    def active(self, slot: int) -> bool:
+        return self.bucket_of[slot] != IDLE
+
+    def deinit(self) -> None:
+        self.hw_timer.deinit()
+
+    # Called during an interrupt! Don't allocate memory or waste time!
+    def arm(self, slot: int, ticks: int) -> None:
+        state = disable_irq()
+        self.relink(slot, ticks)
+        enable_irq(state)
+
+    # Called during an interrupt! Don't allocate memory or waste time!
+    def relink(self, slot: int, ticks: int) -> None:
+        # tick() and the guarded entry points only
+        self.unlink(slot)
+        expires = (self.now + ticks) & TICK_MASK
+        self.expires[slot] = expires
+
+        # Push onto the front of its bucket
+        bucket = expires & WHEEL_MASK
+        head = self.buckets[bucket]
+        self.next[slot] = head
+        self.prev[slot] = NONE
+        if head != NONE:
+            self.prev[head] = slot
+        self.buckets[bucket] = slot
+        self.bucket_of[slot] = bucket
+
+    # Called during an interrupt! Don't allocate memory or waste time!
+    def unlink(self, slot: int) -> None:
+        bucket = self.bucket_of[slot]
+        if bucket < WHEEL_SIZE:
+            prev, next = self.prev[slot], self.next[slot]
+            if prev == NONE:
+                self.buckets[bucket] = next
+            else:
+                self.next[prev] = next
+            if next != NONE:
+                self.prev[next] = prev
+            self.bucket_of[slot] = IDLE
+
+    # Called during an interrupt! Don't allocate memory or waste time!
+    def tick(self, _timer=None) -> None:
+        self.now = now = (self.now + 1) & TICK_MASK
+
+        # Pull every slot that expires now out of this tick's bucket. Others in the bucket are a lap or more away.
+        fire = NONE
+        slot = self.buckets[now & WHEEL_MASK]
+        while slot != NONE:
+            following = self.next[slot]
+            if self.expires[slot] == now:
+                self.unlink(slot)
+                self.bucket_of[slot] = FIRING
+                self.fire_next[slot] = fire
+                fire = slot
+            slot = following
+
+        # Fire them. A callback may cancel or restart any slot, including ones still waiting to fire.
+        while fire != NONE:
+            slot = fire
+            fire = self.fire_next[slot]
+            if self.bucket_of[slot] == FIRING:
+                if self.periods[slot]:
+                    self.relink(slot, self.periods[slot])
+                else:
+                    self.bucket_of[slot] = IDLE
+                self.callbacks[slot](slot)
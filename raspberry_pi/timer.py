@@ -1,5 +1,3 @@
-from machine import Timer
-from random import randrange
 import struct
 from utime import ticks_us
 
@@ -51,11 +49,12 @@ ARRAY_LOSE = [
 
 
 class TimerModule(KtaneHardware):
+    flags = CONSTANTS.MODULES.FLAGS.EXCLUSIVE
+
     def __init__(self) -> None:
-        KtaneHardware.__init__(self, self.read_config())
+        KtaneHardware.__init__(self, CONSTANTS.MODULES.TYPES.TIMER)
         self.handlers.update(
             {
-                CONSTANTS.PROTOCOL.PACKET_TYPE.REQUEST_ID: self.request_id,
                 CONSTANTS.PROTOCOL.PACKET_TYPE.SET_TIME: self.set_time,
                 CONSTANTS.PROTOCOL.PACKET_TYPE.SHOW_TIME: self.show_time,
                 CONSTANTS.PROTOCOL.PACKET_TYPE.START: self.start,
@@ -63,9 +62,11 @@ class TimerModule(KtaneHardware):
             }
         )
         self.display_mode = MODE_READY
+        self.display_driver = SevenSegment(self.timers)
+        self.display_driver.stop()
         self.seven_seg = None
         self.hundredths_mode = False
-        self.timer = None
+        self.timer = self.timers.allocate(self.on_timer)
         self.stop_time = 0
         self.change_mode_time = 0
         self.strikes = 0
@@ -82,36 +83,6 @@ class TimerModule(KtaneHardware):
     #         self.send_without_queuing(CONSTANTS.MODULES.BROADCAST_ALL,CONSTANTS.PROTOCOL.PACKET_TYPE.REQUEST_ID)
     #         self.state=CONSTANTS.STATES.
 
-    @staticmethod
-    def read_config() -> int:
-        # Format:
-        #
-        # Field    Length   Notes
-        # ------   ------   ---------------------------------------------
-        # unique   1        Unique portion of ID, assigned at manufacture
-        unique = b""
-        try:
-            file_obj = open(CONSTANTS.MODULES.CONFIG_FILENAME, "rb")
-            unique = file_obj.read(1)
-            file_obj.close()
-        except OSError:
-            pass
-
-        return (CONSTANTS.MODULES.TYPES.TIMER << 8) | (ord(unique) if unique else 0x00)
-
-    def request_id(self, source: int, _dest: int, _payload: bytes) -> bool:
-        LOG.debug("request_id")
-        Timer(
-            mode=Timer.ONE_SHOT,
-            period=randrange(*CONSTANTS.PROTOCOL.TIMING.ID_SPREAD_MS),
-            callback=lambda timer: self.send_without_queuing(
-                source,
-                CONSTANTS.PROTOCOL.PACKET_TYPE.RESPONSE_ID,
-                struct.pack("BB", CONSTANTS.MODULES.FLAGS.EXCLUSIVE, 0),
-            ),
-        )
-        return True  # I handled my own ACK
-
     def set_time(self, source: int, _dest: int, _payload: bytes):
         LOG.debug("set_time")
         (time_left,) = struct.unpack("<L", _payload)
@@ -121,11 +92,10 @@ class TimerModule(KtaneHardware):
         LOG.debug("show_time")
         (time_left,) = struct.unpack("<L", _payload)
         self.display_mode = MODE_PAUSE
-        if self.timer:
-            self.timer.deinit()
-            self.timer = None
+        self.timers.cancel(self.timer)
         if not self.seven_seg:
-            self.seven_seg = SevenSegment()
+            self.seven_seg = self.display_driver
+            self.seven_seg.start()
         self.show_remaining(time_left, time_left < SWITCH_TO_HUNDREDTHS)
 
     def start(self, _source: int = 0, _dest: int = 0, _payload: bytes = b""):
@@ -146,35 +116,28 @@ class TimerModule(KtaneHardware):
         if self.seven_seg:
             self.seven_seg.stop()
             self.seven_seg = None
-        if self.timer:
-            self.timer.deinit()
-            self.timer = None
+        self.timers.cancel(self.timer)
 
     # Called during an interrupt! Don't allocate memory or waste time!
     def display(self, mode: int):
         self.display_mode = mode
-        if self.timer:
-            self.timer.deinit()
-            self.timer = None
         if mode == MODE_READY:
-            self.timer = Timer(
-                mode=Timer.PERIODIC, freq=int(1000000 / CONSTANTS.MODULES.TIMER.READY_DUTY), callback=self.on_timer
-            )
+            self.timers.start_hz(self.timer, 1000000 // CONSTANTS.MODULES.TIMER.READY_DUTY)
         elif mode == MODE_RUNNING:
-            self.timer = Timer(mode=Timer.PERIODIC, freq=100 if self.hundredths_mode else 1, callback=self.on_timer)
+            self.timers.start_hz(self.timer, 100 if self.hundredths_mode else 1)
             self.on_timer()
         elif mode == MODE_SHOW_ERROR:
             self.seven_seg.display(ARRAY_ERR)
-            self.timer = Timer(mode=Timer.ONE_SHOT, period=CONSTANTS.MODULES.TIMER.ALERT_MS, callback=self.on_timer)
+            self.timers.start(self.timer, CONSTANTS.MODULES.TIMER.ALERT_MS)
         elif mode == MODE_LOSE:
             self.seven_seg.display(ARRAY_LOSE)
-            self.timer = Timer(mode=Timer.ONE_SHOT, period=CONSTANTS.MODULES.TIMER.ALERT_MS, callback=self.on_timer)
+            self.timers.start(self.timer, CONSTANTS.MODULES.TIMER.ALERT_MS)
         else:  # if mode==MODE_STRIKE:
             self.seven_seg.display(ARRAY_STRIKE_1 if self.strikes == 1 else ARRAY_STRIKE_2)
-            self.timer = Timer(mode=Timer.ONE_SHOT, period=CONSTANTS.MODULES.TIMER.STRIKE_MS, callback=self.on_timer)
+            self.timers.start(self.timer, CONSTANTS.MODULES.TIMER.STRIKE_MS)
 
     # Called during an interrupt! Don't allocate memory or waste time!
-    def on_timer(self, timer=None):
+    def on_timer(self, _slot=None):
         if self.seven_seg:
             # Which mode are we in?
             if self.display_mode == MODE_READY:
@@ -195,8 +158,7 @@ class TimerModule(KtaneHardware):
         if (remaining > 0) and (hundredths_mode and not self.hundredths_mode):
             # Switch to hundredths mode
             self.hundredths_mode = True
-            self.timer.deinit()
-            self.timer = Timer(mode=Timer.PERIODIC, freq=100, callback=self.on_timer)
+            self.timers.start_hz(self.timer, 100)
             LOG.info("switch to 100ths")
 
         self.show_remaining(remaining, hundredths_mode)
@@ -207,8 +169,6 @@ class TimerModule(KtaneHardware):
             LOG.info("timer zero")
         else:
             if hundredths_mode:
-                number = remaining // 10000
-                self.seven_seg.display(number, 2, 3)
+                self.seven_seg.display_hundredths(remaining // 10000)
             else:
-                number = remaining // 1000000
-                self.seven_seg.display(((number // 60) * 100) + (number % 60), minimum_digits=3, colon=True)
+                self.seven_seg.display_mmss(remaining // 1000000)
@@ -0,0 +1,152 @@
+import binascii
+from machine import reset
+import os
+import struct
+
+from ktane_lib.firmware import CHUNK_SIZE, COMPLETE, WINDOW_BYTES, unpack_begin, unpack_bundle
+from log import LOG
+from node_config import IMAGE_B, IMAGE_DIRS
+
+# Constants:
+STAGING_FILENAME = "update.bin"
+
+
+class Updater:
+    """Receives a firmware image the master broadcasts to every module of our type
+
+    Chunks are written to STAGING_FILENAME where they belong as they arrive, in any order, and a bit per chunk records
+    which ones we have. The master asks for that bitmap and only resends what someone is missing. Once every chunk is in
+    and the CRC checks out, the image is unpacked into whichever of IMAGE_DIRS isn't running. UPDATE_COMMIT then swaps
+    images by flipping IMAGE_B in the node config, whose A/B save can't be left half done, and resets.
+    """
+
+    def __init__(self, node) -> None:
+        self.node = node
+        self.version = None
+        self.image_len = self.num_chunks = self.remaining = self.crc = 0
+        self.received = bytearray()
+        self.file_obj = None
+        self.ready = False  # Unpacked and waiting for UPDATE_COMMIT
+        self.current = False  # We're already running this version
+
+    def begin(self, payload: bytes) -> None:
+        version, image_len, num_chunks, crc = unpack_begin(payload)
+        if version == self.version:
+            # Repeated for modules that missed it
+            return
+        self.close()
+        self.version, self.image_len, self.num_chunks, self.crc = version, image_len, num_chunks, crc
+        self.received = bytearray((num_chunks + 7) // 8)
+        self.remaining = num_chunks
+        self.ready = False
+        self.current = version == self.node.config.firmware
+        if self.current:
+            LOG.info("already running", version)
+            self.remaining = 0
+        else:
+            LOG.info("update to", version)
+            self.file_obj = open(STAGING_FILENAME, "wb")
+
+    def chunk(self, payload: bytes) -> None:
+        (index,) = struct.unpack("<H", payload[:2])
+        if (self.file_obj is None) or (index >= self.num_chunks) or (self.received[index >> 3] & (1 << (index & 7))):
+            return
+        self.file_obj.seek(index * CHUNK_SIZE)
+        self.file_obj.write(payload[2:])
+        self.received[index >> 3] |= 1 << (index & 7)
+        self.remaining -= 1
+        if not self.remaining:
+            self.finish()
+
+    def finish(self) -> None:
+        self.close()
+        if self.check():
+            self.unpack()
+            self.ready = True
+            LOG.info("update ready")
+        else:
+            # Start over, it's all suspect
+            LOG.warning("bad image")
+            self.received = bytearray(len(self.received))
+            self.remaining = self.num_chunks
+            self.file_obj = open(STAGING_FILENAME, "wb")
+
+    def check(self) -> bool:
+        crc = length = 0
+        file_obj = open(STAGING_FILENAME, "rb")
+        while True:
+            data = file_obj.read(CHUNK_SIZE)
+            if not data:
+                break
+            crc = binascii.crc32(data, crc)
+            length += len(data)
+        file_obj.close()
+        return (length == self.image_len) and ((crc & 0xFFFFFFFF) == self.crc)
+
+    def target_dir(self) -> str:
+        return IMAGE_DIRS[0 if (self.node.config.flags & IMAGE_B) else 1]
+
+    def unpack(self) -> None:
+        target = self.target_dir()
+        remove_tree(target)
+        os.mkdir(target)
+        source = open(STAGING_FILENAME, "rb")
+        for name, data_len, read in unpack_bundle(source.read):
+            path = target
+            for part in name.split("/")[:-1]:
+                path += "/" + part
+                try:
+                    os.mkdir(path)
+                except OSError:
+                    pass  # Already there
+            file_obj = open(target + "/" + name, "wb")
+            while data_len:
+                data = read(min(data_len, CHUNK_SIZE))
+                file_obj.write(data)
+                data_len -= len(data)
+            file_obj.close()
+        source.close()
+        os.remove(STAGING_FILENAME)
+
+    # Payload:
+    #
+    # Described with missing_chunks() in ktane_lib/firmware.py
+    def status(self) -> bytes:
+        if self.ready or self.current:
+            return struct.pack("<BH", self.version, COMPLETE)
+        first = 0
+        while (first < self.num_chunks) and (self.received[first >> 3] & (1 << (first & 7))):
+            first += 1
+        bitmap = bytearray(WINDOW_BYTES)
+        for index in range(first, min(first + (WINDOW_BYTES * 8), self.num_chunks)):
+            if not (self.received[index >> 3] & (1 << (index & 7))):
+                bitmap[(index - first) >> 3] |= 1 << ((index - first) & 7)
+        return struct.pack("<BH", self.version, first) + bitmap
+
+    def commit(self) -> None:
+        if not self.ready:
+            return
+        config = self.node.config
+        config.flags ^= IMAGE_B
+        config.firmware = self.version
+        config.save()
+        LOG.info("running", config.image_dir())
+        reset()
+
+    def close(self) -> None:
+        if self.file_obj:
+            self.file_obj.close()
+            self.file_obj = None
+
+
+def remove_tree(path: str) -> None:
+    try:
+        names = os.listdir(path)
+    except OSError:
+        return
+    for name in names:
+        try:
+            os.remove(path + "/" + name)
+        except OSError:
+            remove_tree(path + "/" + name)
+    os.rmdir(path)
@@ -0,0 +1,819 @@
+# Generated by tools/gen_wire_table.py from ktane_lib/wire_rules.py, don't edit
+#
+# TABLE[layout_key(colors)] is the index of the wire to cut, low nibble for an even serial
+# number and high nibble for odd. NO_ANSWER if the rules don't cover the layout.
+TABLE = (
+    b'\x11\x11"\x11\x11\x11\x11"\x11\x11"""""\x11\x11"\x11\x11\x11\x11"\x11'
+    b'\x11\x11\x11"\x11\x11\x11\x11\x11\x11\x11"""""\x11\x11"\x11\x11\x11\x11"'
+    b'\x11\x11""""""""""""""""""""""'
+    b'"""\x11\x11"\x11\x11\x11\x11"\x11\x11"""""\x11\x11"\x11\x11\x11'
+    b'\x11"\x11\x11\x11\x11"\x11\x11\x11\x11"\x11\x11"""""\x11\x11"\x11\x11'
+    b'\x11\x11"\x11\x11\x11\x00\x11\x11\x00\x00\x11\x00\x00\x00\x11\x001\x11\x11\x11\x00\x11\x11'
+    b'\x00\x11\x00\x11\x11\x00\x00\x11\x00\x00\x00\x11\x11\x11\x11\x00\x00\x110\x00\x00\x00\x11\x00'
+    b'\x00\x00\x00\x11\x00\x00\x00\x11\x001\x11\x11\x00\x110\x00\x00! 1!!\x11\x00'
+    b'1\x11\x11\x11\x001\x113\x11\x00\x11\x11\x00\x00\x11\x00\x00\x00\x11\x001\x11\x11\x11'
+    b'\x00\x11\x11\x00\x11\x00\x11\x11\x00\x11\x00\x11\x11\x00\x00\x11\x00\x00\x00\x11\x001\x113'
+    b'\x11\x00\x11\x11\x003\x0033\x00\x00\x11\x00\x00\x00\x11\x11\x11\x11\x00\x00\x110\x00'
+    b'\x00\x00\x11\x00\x00\x00\x00\x11\x00\x00\x00\x11\x11\x11\x11\x00\x11\x11\x11\x11\x00\x11\x111'
+    b'\x11\x11\x11\x11\x11\x11\x00\x11\x11\x11\x11\x00\x00\x110\x00\x00\x11\x111\x11\x11 !'
+    b'0  \x00\x110\x00\x00\x00\x110\x00\x00\x00\x11\x00\x00\x00\x11\x11\x11\x11\x00\x00'
+    b'\x110\x00\x00\x00\x11\x00\x00\x00\x00\x11\x00\x00\x00\x00\x11\x00\x00\x00\x11\x11\x11\x11\x00'
+    b'\x00\x110\x00\x00\x00\x11\x00\x00\x00\x003\x00\x00\x00\x11\x001\x11\x11\x00\x110\x00'
+    b'\x00! 1!!\x11\x001\x11\x11\x11\x001\x113\x00\x110\x00\x00\x11\x111'
+    b'\x11\x11 !0  \x00\x110\x00\x00\x00\x110\x00\x00\x11\x101\x11\x11\x10\x11'
+    b'0\x10\x10! 1!!\x11\x101\x11\x11\x11\x101\x11\x13\x11\x001\x11\x11\x00'
+    b'\x110\x00\x00! 1!!\x11\x001\x11\x11\x11\x001\x113\x11\x001\x113'
+    b'\x00\x110\x00\x00! 1!#\x11\x001\x1133\x00333\x11\x00\x11\x11'
+    b'\x00\x00\x11\x00\x00\x00\x11\x001\x11\x11\x11\x00\x11\x11\x00\x11\x00\x11\x11\x00\x00\x11\x00'
+    b'\x00\x00\x11\x11\x11\x11\x00\x00\x110\x00\x00\x00\x11\x00\x00\x00\x00\x11\x00\x00\x00\x11\x00'
+    b'1\x11\x11\x00\x110\x00\x00! 1!!\x11\x001\x11\x11\x11\x001\x113\x11'
+    b'\x00\x11\x11\x00\x00\x11\x00\x00\x00\x11\x001\x11\x11\x11\x00\x11\x11\x00\x11\x00\x11\x11\x00'
+    b'\x11\x00\x11\x11\x00\x00\x11\x00\x00\x00\x11\x001\x113\x11\x00\x11\x11\x003\x0033'
+    b'\x00\x11\x00\x11\x11\x00\x00\x11\x00\x00\x00\x11\x001\x113\x11\x00\x11\x11\x003\x003'
+    b'3\x00\x00\x11\x00\x00\x00\x11\x11\x11\x11\x00\x00\x110\x00\x00\x00\x11\x00\x00\x00\x003'
+    b'\x00\x00\x00\x11\x001\x113\x00\x110\x00\x00! 1!#\x11\x001\x1133'
+    b'\x00333\x11\x00\x11\x11\x00\x00\x11\x00\x00\x00\x11\x001\x113\x11\x00\x11\x11\x00'
+    b'3\x0033\x003\x0033\x00\x003\x00\x00\x003\x003333\x0033'
+    b'\x003\x0033\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00'
+    b'\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00'
+    b'\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000'
+    b'\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x00'
+    b'0\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00'
+    b'\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00'
+    b'\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00'
+    b'\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000'
+    b'\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x00'
+    b'0\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00'
+    b'\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00'
+    b'\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00'
+    b'\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000'
+    b'\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x00'
+    b'0\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00'
+    b'\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00'
+    b'\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00'
+    b'\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000'
+    b'\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x00'
+    b'0\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00'
+    b'\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00'
+    b'\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00'
+    b'\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000'
+    b'\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x00'
+    b'0\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00'
+    b'\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00'
+    b'\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00'
+    b'\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000'
+    b'\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x00'
+    b'0\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00'
+    b'\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00'
+    b'\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00'
+    b'\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x11\x11\x11\x110'
+    b'\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x110\x00\x00\x00\x000\x11\x11\x11\x11'
+    b'0\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x000\x00\x00\x00\x000\x11\x11\x11'
+    b'\x110\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x110\x00\x00\x00\x000\x11\x11'
+    b'\x11\x110\x11\x11\x11\x000\x11\x11\x11\x110\x11\x00\x11\x110\x00\x00\x00\x000\x00'
+    b'\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000'
+    b'\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x000\x00\x00\x00\x00'
+    b'0\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x110\x00\x00\x00'
+    b'\x000\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x000\x00\x00'
+    b'\x00\x000\x11\x11\x11\x000\x11\x11\x11\x110\x11\x11\x11\x000\x00\x11\x00\x000\x00'
+    b'\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000'
+    b'\x00\x00\x00\x000\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x11'
+    b'0\x00\x00\x00\x000\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11'
+    b'\x000\x00\x00\x00\x000\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11'
+    b'\x11\x110\x00\x00\x00\x000\x11\x11\x11\x110\x11\x11\x11\x000\x11\x11\x11\x110\x11'
+    b'\x00\x11\x110\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000'
+    b'\x00\x00\x00\x000\x00\x00\x00\x000\x11\x11\x11\x110\x11\x11\x11\x000\x11\x11\x11\x11'
+    b'0\x11\x00\x11\x110\x00\x00\x00\x000\x11\x11\x11\x000\x11\x11\x11\x110\x11\x11\x11'
+    b'\x000\x00\x11\x00\x000\x00\x00\x00\x000\x11\x11\x11\x110\x11\x11\x11\x000\x11\x11'
+    b'\x11\x110\x11\x00\x11\x110\x00\x00\x00\x000\x11\x00\x11\x110\x00\x11\x00\x000\x11'
+    b'\x00\x11\x110\x11\x00\x11\x110\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000'
+    b'\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x00'
+    b'0\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00'
+    b'\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00'
+    b'\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00'
+    b'\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000'
+    b'\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x11\x11\x11\x11'
+    b'0\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x000\x00\x00\x00\x000\x11\x11\x11'
+    b'\x110\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x110\x00\x00\x00\x000\x11\x11'
+    b'\x11\x110\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x000\x00\x00\x00\x000\x11'
+    b'\x11\x11\x000\x11\x11\x11\x110\x11\x11\x11\x000\x00\x11\x00\x000\x00\x00\x00\x000'
+    b'\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x00'
+    b'0\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x110\x00\x00\x00'
+    b'\x000\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x110\x00\x00'
+    b'\x00\x000\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x110\x00'
+    b'\x00\x00\x000\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x110'
+    b'\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x00'
+    b'0\x00\x00\x00\x000\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11'
+    b'\x000\x00\x00\x00\x000\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11'
+    b'\x11\x110\x00\x00\x00\x000\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x110\x11'
+    b'\x11\x11\x000\x00\x00\x00\x000\x11\x11\x11\x000\x11\x11\x11\x110\x11\x11\x11\x000'
+    b'\x00\x11\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x00'
+    b'0\x00\x00\x00\x000\x00\x00\x00\x000\x11\x11\x11\x000\x11\x11\x11\x110\x11\x11\x11'
+    b'\x000\x00\x11\x00\x000\x00\x00\x00\x000\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11'
+    b'\x11\x110\x11\x11\x11\x110\x00\x00\x00\x000\x11\x11\x11\x000\x11\x11\x11\x110\x11'
+    b'\x11\x11\x000\x00\x11\x00\x000\x00\x00\x00\x000\x00\x11\x00\x000\x11\x11\x11\x110'
+    b'\x00\x11\x00\x000\x00\x11\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x00'
+    b'0\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00'
+    b'\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00'
+    b'\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00'
+    b'\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000'
+    b'\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x00'
+    b'0\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x11\x11\x11'
+    b'\x110\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x110\x00\x00\x00\x000\x11\x11'
+    b'\x11\x110\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x000\x00\x00\x00\x000\x11'
+    b'\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x110\x00\x00\x00\x000'
+    b'\x11\x11\x11\x110\x11\x11\x11\x000\x11\x11\x11\x110\x11\x00\x11\x110\x00\x00\x00\x00'
+    b'0\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00'
+    b'\x000\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x000\x00\x00'
+    b'\x00\x000\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x110\x00'
+    b'\x00\x00\x000\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x000'
+    b'\x00\x00\x00\x000\x11\x11\x11\x000\x11\x11\x11\x110\x11\x11\x11\x000\x00\x11\x00\x00'
+    b'0\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00'
+    b'\x000\x00\x00\x00\x000\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11'
+    b'\x11\x110\x00\x00\x00\x000\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x110\x11'
+    b'\x11\x11\x000\x00\x00\x00\x000\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x110'
+    b'\x11\x11\x11\x110\x00\x00\x00\x000\x11\x11\x11\x110\x11\x11\x11\x000\x11\x11\x11\x11'
+    b'0\x11\x00\x11\x110\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00'
+    b'\x000\x00\x00\x00\x000\x00\x00\x00\x000\x11\x11\x11\x110\x11\x11\x11\x000\x11\x11'
+    b'\x11\x110\x11\x00\x11\x110\x00\x00\x00\x000\x11\x11\x11\x000\x11\x11\x11\x110\x11'
+    b'\x11\x11\x000\x00\x11\x00\x000\x00\x00\x00\x000\x11\x11\x11\x110\x11\x11\x11\x000'
+    b'\x11\x11\x11\x110\x11\x00\x11\x110\x00\x00\x00\x000\x11\x00\x11\x110\x00\x11\x00\x00'
+    b'0\x11\x00\x11\x110\x11\x00\x11\x110\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00'
+    b'\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00'
+    b'\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00'
+    b'\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000'
+    b'\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x00'
+    b'0\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00'
+    b'\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x11\x11'
+    b'\x11\x110\x11\x11\x11\x000\x11\x11\x11\x110\x11\x00\x11\x110\x00\x00\x00\x000\x11'
+    b'\x11\x11\x000\x11\x11\x11\x110\x11\x11\x11\x000\x00\x11\x00\x000\x00\x00\x00\x000'
+    b'\x11\x11\x11\x110\x11\x11\x11\x000\x11\x11\x11\x110\x11\x00\x11\x110\x00\x00\x00\x00'
+    b'0\x11\x00\x11\x110\x00\x11\x00\x000\x11\x00\x11\x110\x11\x00\x11\x110\x00\x00\x00'
+    b'\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00'
+    b'\x00\x000\x11\x11\x11\x000\x11\x11\x11\x110\x11\x11\x11\x000\x00\x11\x00\x000\x00'
+    b'\x00\x00\x000\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x110\x11\x11\x11\x110'
+    b'\x00\x00\x00\x000\x11\x11\x11\x000\x11\x11\x11\x110\x11\x11\x11\x000\x00\x11\x00\x00'
+    b'0\x00\x00\x00\x000\x00\x11\x00\x000\x11\x11\x11\x110\x00\x11\x00\x000\x00\x11\x00'
+    b'\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00'
+    b'\x00\x000\x00\x00\x00\x000\x11\x11\x11\x110\x11\x11\x11\x000\x11\x11\x11\x110\x11'
+    b'\x00\x11\x110\x00\x00\x00\x000\x11\x11\x11\x000\x11\x11\x11\x110\x11\x11\x11\x000'
+    b'\x00\x11\x00\x000\x00\x00\x00\x000\x11\x11\x11\x110\x11\x11\x11\x000\x11\x11\x11\x11'
+    b'0\x11\x00\x11\x110\x00\x00\x00\x000\x11\x00\x11\x110\x00\x11\x00\x000\x11\x00\x11'
+    b'\x110\x11\x00\x11\x110\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x00\x00'
+    b'\x00\x000\x00\x00\x00\x000\x00\x00\x00\x000\x11\x00\x11\x110\x00\x11\x00\x000\x11'
+    b'\x00\x11\x110\x11\x00\x11\x110\x00\x00\x00\x000\x00\x11\x00\x000\x11\x11\x11\x110'
+    b'\x00\x11\x00\x000\x00\x11\x00\x000\x00\x00\x00\x000\x11\x00\x11\x110\x00\x11\x00\x00'
+    b'0\x11\x00\x11\x110\x11\x00\x11\x110\x00\x00\x00\x000\x11\x00\x11\x110\x00\x11\x00'
+    b'\x000\x11\x00\x11\x110\x11\x00\x11\x11%%#%U%%#%U###'
+    b'#3%%#%UUU3UU%%#%U%%#%U##'
+    b'##3%%#%UUU3UU####3####3#'
+    b'###3####333333%%#%U%%#%U'
+    b'####3%%#%3UU33UUU3UUUU3U'
+    b'U33333UU33UUU3UU%%#%U%%#'
+    b'%U####3%%#%UUU3UU%%#%U%%'
+    b'#%U####3%%#%UUU3UU####3#'
+    b'###3####3####333333%%#%U'
+    b'%%#%U####3%%#%3UU33UUU3U'
+    b'UUU3UU33333UU33UUU3UU###'
+    b'#3####3####3####333333##'
+    b'##3####3####3####333333#'
+    b'###3####3####3####333333'
+    b'####3####3####3####33333'
+    b'333333333333333333333333'
+    b'33%%#%U%%#%U####3%%#%3UU'
+    b'33U%%#%U%%#%U####3%%#%3U'
+    b'U33U####3####3####3####3'
+    b'33333%%#%3%%#%3####3%%#%'
+    b'33333UUU33UUU33U33333333'
+    b'3UUU3UUUU3UUUU3UU33333UU'
+    b'33UUU3UUUU3UUUU3UU33333U'
+    b'U33UUU3UU333333333333333'
+    b'3333333333UU33UUU33U3333'
+    b'33333UUU3UUUU3UUUU3UU333'
+    b'33UU3UUUU3UU%%#%U%%#%U##'
+    b'##3%%#%UUU3UU%%#%U%%#%U#'
+    b'###3%%#%UUU3UU####3####3'
+    b'####3####333333%%#%U%%#%'
+    b'U####3%%#%3UU33UUU3UUUU3'
+    b'UU33333UU33UUU3UU%%#%U%%'
+    b'#%U####3%%#%UUU3UU%%#%U%'
+    b'%#%U####3%%#%UUU3UU####3'
+    b'####3####3####333333%%#%'
+    b'U%%#%U####3%%#%3UU33UUU3'
+    b'UUUU3UU33333UU33UUU3UU##'
+    b'##3####3####3####333333#'
+    b'###3####3####3####333333'
+    b'####3####3####3####33333'
+    b'3####3####3####3####3333'
+    b'333333333333333333333333'
+    b'333%%#%U%%#%U####3%%#%3U'
+    b'U33U%%#%U%%#%U####3%%#%3'
+    b'UU33U####3####3####3####'
+    b'333333%%#%3%%#%3####3%%#'
+    b'%33333UUU33UUU33U3333333'
+    b'33UUU3UUUU3UUUU3UU33333U'
+    b'U33UUU3UUUU3UUUU3UU33333'
+    b'UU33UUU3UU33333333333333'
+    b'33333333333UU33UUU33U333'
+    b'333333UUU3UUUU3UUUU3UU33'
+    b'333UU3UUUU3UU####3####3#'
+    b'###3####333333####3####3'
+    b'####3####333333####3####'
+    b'3####3####333333####3###'
+    b'#3####3####3333333333333'
+    b'333333333333333333####3#'
+    b'###3####3####333333####3'
+    b'####3####3####333333####'
+    b'3####3####3####333333###'
+    b'#3####3####3####33333333'
+    b'33333333333333333333333#'
+    b'###3####3####3####333333'
+    b'####3####3####3####33333'
+    b'3####3####3####3####3333'
+    b'33####3####3####3####333'
+    b'333333333333333333333333'
+    b'3333####3####3####3####3'
+    b'33333####3####3####3####'
+    b'333333####3####3####3###'
+    b'#333333####3####3####3##'
+    b'##3333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'33333333333333%%#%U%%#%U'
+    b'####3%%#%3UU33U%%#%U%%#%'
+    b'U####3%%#%3UU33U####3###'
+    b'#3####3####333333%%#%3%%'
+    b'#%3####3%%#%33333UUU33UU'
+    b'U33U333333333UUU3UU%%#%U'
+    b'%%#%U####3%%#%3UU33U%%#%'
+    b'U%%#%U####3%%#%3UU33U###'
+    b'#3####3####3####333333%%'
+    b'#%3%%#%3####3%%#%33333UU'
+    b'U33UUU33U333333333UUU3UU'
+    b'####3####3####3####33333'
+    b'3####3####3####3####3333'
+    b'33####3####3####3####333'
+    b'333####3####3####3####33'
+    b'333333333333333333333333'
+    b'33333%%#%3%%#%3####3%%#%'
+    b'33333U%%#%3%%#%3####3%%#'
+    b'%33333U####3####3####3##'
+    b'##333333%%#%3%%#%3####3%'
+    b'%#%33333U3333U3333U33333'
+    b'3333UUU3UUUU33UUU33U3333'
+    b'33333UUU3UUUU33UUU33U333'
+    b'333333UUU3UU333333333333'
+    b'33333333333333333U3333U3'
+    b'33333333UUU3UUUU3UUUU3UU'
+    b'33333UU3UUUU3UUUU3UUUU3U'
+    b'U33333UU33UUU3UUUU3UUUU3'
+    b'UU33333UU33UUU3UU3333333'
+    b'333333333333333333UU33UU'
+    b'U33U333333333UUU3UUUU3UU'
+    b'UU3UU33333UU3UUUU3UUUU3U'
+    b'UUU3UU33333UU33UUU3UUUU3'
+    b'UUUU3UU33333UU33UUU3UU33'
+    b'33333333333333333333333U'
+    b'U33UUU33U333333333UUU3UU'
+    b'UU3UUUU3UU33333UU3UUUU3U'
+    b'U33333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333UU33UUU33U33333333'
+    b'3UUU3UUUU33UUU33U3333333'
+    b'33UUU3UU3333333333333333'
+    b'3333333333333U3333U33333'
+    b'3333UUU3UUUU3UUUU3UU3333'
+    b'3UU3UUUU3UUUU3UUUU3UU333'
+    b'33UU3UUUU3UUUU3UUUU3UU33'
+    b'333UU3UUUU3UU33333333333'
+    b'33333333333333UU3UUUU3UU'
+    b'33333UU3UUUU3UUUU3UUUU3U'
+    b'U33333UU3UUUU3UU%%#%U%%#'
+    b'%U####3%%#%UUU3UU%%#%U%%'
+    b'#%U####3%%#%UUU3UU####3#'
+    b'###3####3####333333%%#%U'
+    b'%%#%U####3%%#%3UU33UUU3U'
+    b'UUU3UU33333UU33UUU3UU%%#'
+    b'%U%%#%U####3%%#%UUU3UU%%'
+    b'#%U%%#%U####3%%#%UUU3UU#'
+    b'###3####3####3####333333'
+    b'%%#%U%%#%U####3%%#%3UU33'
+    b'UUU3UUUU3UU33333UU33UUU3'
+    b'UU####3####3####3####333'
+    b'333####3####3####3####33'
+    b'3333####3####3####3####3'
+    b'33333####3####3####3####'
+    b'333333333333333333333333'
+    b'3333333%%#%U%%#%U####3%%'
+    b'#%3UU33U%%#%U%%#%U####3%'
+    b'%#%3UU33U####3####3####3'
+    b'####333333%%#%3%%#%3####'
+    b'3%%#%33333UUU33UUU33U333'
+    b'333333UUU3UUUU3UUUU3UU33'
+    b'333UU33UUU3UUUU3UUUU3UU3'
+    b'3333UU33UUU3UU3333333333'
+    b'333333333333333UU33UUU33'
+    b'U333333333UUU3UUUU3UUUU3'
+    b'UU33333UU3UUUU3UU%%#%U%%'
+    b'#%U####3%%#%UUU3UU%%#%U%'
+    b'%#%U####3%%#%UUU3UU####3'
+    b'####3####3####333333%%#%'
+    b'U%%#%U####3%%#%3UU33UUU3'
+    b'UUUU3UU33333UU33UUU3UU%%'
+    b'#%U%%#%U####3%%#%UUU3UU%'
+    b'%#%U%%#%U####3%%#%UUU3UU'
+    b'####3####3####3####33333'
+    b'3%%#%U%%#%U####3%%#%3UU3'
+    b'3UUU3UUUU3UU33333UU33UUU'
+    b'3UU####3####3####3####33'
+    b'3333####3####3####3####3'
+    b'33333####3####3####3####'
+    b'333333####3####3####3###'
+    b'#33333333333333333333333'
+    b'33333333%%#%U%%#%U####3%'
+    b'%#%3UU33U%%#%U%%#%U####3'
+    b'%%#%3UU33U####3####3####'
+    b'3####333333%%#%3%%#%3###'
+    b'#3%%#%33333UUU33UUU33U33'
+    b'3333333UUU3UUUU3UUUU3UU3'
+    b'3333UU33UUU3UUUU3UUUU3UU'
+    b'33333UU33UUU3UU333333333'
+    b'3333333333333333UU33UUU3'
+    b'3U333333333UUU3UUUU3UUUU'
+    b'3UU33333UU3UUUU3UU####3#'
+    b'###3####3####333333####3'
+    b'####3####3####333333####'
+    b'3####3####3####333333###'
+    b'#3####3####3####33333333'
+    b'33333333333333333333333#'
+    b'###3####3####3####333333'
+    b'####3####3####3####33333'
+    b'3####3####3####3####3333'
+    b'33####3####3####3####333'
+    b'333333333333333333333333'
+    b'3333####3####3####3####3'
+    b'33333####3####3####3####'
+    b'333333####3####3####3###'
+    b'#333333####3####3####3##'
+    b'##3333333333333333333333'
+    b'333333333####3####3####3'
+    b'####333333####3####3####'
+    b'3####333333####3####3###'
+    b'#3####333333####3####3##'
+    b'##3####33333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'3333333333333333333%%#%U'
+    b'%%#%U####3%%#%3UU33U%%#%'
+    b'U%%#%U####3%%#%3UU33U###'
+    b'#3####3####3####333333%%'
+    b'#%3%%#%3####3%%#%33333UU'
+    b'U33UUU33U333333333UUU3UU'
+    b'%%#%U%%#%U####3%%#%3UU33'
+    b'U%%#%U%%#%U####3%%#%3UU3'
+    b'3U####3####3####3####333'
+    b'333%%#%3%%#%3####3%%#%33'
+    b'333UUU33UUU33U333333333U'
+    b'UU3UU####3####3####3####'
+    b'333333####3####3####3###'
+    b'#333333####3####3####3##'
+    b'##333333####3####3####3#'
+    b'###333333333333333333333'
+    b'3333333333%%#%3%%#%3####'
+    b'3%%#%33333U%%#%3%%#%3###'
+    b'#3%%#%33333U####3####3##'
+    b'##3####333333%%#%3%%#%3#'
+    b'###3%%#%33333U3333U3333U'
+    b'333333333UUU3UUUU33UUU33'
+    b'U333333333UUU3UUUU33UUU3'
+    b'3U333333333UUU3UU3333333'
+    b'3333333333333333333333U3'
+    b'333U333333333UUU3UUUU3UU'
+    b'UU3UU33333UU3UUUU3UUUU3U'
+    b'UUU3UU33333UU33UUU3UUUU3'
+    b'UUUU3UU33333UU33UUU3UU33'
+    b'33333333333333333333333U'
+    b'U33UUU33U333333333UUU3UU'
+    b'UU3UUUU3UU33333UU3UUUU3U'
+    b'UUU3UUUU3UU33333UU33UUU3'
+    b'UUUU3UUUU3UU33333UU33UUU'
+    b'3UU333333333333333333333'
+    b'3333UU33UUU33U333333333U'
+    b'UU3UUUU3UUUU3UU33333UU3U'
+    b'UUU3UU333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'33333333333UU33UUU33U333'
+    b'333333UUU3UUUU33UUU33U33'
+    b'3333333UUU3UU33333333333'
+    b'333333333333333333U3333U'
+    b'333333333UUU3UUUU3UUUU3U'
+    b'U33333UU3UUUU3UUUU3UUUU3'
+    b'UU33333UU3UUUU3UUUU3UUUU'
+    b'3UU33333UU3UUUU3UU333333'
+    b'3333333333333333333UU3UU'
+    b'UU3UU33333UU3UUUU3UUUU3U'
+    b'UUU3UU33333UU3UUUU3UU###'
+    b'#3####3####3####333333##'
+    b'##3####3####3####333333#'
+    b'###3####3####3####333333'
+    b'####3####3####3####33333'
+    b'333333333333333333333333'
+    b'33####3####3####3####333'
+    b'333####3####3####3####33'
+    b'3333####3####3####3####3'
+    b'33333####3####3####3####'
+    b'333333333333333333333333'
+    b'3333333####3####3####3##'
+    b'##333333####3####3####3#'
+    b'###333333####3####3####3'
+    b'####333333####3####3####'
+    b'3####3333333333333333333'
+    b'333333333333####3####3##'
+    b'##3####333333####3####3#'
+    b'###3####333333####3####3'
+    b'####3####333333####3####'
+    b'3####3####33333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'3333333333333333333333##'
+    b'##3####3####3####333333#'
+    b'###3####3####3####333333'
+    b'####3####3####3####33333'
+    b'3####3####3####3####3333'
+    b'333333333333333333333333'
+    b'333####3####3####3####33'
+    b'3333####3####3####3####3'
+    b'33333####3####3####3####'
+    b'333333####3####3####3###'
+    b'#33333333333333333333333'
+    b'33333333####3####3####3#'
+    b'###333333####3####3####3'
+    b'####333333####3####3####'
+    b'3####333333####3####3###'
+    b'#3####333333333333333333'
+    b'3333333333333####3####3#'
+    b'###3####333333####3####3'
+    b'####3####333333####3####'
+    b'3####3####333333####3###'
+    b'#3####3####3333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'33333333333333333333333#'
+    b'###3####3####3####333333'
+    b'####3####3####3####33333'
+    b'3####3####3####3####3333'
+    b'33####3####3####3####333'
+    b'333333333333333333333333'
+    b'3333####3####3####3####3'
+    b'33333####3####3####3####'
+    b'333333####3####3####3###'
+    b'#333333####3####3####3##'
+    b'##3333333333333333333333'
+    b'333333333####3####3####3'
+    b'####333333####3####3####'
+    b'3####333333####3####3###'
+    b'#3####333333####3####3##'
+    b'##3####33333333333333333'
+    b'33333333333333####3####3'
+    b'####3####333333####3####'
+    b'3####3####333333####3###'
+    b'#3####3####333333####3##'
+    b'##3####3####333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'####3####3####3####33333'
+    b'3####3####3####3####3333'
+    b'33####3####3####3####333'
+    b'333####3####3####3####33'
+    b'333333333333333333333333'
+    b'33333####3####3####3####'
+    b'333333####3####3####3###'
+    b'#333333####3####3####3##'
+    b'##333333####3####3####3#'
+    b'###333333333333333333333'
+    b'3333333333####3####3####'
+    b'3####333333####3####3###'
+    b'#3####333333####3####3##'
+    b'##3####333333####3####3#'
+    b'###3####3333333333333333'
+    b'333333333333333####3####'
+    b'3####3####333333####3###'
+    b'#3####3####333333####3##'
+    b'##3####3####333333####3#'
+    b'###3####3####33333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'33%%#%U%%#%U####3%%#%3UU'
+    b'33U%%#%U%%#%U####3%%#%3U'
+    b'U33U####3####3####3####3'
+    b'33333%%#%3%%#%3####3%%#%'
+    b'33333UUU33UUU33U33333333'
+    b'3UUU3UU%%#%U%%#%U####3%%'
+    b'#%3UU33U%%#%U%%#%U####3%'
+    b'%#%3UU33U####3####3####3'
+    b'####333333%%#%3%%#%3####'
+    b'3%%#%33333UUU33UUU33U333'
+    b'333333UUU3UU####3####3##'
+    b'##3####333333####3####3#'
+    b'###3####333333####3####3'
+    b'####3####333333####3####'
+    b'3####3####33333333333333'
+    b'33333333333333333%%#%3%%'
+    b'#%3####3%%#%33333U%%#%3%'
+    b'%#%3####3%%#%33333U####3'
+    b'####3####3####333333%%#%'
+    b'3%%#%3####3%%#%33333U333'
+    b'3U3333U333333333UUU3UUUU'
+    b'33UUU33U333333333UUU3UUU'
+    b'U33UUU33U333333333UUU3UU'
+    b'333333333333333333333333'
+    b'33333U3333U333333333UUU3'
+    b'UUUU3UUUU3UU33333UU3UUUU'
+    b'3UU%%#%U%%#%U####3%%#%3U'
+    b'U33U%%#%U%%#%U####3%%#%3'
+    b'UU33U####3####3####3####'
+    b'333333%%#%3%%#%3####3%%#'
+    b'%33333UUU33UUU33U3333333'
+    b'33UUU3UU%%#%U%%#%U####3%'
+    b'%#%3UU33U%%#%U%%#%U####3'
+    b'%%#%3UU33U####3####3####'
+    b'3####333333%%#%3%%#%3###'
+    b'#3%%#%33333UUU33UUU33U33'
+    b'3333333UUU3UU####3####3#'
+    b'###3####333333####3####3'
+    b'####3####333333####3####'
+    b'3####3####333333####3###'
+    b'#3####3####3333333333333'
+    b'333333333333333333%%#%3%'
+    b'%#%3####3%%#%33333U%%#%3'
+    b'%%#%3####3%%#%33333U####'
+    b'3####3####3####333333%%#'
+    b'%3%%#%3####3%%#%33333U33'
+    b'33U3333U333333333UUU3UUU'
+    b'U33UUU33U333333333UUU3UU'
+    b'UU33UUU33U333333333UUU3U'
+    b'U33333333333333333333333'
+    b'333333U3333U333333333UUU'
+    b'3UUUU3UUUU3UU33333UU3UUU'
+    b'U3UU####3####3####3####3'
+    b'33333####3####3####3####'
+    b'333333####3####3####3###'
+    b'#333333####3####3####3##'
+    b'##3333333333333333333333'
+    b'333333333####3####3####3'
+    b'####333333####3####3####'
+    b'3####333333####3####3###'
+    b'#3####333333####3####3##'
+    b'##3####33333333333333333'
+    b'33333333333333####3####3'
+    b'####3####333333####3####'
+    b'3####3####333333####3###'
+    b'#3####3####333333####3##'
+    b'##3####3####333333333333'
+    b'3333333333333333333####3'
+    b'####3####3####333333####'
+    b'3####3####3####333333###'
+    b'#3####3####3####333333##'
+    b'##3####3####3####3333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'33333%%#%3%%#%3####3%%#%'
+    b'33333U%%#%3%%#%3####3%%#'
+    b'%33333U####3####3####3##'
+    b'##333333%%#%3%%#%3####3%'
+    b'%#%33333U3333U3333U33333'
+    b'3333UUU3UU%%#%3%%#%3####'
+    b'3%%#%33333U%%#%3%%#%3###'
+    b'#3%%#%33333U####3####3##'
+    b'##3####333333%%#%3%%#%3#'
+    b'###3%%#%33333U3333U3333U'
+    b'333333333UUU3UU####3####'
+    b'3####3####333333####3###'
+    b'#3####3####333333####3##'
+    b'##3####3####333333####3#'
+    b'###3####3####33333333333'
+    b'33333333333333333333%%#%'
+    b'3%%#%3####3%%#%33333U%%#'
+    b'%3%%#%3####3%%#%33333U##'
+    b'##3####3####3####333333%'
+    b'%#%3%%#%3####3%%#%33333U'
+    b'3333U3333U333333333UUU3U'
+    b'U3333U3333U333333333UUU3'
+    b'UU3333U3333U333333333UUU'
+    b'3UU333333333333333333333'
+    b'33333333U3333U333333333U'
+    b'UU3UUUU3UUUU3UU33333UU3U'
+    b'UUU3UUUU33UUU33U33333333'
+    b'3UUU3UUUU33UUU33U3333333'
+    b'33UUU3UU3333333333333333'
+    b'3333333333333U3333U33333'
+    b'3333UUU3UUUU3UUUU3UU3333'
+    b'3UU3UUUU3UUUU33UUU33U333'
+    b'333333UUU3UUUU33UUU33U33'
+    b'3333333UUU3UU33333333333'
+    b'333333333333333333U3333U'
+    b'333333333UUU3UUUU3UUUU3U'
+    b'U33333UU3UUUU3UU33333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'3U3333U333333333UUU3UU33'
+    b'33U3333U333333333UUU3UU3'
+    b'333333333333333333333333'
+    b'3333U3333U333333333UUU3U'
+    b'UUU3UUUU3UU33333UU3UUUU3'
+    b'UUUU3UUUU3UU33333UU3UUUU'
+    b'3UUUU3UUUU3UU33333UU3UUU'
+    b'U3UU33333333333333333333'
+    b'33333UU3UUUU3UU33333UU3U'
+    b'UUU3UUUU3UUUU3UU33333UU3'
+    b'UUUU3UUUU3UUUU3UU33333UU'
+    b'33UUU3UUUU3UUUU3UU33333U'
+    b'U33UUU3UU333333333333333'
+    b'3333333333UU33UUU33U3333'
+    b'33333UUU3UUUU3UUUU3UU333'
+    b'33UU3UUUU3UUUU3UUUU3UU33'
+    b'333UU33UUU3UUUU3UUUU3UU3'
+    b'3333UU33UUU3UU3333333333'
+    b'333333333333333UU33UUU33'
+    b'U333333333UUU3UUUU3UUUU3'
+    b'UU33333UU3UUUU3UU3333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'3333333333333333333333UU'
+    b'33UUU33U333333333UUU3UUU'
+    b'U33UUU33U333333333UUU3UU'
+    b'333333333333333333333333'
+    b'33333U3333U333333333UUU3'
+    b'UUUU3UUUU3UU33333UU3UUUU'
+    b'3UUUU3UUUU3UU33333UU3UUU'
+    b'U3UUUU3UUUU3UU33333UU3UU'
+    b'UU3UU3333333333333333333'
+    b'333333UU3UUUU3UU33333UU3'
+    b'UUUU3UUUU3UUUU3UU33333UU'
+    b'3UUUU3UUUU3UUUU3UU33333U'
+    b'U33UUU3UUUU3UUUU3UU33333'
+    b'UU33UUU3UU33333333333333'
+    b'33333333333UU33UUU33U333'
+    b'333333UUU3UUUU3UUUU3UU33'
+    b'333UU3UUUU3UUUU3UUUU3UU3'
+    b'3333UU33UUU3UUUU3UUUU3UU'
+    b'33333UU33UUU3UU333333333'
+    b'3333333333333333UU33UUU3'
+    b'3U333333333UUU3UUUU3UUUU'
+    b'3UU33333UU3UUUU3UU333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'33333333333333333333333U'
+    b'U33UUU33U333333333UUU3UU'
+    b'UU33UUU33U333333333UUU3U'
+    b'U33333333333333333333333'
+    b'333333U3333U333333333UUU'
+    b'3UUUU3UUUU3UU33333UU3UUU'
+    b'U3UUUU3UUUU3UU33333UU3UU'
+    b'UU3UUUU3UUUU3UU33333UU3U'
+    b'UUU3UU333333333333333333'
+    b'3333333UU3UUUU3UU33333UU'
+    b'3UUUU3UUUU3UUUU3UU33333U'
+    b'U3UUUU3UU333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'3333333333UU33UUU33U3333'
+    b'33333UUU3UUUU33UUU33U333'
+    b'333333UUU3UU333333333333'
+    b'33333333333333333U3333U3'
+    b'33333333UUU3UUUU3UUUU3UU'
+    b'33333UU3UUUU3UUUU33UUU33'
+    b'U333333333UUU3UUUU33UUU3'
+    b'3U333333333UUU3UU3333333'
+    b'3333333333333333333333U3'
+    b'333U333333333UUU3UUUU3UU'
+    b'UU3UU33333UU3UUUU3UU3333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'33333U3333U333333333UUU3'
+    b'UU3333U3333U333333333UUU'
+    b'3UU333333333333333333333'
+    b'33333333U3333U333333333U'
+    b'UU3UUUU3UUUU3UU33333UU3U'
+    b'UUU3UUUU3UUUU3UU33333UU3'
+    b'UUUU3UUUU3UUUU3UU33333UU'
+    b'3UUUU3UU3333333333333333'
+    b'333333333UU3UUUU3UU33333'
+    b'UU3UUUU3UUUU3UUUU3UU3333'
+    b'3UU3UUUU3UUUU3UUUU3UU333'
+    b'33UU3UUUU3UUUU3UUUU3UU33'
+    b'333UU3UUUU3UU33333333333'
+    b'33333333333333UU3UUUU3UU'
+    b'33333UU3UUUU3UUUU3UUUU3U'
+    b'U33333UU3UUUU3UUUU3UUUU3'
+    b'UU33333UU3UUUU3UUUU3UUUU'
+    b'3UU33333UU3UUUU3UU333333'
+    b'3333333333333333333UU3UU'
+    b'UU3UU33333UU3UUUU3UUUU3U'
+    b'UUU3UU33333UU3UUUU3UU333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'333333333333333333333333'
+    b'33UU3UUUU3UU33333UU3UUUU'
+    b'3UUUU3UUUU3UU33333UU3UUU'
+    b'U3UU33333333333333333333'
+    b'33333UU3UUUU3UU33333UU3U'
+    b'UUU3UUUU3UUUU3UU33333UU3'
+    b'UUUU3UUUU3UUUU3UU33333UU'
+    b'3UUUU3UUUU3UUUU3UU33333U'
+    b'U3UUUU3UU333333333333333'
+    b'3333333333UU3UUUU3UU3333'
+    b'3UU3UUUU3UUUU3UUUU3UU333'
+    b'33UU3UUUU3UU'
+)
@@ -1,15 +1,32 @@
-from machine import Pin, Signal, Timer
-from random import randrange
-import struct
+from machine import Pin, Signal, mem32
+from utime import sleep_us
 
 from ktane_lib.constants import CONSTANTS
+from ktane_lib.wire_rules import NO_ANSWER, layout_key
 from log import LOG
 from hardware import KtaneHardware
+from wire_table import TABLE
 
 # Constants:
-POSTS = (2, 3, 4, 5, 6, 7)
+POSTS = (2, 3, 4, 5, 6, 7)  # Must be consecutive, they're read as one field of GPIO_IN
 WIRES = (10, 11, 12, 13, 14, 20, 19, 18, 17, 16)
 
+SIO_BASE = 0xD0000000
+GPIO_IN = SIO_BASE + 0x004
+GPIO_OUT_SET = SIO_BASE + 0x014
+GPIO_OUT_CLR = SIO_BASE + 0x018
+
+# Wires and posts are active low: a driven wire is pulled low and pulls its post low against the pull-up
+WIRE_MASKS = [1 << pin for pin in WIRES]
+ALL_WIRES_MASK = sum(WIRE_MASKS)
+POST_SHIFT = POSTS[0]
+POST_BITS = (1 << len(POSTS)) - 1
+LOWEST_POST = bytes(  # Index of the lowest set bit, 0xFF if none
+    [0xFF] + [min(bit for bit in range(len(POSTS)) if value & (1 << bit)) for value in range(1, POST_BITS + 1)]
+)
+SETTLE_US = 10  # Let the pull-ups recharge the post we just stopped driving
+TAMPER_SCAN_MS = 20
+
 COLOR_POSITIONS = [
     CONSTANTS.COLORS.BLACK,
     CONSTANTS.COLORS.BLACK,
@@ -28,64 +45,51 @@ class WireModule(KtaneHardware):
     right_post: int
     mapping: list
     colors: list
+    needs_context = True  # For the serial number
 
     def __init__(self) -> None:
-        KtaneHardware.__init__(self, self.read_config())
+        KtaneHardware.__init__(self, CONSTANTS.MODULES.TYPES.WIRES)
         self.handlers.update(
             {
-                CONSTANTS.PROTOCOL.PACKET_TYPE.REQUEST_ID: self.request_id,
-                CONSTANTS.PROTOCOL.PACKET_TYPE.CONFIGURE: self.configure,
                 CONSTANTS.PROTOCOL.PACKET_TYPE.START: self.start,
                 CONSTANTS.PROTOCOL.PACKET_TYPE.STOP: self.stop,
                 CONSTANTS.PROTOCOL.PACKET_TYPE.DISARMED: self.disarmed,
             }
         )
-        self.serial_number = b""
         self.post_pins = [Pin(pin_num, Pin.IN, Pin.PULL_UP) for pin_num in POSTS]
-        self.posts = [Signal(pin, invert=True) for pin in self.post_pins]
         self.wires = [Signal(Pin(pin_num, Pin.OUT), invert=True) for pin_num in WIRES]
 
-    @staticmethod
-    def read_config() -> int:
-        # Format:
-        #
-        # Field    Length   Notes
-        # ------   ------   ---------------------------------------------
-        # unique   1        Unique portion of ID, assigned at manufacture
-        unique = b""
-        try:
-            file_obj = open(CONSTANTS.MODULES.CONFIG_FILENAME, "rb")
-            unique = file_obj.read(1)
-            file_obj.close()
-        except OSError:
-            pass
-
-        return (CONSTANTS.MODULES.TYPES.WIRES << 8) | (ord(unique) if unique else 0x00)
-
-    def request_id(self, source: int, _dest: int, _payload: bytes) -> bool:
-        LOG.debug("request_id")
-        Timer(
-            mode=Timer.ONE_SHOT,
-            period=randrange(*CONSTANTS.PROTOCOL.TIMING.ID_SPREAD_MS),
-            callback=lambda timer: self.send_without_queuing(
-                source,
-                CONSTANTS.PROTOCOL.PACKET_TYPE.RESPONSE_ID,
-                struct.pack("BB", CONSTANTS.MODULES.FLAGS.TRIGGER, 0),
-            ),
-        )
-        return True
-
-    def configure(self, _source: int, _dest: int, payload: bytes) -> bool:
-        # Payload is the serial number
-        self.serial_number = payload
-        LOG.debug("configure", payload)
-        return False
-
-    def start(self, _source: int, _dest: int, _payload: bytes):
+        # One small ISR per post, built now so nothing is allocated when a wire is cut
+        self.post_isrs = [
+            (lambda _pin, index=index: self.events.post(CONSTANTS.EVENTS.POST_CUT, index))
+            for index in range(len(POSTS))
+        ]
+        self.event_handlers[CONSTANTS.EVENTS.POST_CUT] = self.on_post_cut
+        self.event_handlers[CONSTANTS.EVENTS.POSTS_CHANGED] = self.on_posts_changed
+        self.intact = 0  # Bit per post with an uncut wire
+        self.tampered = 0  # Bit per post that gained a wire during the game
+        self.last_connected = 0
+        self.tamper_timer = self.timers.allocate(self.on_tamper_scan)
+
+    def start(self, source: int, dest: int, payload: bytes):
         # Payload is the difficulty but we're not adjustable so we ignore it
         LOG.debug("start")
-        if self.serial_number and self.determine_correct_wire():
+        KtaneHardware.start(self, source, dest, payload)
+        if self.context.version is None:
+            self.set_mode(CONSTANTS.MODES.READY)  # Armed by context_changed()
+        else:
+            self.arm()
+
+    def context_changed(self):
+        if self.mode == CONSTANTS.MODES.READY:
+            self.arm()
+
+    def arm(self):
+        if self.context.serial_number and self.determine_correct_wire():
             self.set_mode(CONSTANTS.MODES.ARMED)
+            self.tampered = 0
+            self.last_connected = self.intact
+            self.timers.start(self.tamper_timer, TAMPER_SCAN_MS, periodic=True)
         else:
             self.unable_to_arm()
             self.set_mode(CONSTANTS.MODES.SLEEP)
@@ -94,6 +98,7 @@ class WireModule(KtaneHardware):
         # Disable handlers
         for post in self.post_pins:
             post.irq(None)
+        self.timers.cancel(self.tamper_timer)
 
     def disarmed(self):
         self.disable_irqs()
@@ -104,18 +109,7 @@ class WireModule(KtaneHardware):
         return KtaneHardware.stop(self, source, dest, payload)
 
     def determine_correct_wire(self) -> bool:
-        # Map wires-posts
-        self.mapping = [None] * len(POSTS)
-        for index1 in range(len(WIRES)):
-            # Drive one wire
-            for index2, wire in enumerate(self.wires):
-                wire.value(index1 == index2)
-
-            # Find a driven post
-            for index2, post in enumerate(self.posts):
-                if post.value():
-                    self.mapping[index2] = index1
-                    break
+        self.scan()
         for index2, index1 in enumerate(self.mapping):
             LOG.debug("mapping", index2, index1)
 
@@ -123,110 +117,90 @@ class WireModule(KtaneHardware):
         self.colors = [COLOR_POSITIONS[mapping] for mapping in self.mapping if mapping is not None]
         for index, color in enumerate(self.colors):
             LOG.debug("colors", index, color)
-        num_wires = len(self.colors)
-
-        # Drive the wires
-        for wire in self.wires:
-            wire.on()
 
-        # Game logic
-        last_serial_digit_odd = self.serial_number[-1] in b"13579"
-        if num_wires < 3:
+        # Game logic, see tools/gen_wire_table.py
+        key = layout_key(self.colors)
+        if key is None:
+            return False
+        wire = TABLE[key]
+        if self.context.last_serial_digit_odd:
+            wire >>= 4
+        wire &= 0x0F
+        if wire == NO_ANSWER:
             return False
-        elif num_wires == 3:
-            if CONSTANTS.COLORS.RED not in self.colors:  # No red
-                self.should_cut(2)  # Cut second
-            elif self.colors[-1] == CONSTANTS.COLORS.WHITE:  # Last is white
-                self.should_cut(-1)  # Cut last
-            elif self.count_num_of(CONSTANTS.COLORS.BLUE) > 1:  # More than one blue
-                self.should_cut(-1, CONSTANTS.COLORS.BLUE)  # Cut last blue
-            else:
-                self.should_cut(-1)  # Cut last
-        elif num_wires == 4:
-            # More than one red and last digit of serial number is odd
-            if (self.count_num_of(CONSTANTS.COLORS.RED) > 1) and last_serial_digit_odd:
-                self.should_cut(-1, CONSTANTS.COLORS.RED)  # Cut last red
-            # Last is yellow and no reds
-            elif (self.colors[-1] == CONSTANTS.COLORS.YELLOW) and (self.count_num_of(CONSTANTS.COLORS.RED) == 0):
-                self.should_cut(1)  # Cut first
-            elif self.count_num_of(CONSTANTS.COLORS.BLUE) == 1:  # Exactly one blue
-                self.should_cut(1)  # Cut first
-            elif self.count_num_of(CONSTANTS.COLORS.YELLOW) > 1:  # More than one yellow
-                self.should_cut(-1)  # Cut last
-            else:
-                self.should_cut(2)  # Cut second
-        elif num_wires == 5:
-            # Last is black and last digit of serial number is odd
-            if (self.colors[-1] == CONSTANTS.COLORS.BLACK) and last_serial_digit_odd:
-                self.should_cut(4)  # Cut fourth
-            # Exactly one red and more than one yellow
-            elif (self.count_num_of(CONSTANTS.COLORS.RED) == 1) and (self.count_num_of(CONSTANTS.COLORS.YELLOW) > 1):
-                self.should_cut(1)  # Cut first
-            elif self.count_num_of(CONSTANTS.COLORS.BLACK) == 0:  # No black
-                self.should_cut(2)  # Cut second
-            else:
-                self.should_cut(1)  # Cut first
-        else:  # if num_wires==6:
-            # No yellow and last digit of serial number is odd
-            if (self.count_num_of(CONSTANTS.COLORS.YELLOW) == 0) and last_serial_digit_odd:
-                self.should_cut(3)  # Cut third
-            # Exactly one yellow and more than one white
-            elif (self.count_num_of(CONSTANTS.COLORS.YELLOW) == 1) and (self.count_num_of(CONSTANTS.COLORS.WHITE) > 1):
-                self.should_cut(4)  # Cut fourth
-            elif self.count_num_of(CONSTANTS.COLORS.RED) == 0:  # No red
-                self.should_cut(-1)  # Cut last
-            else:
-                self.should_cut(4)  # Cut fourth
-        return True
-
-    def should_cut(self, post_number: int, color=None) -> None:
-        LOG.debug("should_cut", post_number, color)
-
-        # Did they specify a color (e.g. "last red" or "first white")?
-        if color is None:
-            # No all colors, so just skip None
-            posts_in_use = [index for index, mapping in enumerate(self.mapping) if mapping is not None]
-        else:
-            # Specific color
-            posts_in_use = [index for index, mapping in enumerate(self.mapping) if COLOR_POSITIONS[mapping] == color]
-        if post_number < 0:
-            # Count from end
-            self.right_post = posts_in_use[post_number]
-        else:
-            # Post number (Warning: post #1 means index 0!)
-            self.right_post = posts_in_use[post_number - 1]
 
+        # Which post is that wire on?
+        self.right_post = [index for index, mapping in enumerate(self.mapping) if mapping is not None][wire]
         LOG.info("right_post=", self.right_post)
 
-        for post in self.post_pins:
-            post.irq(self.on_wrong_post, trigger=Pin.IRQ_RISING)
-        self.post_pins[self.right_post].irq(self.on_right_post, trigger=Pin.IRQ_RISING)
+        for post, isr in zip(self.post_pins, self.post_isrs):
+            post.irq(isr, trigger=Pin.IRQ_RISING)
+        return True
 
-    def count_num_of(self, color_to_count: int) -> int:
-        return sum(1 for color in self.colors if color == color_to_count)
+    def scan(self) -> None:
+        """Map posts to wires, then leave every wire driven
 
-    # Called during an interrupt! Don't allocate memory or waste time!
-    def pin_fired(self, pin) -> bool:
-        for index, post in enumerate(self.post_pins):
-            if pin == post:
-                if self.mapping[index] is None:
-                    return False
-                else:
-                    self.mapping[index] = None
-                    return True
-        else:
-            return False
+        One wire is driven at a time with a single register write and all posts are read at once as a bit vector.
+        """
+        self.mapping = [None] * len(POSTS)
+        self.intact = 0
+        for index, wire_mask in enumerate(WIRE_MASKS):
+            mem32[GPIO_OUT_SET] = ALL_WIRES_MASK ^ wire_mask
+            mem32[GPIO_OUT_CLR] = wire_mask
+            sleep_us(SETTLE_US)
+            post = LOWEST_POST[self.read_posts()]
+            if post != 0xFF:
+                self.mapping[post] = index
+                self.intact |= 1 << post
+        mem32[GPIO_OUT_CLR] = ALL_WIRES_MASK
 
     # Called during an interrupt! Don't allocate memory or waste time!
-    def on_wrong_post(self, pin):
-        if self.pin_fired(pin):
-            LOG.info("wrong pin")
-            pin.irq(None)
-            self.queued |= CONSTANTS.QUEUED_TASKS.STRIKE
+    @staticmethod
+    def read_posts() -> int:
+        """Bit per post that is pulled low by a driven wire"""
+        return (~mem32[GPIO_IN] >> POST_SHIFT) & POST_BITS
 
     # Called during an interrupt! Don't allocate memory or waste time!
-    def on_right_post(self, pin):
-        if self.pin_fired(pin):
+    def on_tamper_scan(self, _slot):
+        # All wires are driven, so every post with a wire on it reads connected
+        connected = self.read_posts()
+        if connected != self.last_connected:
+            self.last_connected = connected
+            self.events.post(CONSTANTS.EVENTS.POSTS_CHANGED, connected)
+
+    def on_posts_changed(self, connected: int, stamp: int):
+        if self.mode != CONSTANTS.MODES.ARMED:
+            # Queued before we were disarmed or stopped
+            return
+
+        # Cuts the post interrupt missed
+        cut = self.intact & ~connected
+        for index in range(len(POSTS)):
+            if cut & (1 << index):
+                self.on_post_cut(index, stamp)
+
+        # Wires that appeared on a post that was empty or already cut
+        added = connected & ~self.intact & ~self.tampered
+        if added:
+            self.tampered |= added
+            LOG.warning("tamper", added)
+            for index in range(len(POSTS)):
+                if added & (1 << index):
+                    self.strike()
+
+    def on_post_cut(self, index: int, _stamp: int):
+        if self.mode != CONSTANTS.MODES.ARMED:
+            # Queued before we were disarmed or stopped
+            return
+        if self.mapping[index] is None:
+            # Nothing was connected or it was already cut
+            return
+        self.mapping[index] = None
+        self.intact &= ~(1 << index)
+        self.post_pins[index].irq(None)
+        if index == self.right_post:
             LOG.info("right pin")
-            pin.irq(None)
-            self.queued |= CONSTANTS.QUEUED_TASKS.DISARMED
+            self.disarmed()
+        else:
+            LOG.info("wrong pin")
+            self.strike()
@@ -0,0 +1,108 @@
+"""Stream a firmware image to every module of one type at once
+
+The image is broadcast in numbered chunks to type << 8 | BROADCAST_MASK, so the whole fleet receives it in the time
+of one transfer. Then every module is asked, one ID-style slot each, which chunks it's missing, and only the union of
+those is sent again. Once everyone has a verified image, UPDATE_COMMIT has them swap to it and reset.
+"""
+import binascii
+import logging
+import struct
+from time import time
+
+from ktane_lib.constants import CONSTANTS
+from ktane_lib.firmware import missing_chunks, num_chunks, pack_begin, pack_chunk
+
+# Constants:
+LOG = logging.getLogger(__file__)
+BEGIN_SETTLE = 0.1  # 100ms for the receivers to open their staging file
+MAX_ROUNDS = 10  # Queries before giving up on modules that still aren't complete
+
+
+class FirmwareUpdate:
+    BEGIN, SENDING, QUERY, COLLECT, DONE = range(5)
+
+    def __init__(self, master, module_type: int, image: bytes, version: int) -> None:
+        self.master = master
+        self.dest = (module_type << 8) | CONSTANTS.MODULES.BROADCAST_MASK
+        self.image, self.version = image, version
+        self.begin_payload = pack_begin(version, image, binascii.crc32(image) & 0xFFFFFFFF)
+        self.module_type = module_type
+        self.targets = None  # Taken from the registry once discovery is done
+        self.to_send = list(range(num_chunks(len(image))))
+        self.reports = {}  # addr -> missing chunk numbers from this round's UPDATE_STATUS
+        self.stage = self.BEGIN
+        self.next_at = 0.0
+        self.rounds = 0
+
+    def done(self) -> bool:
+        return self.stage == self.DONE
+
+    def step(self, now: float) -> bool:
+        """Do whatever's due, called from the poll loop
+
+        :return: True if anything was sent
+        """
+        if (self.stage == self.DONE) or (now < self.next_at):
+            return False
+
+        if self.stage == self.BEGIN:
+            if self.targets is None:
+                self.targets = set(info.addr for info in self.master.registry if info.module_type == self.module_type)
+            LOG.info("update %d modules to version %d", len(self.targets), self.version)
+            self.master.send_without_queuing(self.dest, CONSTANTS.PROTOCOL.PACKET_TYPE.UPDATE_BEGIN, self.begin_payload)
+            self.stage = self.SENDING
+            self.next_at = now + BEGIN_SETTLE
+
+        elif self.stage == self.SENDING:
+            if self.to_send:
+                index = self.to_send.pop(0)
+                self.master.send_without_queuing(
+                    self.dest, CONSTANTS.PROTOCOL.PACKET_TYPE.UPDATE_CHUNK, pack_chunk(self.image, index)
+                )
+                self.next_at = time() + (CONSTANTS.PROTOCOL.TIMING.CHUNK_GAP_US / 1000000.0)
+            else:
+                self.stage = self.QUERY
+
+        elif self.stage == self.QUERY:
+            self.rounds += 1
+            self.reports = {}
+            slot_us = CONSTANTS.PROTOCOL.TIMING.UPDATE_SLOT_US
+            self.master.send_without_queuing(
+                self.dest, CONSTANTS.PROTOCOL.PACKET_TYPE.UPDATE_QUERY, struct.pack("<H", slot_us)
+            )
+            slots = max([-1] + [addr & 0xFF for addr in self.targets]) + 2
+            self.stage = self.COLLECT
+            self.next_at = time() + (slots * slot_us / 1000000.0)
+
+        elif self.stage == self.COLLECT:
+            self.collect()
+        return True
+
+    def status(self, source: int, payload: bytes) -> None:
+        """An UPDATE_STATUS from one of the modules"""
+        self.reports[source] = missing_chunks(payload)
+
+    def collect(self) -> None:
+        silent = self.targets - set(self.reports)
+        missing = sorted(set(index for chunks in self.reports.values() for index in chunks))
+        LOG.debug("round %d: %d chunks missing, %d modules silent", self.rounds, len(missing), len(silent))
+        if not (missing or silent):
+            self.commit()
+        elif self.rounds >= MAX_ROUNDS:
+            incomplete = set(addr for addr, chunks in self.reports.items() if chunks)
+            LOG.warning("giving up on %r", sorted(silent | incomplete))
+            self.commit()
+        elif silent:
+            # They may have missed UPDATE_BEGIN, repeats are ignored by everyone else. Once they have it, they'll
+            # report every chunk missing next round.
+            self.stage = self.BEGIN
+            self.to_send = missing
+        else:
+            self.stage = self.SENDING
+            self.to_send = missing
+
+    def commit(self) -> None:
+        # Modules without a verified image ignore it
+        LOG.info("commit version %d", self.version)
+        self.master.send_without_queuing(self.dest, CONSTANTS.PROTOCOL.PACKET_TYPE.UPDATE_COMMIT)
+        self.stage = self.DONE
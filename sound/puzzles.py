@@ -0,0 +1,235 @@
+"""Generate bomb configurations in batches
+
+Everything is done on whole arrays at once: edgework, wire and button layouts are sampled for a batch, the solution and
+a difficulty score are computed for every bomb with the same tables the modules use, and bombs that can't be solved
+are dropped. balanced() then picks an even spread of difficulty from a larger batch.
+"""
+import numpy as np
+
+from ktane_lib.button_rules import ANY, DEFAULT, HOLD, RULES
+from ktane_lib.constants import CONSTANTS
+from ktane_lib.context import BombContext
+from ktane_lib.wire_rules import MAX_WIRES, MIN_WIRES, NO_ANSWER, NUM_COLORS, OFFSETS
+from raspberry_pi.wire_table import TABLE
+
+# Constants:
+NUM_POSTS = 6
+NO_WIRE = -1
+SERIAL_LEN = 6
+SERIAL_CHARS = np.frombuffer(b"ABCDEFGHIJKLMNPQRSTUVWXZ0123456789", dtype=np.uint8)  # No O or Y, like the game
+DIGITS = np.frombuffer(b"0123456789", dtype=np.uint8)
+MAX_BATTERIES = 4
+INDICATORS = [b"BOB", b"CAR", b"CLR", CONSTANTS.LABELS.FKR, b"FRQ", b"IND", b"MSA", b"NSA", b"SIG", b"SND", b"TRN"]
+BUTTON_COLORS = [
+    CONSTANTS.COLORS.BLACK,
+    CONSTANTS.COLORS.BLUE,
+    CONSTANTS.COLORS.RED,
+    CONSTANTS.COLORS.WHITE,
+    CONSTANTS.COLORS.YELLOW,
+]
+BUTTON_TEXTS = [CONSTANTS.LABELS.ABORT, CONSTANTS.LABELS.DETONATE, CONSTANTS.LABELS.HOLD, b"PRESS\x00\x00\x00"]
+WIRE_TABLE = np.frombuffer(TABLE, dtype=np.uint8)
+WIRE_OFFSETS = np.array([OFFSETS.get(count, 0) for count in range(MAX_WIRES + 1)], dtype=np.int64)
+DIFFICULTY_BINS = 5
+
+# Matches ButtonModule.configure()
+BUTTON_PAYLOAD = np.dtype([("color", "u1"), ("text", "S8")])
+
+
+class BombBatch:
+    """A batch of bombs, one row per bomb in each array
+
+    serials          (n, 6) ASCII
+    batteries        (n,)
+    indicators       (n,) index into INDICATORS
+    indicator_lit    (n,) bool
+    wires            (n, 6) wire color on each post, NO_WIRE if empty
+    button_colors    (n,) from CONSTANTS.COLORS
+    button_texts     (n,) index into BUTTON_TEXTS
+    right_post       (n,) post to cut, -1 if the layout can't be solved
+    button_hold      (n,) True if the button must be held
+    difficulty       (n,) 0.0 (easiest) to 1.0
+    """
+
+    FIELDS = (
+        "serials",
+        "batteries",
+        "indicators",
+        "indicator_lit",
+        "wires",
+        "button_colors",
+        "button_texts",
+        "right_post",
+        "button_hold",
+        "difficulty",
+    )
+
+    def __init__(self, **arrays) -> None:
+        for field in self.FIELDS:
+            setattr(self, field, arrays[field])
+
+    def __len__(self) -> int:
+        return len(self.batteries)
+
+    def __getitem__(self, selection) -> "BombBatch":
+        return BombBatch(**{field: getattr(self, field)[selection] for field in self.FIELDS})
+
+    def serial_number(self, index: int) -> bytes:
+        return self.serials[index].tobytes()
+
+    def button_payloads(self) -> np.ndarray:
+        payloads = np.zeros(len(self), dtype=BUTTON_PAYLOAD)
+        payloads["color"] = self.button_colors
+        payloads["text"] = np.array(BUTTON_TEXTS)[self.button_texts]
+        return payloads
+
+    def context(self, index: int, version: int) -> BombContext:
+        """Edgework of one bomb, for the CONTEXT broadcast"""
+        return BombContext(
+            version,
+            self.serial_number(index),
+            int(self.batteries[index]),
+            ((INDICATORS[self.indicators[index]], bool(self.indicator_lit[index])),),
+        )
+
+    def configure_payloads(self, index: int) -> dict:
+        """CONFIGURE payload for each module type of one bomb that needs more than the context"""
+        return {CONSTANTS.MODULES.TYPES.BUTTON: self.button_payloads()[index : index + 1].tobytes()}
+
+
+def sample(count: int, rng=None) -> BombBatch:
+    """Random bombs, solved and scored, including unsolvable ones"""
+    rng = np.random.default_rng(rng)
+
+    # Edgework
+    serials = rng.choice(SERIAL_CHARS, size=(count, SERIAL_LEN))
+    serials[:, -1] = rng.choice(DIGITS, size=count)
+    batteries = rng.integers(0, MAX_BATTERIES + 1, size=count)
+    indicators = rng.integers(0, len(INDICATORS), size=count)
+    indicator_lit = rng.random(count) < 0.5
+
+    # Wires, a random number of them on random posts
+    num_wires = rng.integers(MIN_WIRES, MAX_WIRES + 1, size=count)
+    order = np.argsort(rng.random((count, NUM_POSTS)), axis=1)
+    used = order < num_wires[:, None]
+    wires = np.where(used, rng.integers(0, NUM_COLORS, size=(count, NUM_POSTS)), NO_WIRE)
+
+    button_colors = np.array(BUTTON_COLORS)[rng.integers(0, len(BUTTON_COLORS), size=count)]
+    button_texts = rng.integers(0, len(BUTTON_TEXTS), size=count)
+
+    right_post, parity_matters = solve_wires(wires, serials[:, -1])
+    button_hold, rule = solve_button(button_colors, button_texts, batteries, indicators, indicator_lit)
+    difficulty = score(num_wires, parity_matters, button_hold, rule)
+    return BombBatch(
+        serials=serials,
+        batteries=batteries,
+        indicators=indicators,
+        indicator_lit=indicator_lit,
+        wires=wires,
+        button_colors=button_colors,
+        button_texts=button_texts,
+        right_post=right_post,
+        button_hold=button_hold,
+        difficulty=difficulty,
+    )
+
+
+def solve_wires(wires: np.ndarray, last_serial_digit: np.ndarray):
+    """Look every layout up in the modules' wire table
+
+    :return: (post to cut or -1, True where the answer depends on the serial number)
+    """
+    used = wires != NO_WIRE
+    num_wires = used.sum(axis=1)
+
+    # layout_key(): the colors in post order as base NUM_COLORS digits, empty posts skipped
+    key = np.zeros(len(wires), dtype=np.int64)
+    for post in range(NUM_POSTS):
+        key = np.where(used[:, post], (key * NUM_COLORS) + wires[:, post], key)
+    key += WIRE_OFFSETS[num_wires]
+
+    entry = WIRE_TABLE[key]
+    odd = (last_serial_digit - ord("0")) % 2 == 1
+    position = np.where(odd, entry >> 4, entry & 0x0F)
+
+    # Position among the wires to post number: the post where the running count of wires passes position
+    wire_number = np.cumsum(used, axis=1) - 1
+    hits = used & (wire_number == position[:, None])
+    right_post = np.where((position != NO_ANSWER) & hits.any(axis=1), hits.argmax(axis=1), -1)
+    return right_post, (entry >> 4) != (entry & 0x0F)
+
+
+def solve_button(colors, texts, batteries, indicators, indicator_lit):
+    """Run ktane_lib.button_rules over the batch, first match wins
+
+    :return: (True where the button must be held, index of the rule that decided, len(RULES) for the default)
+    """
+    text_values = np.array(BUTTON_TEXTS)[texts]
+    label_values = np.array(INDICATORS)[indicators]
+    rule = np.full(len(colors), len(RULES))
+    hold = np.full(len(colors), DEFAULT == HOLD)
+    for index, (rule_color, rule_text, min_batteries, lit_indicator, outcome) in enumerate(RULES):
+        match = batteries >= min_batteries
+        if rule_color is not ANY:
+            match &= colors == rule_color
+        if rule_text is not ANY:
+            match &= text_values == rule_text
+        if lit_indicator is not ANY:
+            match &= indicator_lit & (label_values == lit_indicator)
+        match &= rule == len(RULES)
+        rule[match] = index
+        hold[match] = outcome == HOLD
+    return hold, rule
+
+
+def score(num_wires, parity_matters, button_hold, rule) -> np.ndarray:
+    """0.0 (easiest) to 1.0: more wires, answers that hinge on the serial number, held buttons and rules further down
+    the manual all take longer"""
+    wires = (num_wires - MIN_WIRES) / (MAX_WIRES - MIN_WIRES)
+    button = rule / len(RULES)
+    return (0.4 * wires) + (0.15 * parity_matters) + (0.25 * button_hold) + (0.2 * button)
+
+
+def generate(count: int, rng=None) -> BombBatch:
+    """count solvable bombs"""
+    rng = np.random.default_rng(rng)
+    batch = sample(count, rng)
+    batch = batch[batch.right_post >= 0]
+    while len(batch) < count:
+        more = sample(count, rng)
+        batch = concatenate(batch, more[more.right_post >= 0])
+    return batch[:count]
+
+
+def balanced(count: int, rng=None, oversample: int = 4) -> BombBatch:
+    """count solvable bombs spread evenly over DIFFICULTY_BINS levels of difficulty, easiest first"""
+    rng = np.random.default_rng(rng)
+    batch = generate(count * oversample, rng)
+    level = np.minimum((batch.difficulty * DIFFICULTY_BINS).astype(int), DIFFICULTY_BINS - 1)
+    per_level = -(-count // DIFFICULTY_BINS)
+    picks = np.concatenate([np.flatnonzero(level == index)[:per_level] for index in range(DIFFICULTY_BINS)])
+
+    # Top up from whatever is left if a level came up short
+    if len(picks) < count:
+        rest = np.setdiff1d(np.arange(len(batch)), picks)
+        picks = np.concatenate([picks, rest[: count - len(picks)]])
+    picks = picks[:count]
+    return batch[picks[np.argsort(batch.difficulty[picks], kind="stable")]]
+
+
+def concatenate(first: BombBatch, second: BombBatch) -> BombBatch:
+    return BombBatch(
+        **{field: np.concatenate([getattr(first, field), getattr(second, field)]) for field in BombBatch.FIELDS}
+    )
+
+
+if __name__ == "__main__":
+    from time import perf_counter
+
+    started = perf_counter()
+    bombs = balanced(10000)
+    elapsed = perf_counter() - started
+    print("%d bombs in %.3fs" % (len(bombs), elapsed))
+    print("difficulty by level:", np.histogram(bombs.difficulty, bins=DIFFICULTY_BINS, range=(0.0, 1.0))[0])
+    print("context:", bombs.context(0, 0).pack())
+    print("first:", bombs.configure_payloads(0), "wires", bombs.wires[0], "cut post", bombs.right_post[0])
@@ -1,5 +1,7 @@
+import argparse
 import logging
 import os
+from random import randrange
 import struct
 
 from RPi import GPIO
@@ -8,7 +10,13 @@ import subprocess
 from time import time, sleep
 
 from ktane_lib.constants import CONSTANTS
+from ktane_lib.context import BombContext
+from ktane_lib.fragments import FRAGMENT_LEN, MAX_FRAGMENTS
+from ktane_lib.game_status import GameStatus, format_time
 from ktane_lib.ktane_base import KtaneBase, QueuedPacket
+from ktane_lib.registry import ModuleRegistry
+from firmware_update import FirmwareUpdate
+from puzzles import generate
 
 # Constants:
 LOG = logging.getLogger(__file__)
@@ -19,6 +27,7 @@ IDLE_SLEEP = 0.000050  # 50us
 BEEP_OFFSET = -0.1  # -100ms
 RESYNC_EVERY = 10  # 10s
 NUM_STRIKES = 3
+TOPOLOGY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "topology.bin")
 
 
 def play(filename: str, volume: int = 100):
@@ -46,15 +55,23 @@ def idle():
 
 
 class SoundModule(KtaneBase):
+    reassembly_len = MAX_FRAGMENTS * FRAGMENT_LEN  # Plenty of memory here, take anything a module can send
+    reassembly_slots = 0x100  # One per module, so modules sending at once don't wipe each other's messages
+
     def __init__(self):
-        # self.modules = [CONSTANTS.MODULES.TYPES.WIRES << 8]  # TODO: make dynamic
-        self.modules = [CONSTANTS.MODULES.TYPES.BUTTON << 8]  # TODO: make dynamic
+        self.registry = ModuleRegistry()
+        self.state = CONSTANTS.STATES.START
+        self.discovery_ends = self.probing = None
+        self.answers_end = 0  # When every module has had its slot for the last broadcast REQUEST_ID
+        self.id_retries = self.bad_frames_seen = 0
+        self.unverified = set()
+        self.topology_changed = False
         uart = PiSerial("/dev/ttyS0", 115200, timeout=1)
         tx_en = Pin(TX_EN_PIN, GPIO.OUT)
         KtaneBase.__init__(self, CONSTANTS.MODULES.TYPES.SOUND, uart, tx_en, LOG, idle, ticks_us)
         self.handlers.update(
             {
-                # CONSTANTS.PROTOCOL.PACKET_TYPE.REQUEST_ID: self.request_id,
+                CONSTANTS.PROTOCOL.PACKET_TYPE.RESPONSE_ID: self.response_id,
                 CONSTANTS.PROTOCOL.PACKET_TYPE.START: self.start,
                 CONSTANTS.PROTOCOL.PACKET_TYPE.ERROR: self.error,
                 CONSTANTS.PROTOCOL.PACKET_TYPE.STOP: self.stop,
@@ -62,10 +79,151 @@ class SoundModule(KtaneBase):
                 CONSTANTS.PROTOCOL.PACKET_TYPE.DISARMED: self.disarmed,
                 CONSTANTS.PROTOCOL.PACKET_TYPE.STRIKE: self.strike,
                 CONSTANTS.PROTOCOL.PACKET_TYPE.READ_STATUS: self.status,
+                CONSTANTS.PROTOCOL.PACKET_TYPE.SUBSCRIBE: self.subscribe,
+                CONSTANTS.PROTOCOL.PACKET_TYPE.READ_CONTEXT: self.read_context,
+                CONSTANTS.PROTOCOL.PACKET_TYPE.UPDATE_STATUS: self.update_status,
             }
         )
         self.game_time = self.game_ends_at = self.next_beep_at = self.next_resync = self.strikes = None
         self.armed_modules = set()
+        self.subscribers = {}
+        self.status_interval = self.next_status_at = None
+        self.context = BombContext()
+        self.new_context()
+        self.update = None  # FirmwareUpdate in progress
+
+        cached = self.load_topology()
+        if cached:
+            self.verify(cached)
+        else:
+            self.discover()
+
+    @staticmethod
+    def load_topology():
+        try:
+            with open(TOPOLOGY_FILE, "rb") as file_obj:
+                registry = ModuleRegistry.from_bytes(file_obj.read())
+        except (OSError, ValueError, struct.error):
+            return None
+        return registry if len(registry) else None
+
+    def save_topology(self):
+        LOG.debug("save_topology")
+        try:
+            with open(TOPOLOGY_FILE, "wb") as file_obj:
+                file_obj.write(self.registry.to_bytes())
+        except OSError:
+            LOG.exception("unable to save topology")
+
+    def request_ids(self, dest: int, slots: int, laps: int = 0):
+        payload = struct.pack("<H", CONSTANTS.PROTOCOL.TIMING.ID_SLOT_US)
+        if laps:
+            payload += bytes((laps,))
+        self.send_without_queuing(dest, CONSTANTS.PROTOCOL.PACKET_TYPE.REQUEST_ID, payload)
+        now = time()
+        self.discovery_ends = now + (slots * CONSTANTS.PROTOCOL.TIMING.ID_SLOT_US / 1000000.0)
+        if dest == CONSTANTS.MODULES.BROADCAST_ALL:
+            all_slots = max(1, laps) * CONSTANTS.PROTOCOL.TIMING.ID_SLOTS
+            self.answers_end = now + (all_slots * CONSTANTS.PROTOCOL.TIMING.ID_SLOT_US / 1000000.0)
+        self.bad_frames_seen = self.bad_frames
+
+    def retry_collided(self) -> bool:
+        """Broadcast REQUEST_ID again if any RESPONSE_IDs came back garbled
+
+        Modules with high unique bytes can wrap around onto each other's slot, see id_slot(). The repeat has every
+        module answer in a random one of ID_JITTER_LAPS rounds of slots, so the ones that collided are most likely
+        heard this time.
+
+        :return: True if it asked again
+        """
+        if (
+            (self.state not in (CONSTANTS.STATES.WAITING_IDS, CONSTANTS.STATES.VERIFYING_IDS))
+            or (self.bad_frames == self.bad_frames_seen)
+            or (self.id_retries >= CONSTANTS.PROTOCOL.TIMING.ID_RETRIES)
+        ):
+            return False
+        self.id_retries += 1
+        LOG.info("RESPONSE_IDs collided, asking again")
+        laps = CONSTANTS.PROTOCOL.TIMING.ID_JITTER_LAPS
+        self.request_ids(CONSTANTS.MODULES.BROADCAST_ALL, laps * CONSTANTS.PROTOCOL.TIMING.ID_SLOTS, laps)
+        return True
+
+    def discover(self):
+        """Enumerate every module on the bus
+
+        Modules answer in the time slot given by their address, see id_slot(), so the whole bus is enumerated in
+        ID_SLOTS slots, normally without collisions. Responses are collected by response_id() as they arrive.
+        """
+        LOG.debug("discover")
+        self.state = CONSTANTS.STATES.WAITING_IDS
+        self.registry.clear()
+        self.unverified = set()
+        self.topology_changed = True
+        self.id_retries = 0
+        self.request_ids(CONSTANTS.MODULES.BROADCAST_ALL, CONSTANTS.PROTOCOL.TIMING.ID_SLOTS)
+
+    def verify(self, cached: ModuleRegistry):
+        """Check a cached topology with a single broadcast
+
+        Only listens until the slot of the last cached module has passed. Modules added since the topology was saved
+        may answer after that, and are saved by response_id() as they do. Cached modules that don't answer are probed
+        individually by probe_next(), once every slot has passed so the probes don't collide with new modules.
+        """
+        LOG.debug("verify %d cached modules", len(cached))
+        self.state = CONSTANTS.STATES.VERIFYING_IDS
+        self.registry = cached
+        self.unverified = set(info.addr for info in cached)
+        self.topology_changed = False
+        self.id_retries = 0
+        self.request_ids(CONSTANTS.MODULES.BROADCAST_ALL, cached.highest_slot() + 2)
+
+    def probe_next(self, now: float):
+        if self.probing is not None:
+            # The module we asked directly never answered
+            LOG.info("module %x is gone", self.probing)
+            self.registry.remove(self.probing)
+            self.topology_changed = True
+            self.probing = None
+
+        if self.unverified and (now < self.answers_end):
+            # Modules we don't know of yet may still answer the broadcast, a probe would collide with them
+            self.discovery_ends = self.answers_end
+        elif self.unverified:
+            self.state = CONSTANTS.STATES.PROBING_IDS
+            self.probing = self.unverified.pop()
+            LOG.debug("probe %x", self.probing)
+            self.request_ids(self.probing, 0)
+            self.discovery_ends = now + (CONSTANTS.PROTOCOL.TIMING.ID_PROBE_US / 1000000.0)
+        else:
+            self.state = CONSTANTS.STATES.IDLE
+            self.discovery_ends = None
+            LOG.info("discovered %d modules: %r", len(self.registry), list(self.registry))
+            if self.topology_changed:
+                self.save_topology()
+
+    def response_id(self, source: int, _dest: int, payload: bytes):
+        # Payload:
+        #
+        # Field     Length   Notes
+        # -------   ------   -----------------------------------------
+        # flags     1        From CONSTANTS.MODULES.FLAGS
+        # version   1        Firmware version
+        # rate      1        Optional, GAME_STATUS subscription as in subscribe()
+        flags, version = struct.unpack("BB", payload[:2])
+        LOG.debug("response_id %x %x %d", source, flags, version)
+        if self.registry.add(source, flags, version):
+            self.topology_changed = True
+            if self.state == CONSTANTS.STATES.IDLE:
+                # After a short verify or a late power up, nothing else will save it
+                self.save_topology()
+        if len(payload) > 2:
+            self.subscribe(source, _dest, payload[2:3])
+        self.unverified.discard(source)
+        if source == self.probing:
+            self.probing = None
+            self.discovery_ends = time()
+
+        return True  # Never ACK, it would collide with the next module's slot
 
     def start(self, _source: int, _dest: int, _payload: bytes):
         # Payload is the difficulty but we're not adjustable so we ignore it
@@ -76,11 +234,40 @@ class SoundModule(KtaneBase):
         self.next_resync = now + RESYNC_EVERY
         self.queued |= CONSTANTS.QUEUED_TASKS.SEND_TIME
         self.strikes = 0
-        self.armed_modules = set(self.modules)
+        self.armed_modules = self.registry.triggers()
+        self.status_changed()
 
     def stop(self, _source: int = 0, _dest: int = 0, _payload: bytes = b""):
         LOG.debug("stop")
         self.game_ends_at = self.next_beep_at = self.next_resync = None
+        self.status_changed()
+        self.new_context()
+
+    def new_context(self):
+        """Pick the edgework for the next game and queue its broadcast
+
+        Every module caches the context, so it goes out once per game however many modules need it. The first version
+        after a boot is random, so modules still holding one from before a restart don't take the new context for a
+        repeat.
+        """
+        version = randrange(0x100) if self.context.version is None else ((self.context.version + 1) & 0xFF)
+        self.context = generate(1).context(0, version)
+        LOG.debug("new_context %r", self.context.pack())
+        self.queued |= CONSTANTS.QUEUED_TASKS.SEND_CONTEXT
+
+    def start_update(self, module_type: int, image: bytes, version: int):
+        """Update every module of module_type, once discovery is done and no game is running"""
+        self.update = FirmwareUpdate(self, module_type, image, version)
+
+    def update_status(self, source: int, _dest: int, payload: bytes):
+        if self.update:
+            self.update.status(source, payload)
+        return True  # Never ACK, it would collide with the next module's slot
+
+    def read_context(self, source: int, _dest: int, _payload: bytes):
+        # A module that missed the broadcast
+        self.send_without_queuing(source, CONSTANTS.PROTOCOL.PACKET_TYPE.CONTEXT, self.context.pack())
+        return True  # The CONTEXT is our ACK
 
     def show_time(self, _source: int, _dest: int, _payload: bytes):
         LOG.debug("show_time")
@@ -90,7 +277,7 @@ class SoundModule(KtaneBase):
 
     def error(self, _source: int, _dest: int, _payload: bytes):
         LOG.debug("error")
-        self.queue_packet(QueuedPacket(CONSTANTS.MODULES.BROADCAST_ALL, CONSTANTS.PROTOCOL.PACKET_TYPE.STOP))
+        self.queue_packet(QueuedPacket.acquire(CONSTANTS.MODULES.BROADCAST_ALL, CONSTANTS.PROTOCOL.PACKET_TYPE.STOP))
         self.stop()
         play(CONSTANTS.SOUNDS.FILES.STRIKE, CONSTANTS.SOUNDS.FILES.STRIKE_VOL)
 
@@ -99,7 +286,9 @@ class SoundModule(KtaneBase):
         if self.game_ends_at and (_source in self.armed_modules):
             self.armed_modules.discard(_source)
             if self.all_modules_disarmed():
-                self.queue_packet(QueuedPacket(CONSTANTS.MODULES.BROADCAST_ALL, CONSTANTS.PROTOCOL.PACKET_TYPE.STOP))
+                self.queue_packet(
+                    QueuedPacket.acquire(CONSTANTS.MODULES.BROADCAST_ALL, CONSTANTS.PROTOCOL.PACKET_TYPE.STOP)
+                )
                 self.stop()
             else:
                 if self.next_beep_at:
@@ -113,6 +302,7 @@ class SoundModule(KtaneBase):
         if self.game_ends_at:
             LOG.debug("strike")
             self.strikes += 1
+            self.status_changed()
             if self.strikes >= NUM_STRIKES:
                 self.explode()
             else:
@@ -129,11 +319,7 @@ class SoundModule(KtaneBase):
         # strikes   1        Number of strikes
         # time      5        Time as a string, like " 1:12" or "16.92"
         if self.game_ends_at:
-            time_left = self.game_ends_at - time()
-            if time_left >= 60.0:
-                time_string = b"%2d:%02d" % (int(time_left / 60.0), int(time_left) % 60)
-            else:
-                time_string = b"%5.2f" % time_left
+            time_string = format_time(int((self.game_ends_at - time()) * 1000000))
             payload = struct.pack("?B5s", True, self.strikes, time_string)
         else:
             payload = struct.pack("?B5s", False, 0, b"     ")
@@ -142,9 +328,64 @@ class SoundModule(KtaneBase):
 
         return True  # We are sending an ACK
 
+    def subscribe(self, source: int, _dest: int, payload: bytes):
+        # Payload:
+        #
+        # Field     Length   Notes
+        # -------   ------   -------------------------------------------------------
+        # rate      1        GAME_STATUS broadcasts per second, 0 for changes only
+        (rate,) = struct.unpack("B", payload)
+        LOG.debug("subscribe %x %d", source, rate)
+        self.subscribers[source] = rate
+        fastest = max(self.subscribers.values())
+        self.status_interval = (1.0 / fastest) if fastest else None
+        self.queued |= CONSTANTS.QUEUED_TASKS.SEND_STATUS
+
+    def status_changed(self):
+        self.queued |= CONSTANTS.QUEUED_TASKS.SEND_STATUS
+
+    def broadcast_status(self, now: float):
+        # Payload is described in GameStatus
+        if self.game_ends_at:
+            payload = GameStatus.pack(True, self.strikes, int((self.game_ends_at - now) * 1000000))
+        else:
+            payload = GameStatus.pack(False, self.strikes or 0, 0)
+        self.send_without_queuing(CONSTANTS.MODULES.BROADCAST_ALL, CONSTANTS.PROTOCOL.PACKET_TYPE.GAME_STATUS, payload)
+        self.next_status_at = (now + self.status_interval) if (self.status_interval and self.game_ends_at) else None
+
     def check_queued_tasks(self, was_idle):
         now = time()
 
+        if self.discovery_ends and (now >= self.discovery_ends) and not self.retry_collided():
+            self.probe_next(now)
+
+        # A short verify can be over while new modules are still answering it
+        listening = self.discovery_ends or (now < self.answers_end)
+
+        # Status broadcasts would collide with RESPONSE_IDs, so hold them during discovery
+        if self.subscribers and not listening:
+            if (self.queued & CONSTANTS.QUEUED_TASKS.SEND_STATUS) or (
+                self.next_status_at and (now >= self.next_status_at)
+            ):
+                was_idle = False
+                self.queued &= ~CONSTANTS.QUEUED_TASKS.SEND_STATUS
+                self.broadcast_status(now)
+
+        # Held during discovery too
+        if (self.queued & CONSTANTS.QUEUED_TASKS.SEND_CONTEXT) and not listening:
+            was_idle = False
+            self.queued &= ~CONSTANTS.QUEUED_TASKS.SEND_CONTEXT
+            self.send_without_queuing(
+                CONSTANTS.MODULES.BROADCAST_ALL, CONSTANTS.PROTOCOL.PACKET_TYPE.CONTEXT, self.context.pack()
+            )
+
+        # Updates take the bus for a while, so only between games
+        if self.update and not (listening or self.game_ends_at):
+            if self.update.step(now):
+                was_idle = False
+            if self.update.done():
+                self.update = None
+
         if self.queued & CONSTANTS.QUEUED_TASKS.SEND_TIME:
             LOG.debug("set_time")
             was_idle = False
@@ -175,27 +416,14 @@ class SoundModule(KtaneBase):
     def set_time(self, now: float):
         payload = struct.pack("<L", int((self.game_ends_at - now) * 1000000))
         self.queue_packet(
-            QueuedPacket(CONSTANTS.MODULES.TYPES.TIMER << 8, CONSTANTS.PROTOCOL.PACKET_TYPE.SET_TIME, payload)
+            QueuedPacket.acquire(CONSTANTS.MODULES.TYPES.TIMER << 8, CONSTANTS.PROTOCOL.PACKET_TYPE.SET_TIME, payload)
         )
 
     def explode(self):
-        self.queue_packet(QueuedPacket(CONSTANTS.MODULES.BROADCAST_ALL, CONSTANTS.PROTOCOL.PACKET_TYPE.STOP))
+        self.queue_packet(QueuedPacket.acquire(CONSTANTS.MODULES.BROADCAST_ALL, CONSTANTS.PROTOCOL.PACKET_TYPE.STOP))
         self.stop()
         play(CONSTANTS.SOUNDS.FILES.EXPLOSION, CONSTANTS.SOUNDS.FILES.EXPLOSION_VOL)
 
-    # def request_id(self, source: int, _dest: int, _payload: bytes) -> bool:
-    #     LOG.debug("request_id")
-    #     Timer(
-    #         mode=Timer.ONE_SHOT,
-    #         period=randrange(*CONSTANTS.PROTOCOL.TIMING.ID_SPREAD_MS),
-    #         callback=lambda timer: self.send_without_queuing(
-    #             source,
-    #             CONSTANTS.PROTOCOL.PACKET_TYPE.RESPONSE_ID,
-    #             struct.pack("BB", CONSTANTS.MODULES.FLAGS.TRIGGER, 0),
-    #         ),
-    #     )
-    #     return True
-
 
 class PiSerial(Serial):
     def any(self):
@@ -203,7 +431,14 @@ class PiSerial(Serial):
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--update", nargs=3, metavar=("TYPE", "IMAGE", "VERSION"), help="e.g. wires image.bin 2")
+    args = parser.parse_args()
     logging.basicConfig(level=logging.DEBUG)
     GPIO.setmode(GPIO.BOARD)
     sound = SoundModule()
+    if args.update:
+        type_name, filename, version = args.update
+        with open(filename, "rb") as file_obj:
+            sound.start_update(getattr(CONSTANTS.MODULES.TYPES, type_name.upper()), file_obj.read(), int(version))
     sound.poll_forever()
@@ -0,0 +1,100 @@
+import unittest
+
+from ktane_lib.constants import CONSTANTS
+from ktane_lib.ktane_base import KtaneBase, QueuedPacket
+
+NODE_ADDR = 0x0201
+PEER_ADDR = 0x0102
+
+
+class Clock:
+    """ticks_us() that moves on a little every time it's read, so busy-waits end"""
+
+    def __init__(self) -> None:
+        self.now = 0
+
+    def ticks_us(self) -> int:
+        self.now += 10
+        return self.now
+
+    def idle(self) -> None:
+        self.now += 100
+
+
+class FakeUart:
+    def __init__(self) -> None:
+        self.rx = bytearray()
+        self.sent = []
+
+    def any(self) -> int:
+        return len(self.rx)
+
+    def read(self, count: int) -> bytes:
+        data = bytes(self.rx[:count])
+        del self.rx[:count]
+        return data
+
+    def write(self, data) -> int:
+        self.sent.append(bytes(data))
+        return len(data)
+
+
+class FakePin:
+    def on(self) -> None:
+        pass
+
+    def off(self) -> None:
+        pass
+
+
+class QuietLog:
+    def debug(self, *_args) -> None:
+        pass
+
+    info = warning = exception = debug
+
+
+class CheckPendingTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.clock = Clock()
+        self.uart = FakeUart()
+        self.node = KtaneBase(NODE_ADDR, self.uart, FakePin(), QuietLog(), self.clock.idle, self.clock.ticks_us)
+        self.peer = KtaneBase(PEER_ADDR, FakeUart(), FakePin(), QuietLog(), self.clock.idle, self.clock.ticks_us)
+        self.answered = []
+
+    def request(self, timeout_us: int = 10 * CONSTANTS.PROTOCOL.TIMING.RETRY_US):
+        packet = QueuedPacket.acquire(PEER_ADDR, CONSTANTS.PROTOCOL.PACKET_TYPE.READ_STATUS)
+        return self.node.request(packet, self.answered.append, timeout_us)
+
+    def ack_arrives(self, seq_num: int) -> None:
+        self.uart.rx += bytes(self.peer.build_frame(NODE_ADDR, CONSTANTS.PROTOCOL.PACKET_TYPE.ACK, seq_num))
+
+    def test_reply_during_retry(self) -> None:
+        first, second = self.request(), self.request()
+        self.clock.now += CONSTANTS.PROTOCOL.TIMING.RETRY_US
+
+        # The first retry finds the bus busy and polls while it waits, which takes the second's reply
+        self.ack_arrives(second.seq_num)
+        self.node.check_pending()
+        self.node.deliver_completed()
+
+        self.assertEqual(self.answered, [second])
+        self.assertFalse(second.timed_out)
+        self.assertEqual(list(self.node.pending.values()), [first])
+
+    def test_timeout_during_retry(self) -> None:
+        first, second = self.request(), self.request(CONSTANTS.PROTOCOL.TIMING.RETRY_US)
+        self.clock.now += CONSTANTS.PROTOCOL.TIMING.RETRY_US
+
+        # The first retry polls while something else is on the bus, which times the second out
+        self.ack_arrives(0xFF)
+        self.node.check_pending()
+        self.node.deliver_completed()
+
+        self.assertEqual(self.answered, [second])
+        self.assertTrue(second.timed_out)
+        self.assertEqual(list(self.node.pending.values()), [first])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+"""Build per-module-type firmware images for the RP2040 modules
+
+For each module type in raspberry_pi/main.py's MODULES, the modules it imports (from raspberry_pi/ and ktane_lib/) are
+found by following its imports, then:
+
+  build/<type>/fs/          .mpy files cross-compiled with mpy-cross, plus main.py, to copy onto the node's filesystem
+  build/<type>/image.bin    the .mpy files bundled for an update over the bus, see sound/firmware_update.py
+  build/<type>/manifest.py  a MicroPython manifest freezing the same modules, for FROZEN_MANIFEST when building the
+                            port firmware. Frozen bytecode runs straight from flash, so large tables like wire_table
+                            cost no RAM at all. main.py still goes on the filesystem.
+
+Either way, nothing is compiled from source at boot and only the configured type's modules are on the node. mpy-cross
+must match the MicroPython version of the firmware (pip install mpy-cross==<version>, or set MPY_CROSS).
+
+Run from the top of the repo: python tools/build_firmware.py [type ...]
+"""
+import ast
+import os
+import shutil
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from ktane_lib.firmware import pack_bundle  # noqa: E402
+
+# Constants:
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+MODULE_DIR = os.path.join(ROOT, "raspberry_pi")
+PACKAGE = "ktane_lib"  # Shared with the other nodes, kept as a package on the node
+BUILD_DIR = os.path.join(ROOT, "build")
+MPY_CROSS = os.environ.get("MPY_CROSS", "mpy-cross")
+ENTRY = "main.py"  # Run as source by MicroPython, so it's copied rather than compiled
+LAZY = ["bus_core", "probes", "updater"]  # Imported inside functions, only needed if a module turns them on
+
+
+def module_types() -> dict:
+    """MODULES from main.py as {type name: module name}, without importing it (it would start the node)"""
+    tree = ast.parse(open(os.path.join(MODULE_DIR, ENTRY)).read())
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign) and (getattr(node.targets[0], "id", None) == "MODULES"):
+            # Keys are CONSTANTS.MODULES.TYPES.<name>
+            return {key.attr.lower(): value.elts[0].value for key, value in zip(node.value.keys, node.value.values)}
+    raise ValueError("no MODULES in %s" % ENTRY)
+
+
+def source_of(name: str):
+    """Path of a repo module by import name, or None for built-ins like machine"""
+    if name == PACKAGE:
+        path = os.path.join(ROOT, PACKAGE, "__init__.py")
+    elif name.startswith(PACKAGE + "."):
+        path = os.path.join(ROOT, *name.split(".")) + ".py"
+    else:
+        path = os.path.join(MODULE_DIR, name + ".py")
+    return path if os.path.exists(path) else None
+
+
+def dependencies(name: str, found=None) -> dict:
+    """name and every repo module it imports, as {import name: path}"""
+    found = {} if found is None else found
+    path = source_of(name)
+    if (path is None) or (name in found):
+        return found
+    found[name] = path
+    if name.startswith(PACKAGE + "."):
+        dependencies(PACKAGE, found)
+    for node in ast.walk(ast.parse(open(path).read())):
+        if isinstance(node, ast.ImportFrom) and node.module:
+            dependencies(node.module, found)
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                dependencies(alias.name, found)
+    return found
+
+
+def target_of(name: str) -> str:
+    """Where a module lives on the node, relative to the filesystem root"""
+    return (PACKAGE + "/__init__.py") if name == PACKAGE else (name.replace(".", "/") + ".py")
+
+
+def build(type_name: str, module_name: str) -> None:
+    modules = dependencies(module_name, dependencies("log"))
+    for lazy in LAZY:
+        dependencies(lazy, modules)
+    out_dir = os.path.join(BUILD_DIR, type_name)
+    fs_dir = os.path.join(out_dir, "fs")
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.makedirs(fs_dir)
+
+    # Cross-compiled
+    bundle = {}
+    for name, path in sorted(modules.items()):
+        target = target_of(name)
+        mpy = os.path.join(fs_dir, target[:-3] + ".mpy")
+        os.makedirs(os.path.dirname(mpy), exist_ok=True)
+        subprocess.run([MPY_CROSS, "-s", target, "-o", mpy, path], check=True)
+        with open(mpy, "rb") as file_obj:
+            bundle[target[:-3] + ".mpy"] = file_obj.read()
+    shutil.copy(os.path.join(MODULE_DIR, ENTRY), fs_dir)
+
+    # Update image, main.py stays as it is and picks the image
+    with open(os.path.join(out_dir, "image.bin"), "wb") as file_obj:
+        file_obj.write(pack_bundle(bundle))
+
+    # Frozen
+    with open(os.path.join(out_dir, "manifest.py"), "w") as file_obj:
+        file_obj.write('include("$(PORT_DIR)/boards/manifest.py")\n')
+        for name, path in sorted(modules.items()):
+            base_path = ROOT if name.split(".")[0] == PACKAGE else MODULE_DIR
+            file_obj.write("module(%r, base_path=%r)\n" % (target_of(name), base_path))
+
+    print("%s: %s" % (type_name, ", ".join(sorted(modules))))
+
+
+def main(selected: list) -> None:
+    types = module_types()
+    for type_name in selected or sorted(types):
+        build(type_name, types[type_name])
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,81 @@
+"""Build raspberry_pi/wire_table.py from the reference rules in ktane_lib/wire_rules.py
+
+Every layout of MIN_WIRES to MAX_WIRES wires over the wire colors is run through wire_to_cut() for both serial number
+parities. The answers are packed two to a byte, even serial number in the low nibble and odd in the high, at
+layout_key(colors). Layouts the rules can't answer are reported and stored as NO_ANSWER.
+
+Run from the top of the repo: python tools/gen_wire_table.py
+"""
+from itertools import product
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from ktane_lib.wire_rules import (  # noqa: E402
+    MAX_WIRES,
+    MIN_WIRES,
+    NO_ANSWER,
+    NUM_COLORS,
+    TABLE_LEN,
+    layout_key,
+    wire_to_cut,
+)
+
+# Constants:
+OUTPUT = os.path.join(os.path.dirname(__file__), "..", "raspberry_pi", "wire_table.py")
+BYTES_PER_LINE = 24
+
+
+def answer(colors: tuple, last_serial_digit_odd: bool) -> int:
+    try:
+        position = wire_to_cut(list(colors), last_serial_digit_odd)
+    except IndexError:
+        # Asked for a wire that isn't there, e.g. "last red" with no reds
+        position = None
+    if (position is None) or not (0 <= position < len(colors)):
+        return NO_ANSWER
+    return position
+
+
+def build():
+    table = bytearray(TABLE_LEN)
+    unanswered = []
+    for num_wires in range(MIN_WIRES, MAX_WIRES + 1):
+        for colors in product(range(NUM_COLORS), repeat=num_wires):
+            entry = 0
+            for parity in (False, True):
+                position = answer(colors, parity)
+                if position == NO_ANSWER:
+                    unanswered.append((colors, parity))
+                entry |= position << (4 if parity else 0)
+            table[layout_key(list(colors))] = entry
+    return bytes(table), unanswered
+
+
+def write(table: bytes) -> None:
+    with open(OUTPUT, "w") as file_obj:
+        file_obj.write("# Generated by tools/gen_wire_table.py from ktane_lib/wire_rules.py, don't edit\n")
+        file_obj.write("#\n")
+        file_obj.write("# TABLE[layout_key(colors)] is the index of the wire to cut, low nibble for an even serial\n")
+        file_obj.write("# number and high nibble for odd. NO_ANSWER if the rules don't cover the layout.\n")
+        file_obj.write("TABLE = (\n")
+        for start in range(0, len(table), BYTES_PER_LINE):
+            file_obj.write("    %r\n" % table[start : start + BYTES_PER_LINE])
+        file_obj.write(")\n")
+
+
+def main():
+    table, unanswered = build()
+    write(table)
+    print("%d layouts of %d-%d wires, %d bytes" % (len(table), MIN_WIRES, MAX_WIRES, len(table)))
+    if unanswered:
+        print("%d layouts have no valid answer:" % len(unanswered))
+        for colors, parity in unanswered:
+            print("  %r, serial %s" % (colors, "odd" if parity else "even"))
+    print("Fewer than %d or more than %d wires are never armed" % (MIN_WIRES, MAX_WIRES))
+    return 1 if unanswered else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())